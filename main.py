@@ -1,7 +1,30 @@
 import os
+from contextlib import asynccontextmanager
+
 import uvicorn
 from google.adk.cli.fast_api import get_fast_api_app
 from dotenv import load_dotenv
+from mcp_brand_agent import admission
+from mcp_brand_agent import agent
+from mcp_brand_agent import anomaly
+from mcp_brand_agent import cassettes
+from mcp_brand_agent import compare
+from mcp_brand_agent import export
+from mcp_brand_agent import highlights
+from mcp_brand_agent import http_pool
+from mcp_brand_agent import ingest
+from mcp_brand_agent import jobs
+from mcp_brand_agent import live
+from mcp_brand_agent import metering
+from mcp_brand_agent import profiler
+from mcp_brand_agent import rollups
+from mcp_brand_agent import runner
+from mcp_brand_agent import search_index
+from mcp_brand_agent import session_store
+from mcp_brand_agent import singleflight
+from mcp_brand_agent import snapshots
+from mcp_brand_agent import warm_cache
+from mcp_brand_agent import workers
 
 load_dotenv()
 
@@ -10,14 +33,59 @@ SESSION_DB_URL = os.getenv("SESSION_DB_URL")
 ALLOWED_ORIGINS = ["http://localhost", "http://localhost:8080", "*"]
 SERVE_WEB_INTERFACE = True
 
+
+@asynccontextmanager
+async def lifespan(app):
+    await jobs.job_workers.start()
+    ingest.mention_batcher.start(model=agent.model_analysis)
+    if live.LIVE_RELAY:
+        live.live_relay.start(live.broadcaster)
+    if warm_cache.WARM_CACHE_ENABLED and not cassettes.cassette.active:
+        warm_cache.warm_cache.start(runner.run_brand_analysis)
+    try:
+        yield
+    finally:
+        await warm_cache.warm_cache.stop()
+        await ingest.mention_batcher.stop()
+        await live.live_relay.stop()
+        await jobs.job_workers.stop()
+        await http_pool.llm_pool.close()
+        cassettes.cassette.close()
+
+
+session_store.install()
 app = get_fast_api_app(
     agents_dir=AGENT_DIR,
     session_db_url=SESSION_DB_URL,
     allow_origins=ALLOWED_ORIGINS,
     web=SERVE_WEB_INTERFACE,
+    lifespan=lifespan,
 )
+app.add_middleware(admission.AdmissionMiddleware)
+app.add_middleware(profiler.ProfileRequestMiddleware)
+app.include_router(rollups.router)
+app.include_router(snapshots.router)
+app.include_router(search_index.router)
+app.include_router(anomaly.router)
+app.include_router(metering.router)
+app.include_router(jobs.router)
+app.include_router(admission.router)
+app.include_router(singleflight.router)
+app.include_router(warm_cache.router)
+app.include_router(profiler.router)
+app.include_router(session_store.router)
+app.include_router(http_pool.router)
+app.include_router(ingest.router)
+app.include_router(highlights.router)
+app.include_router(compare.router)
+app.include_router(live.router)
+app.include_router(export.router)
+app.include_router(cassettes.router)
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8080))
-    print(f"Starting server on port {port}")
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    if workers.WEB_CONCURRENCY > 1:
+        workers.serve(host="0.0.0.0", port=port)
+    else:
+        print(f"Starting server on port {port}")
+        uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
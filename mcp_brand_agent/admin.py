@@ -0,0 +1,23 @@
+import hmac
+import os
+from typing import Optional
+
+from fastapi import HTTPException
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")  # admin endpoints are disabled unless this is set
+ADMIN_HEADER = "x-admin-token"
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Whether `token` is the configured ADMIN_TOKEN; always False when none is configured."""
+    if not ADMIN_TOKEN or token is None:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8"))
+
+
+def check_admin_token(token: Optional[str]) -> None:
+    """Reject an admin request (403) unless it carries ADMIN_TOKEN in X-Admin-Token."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled: ADMIN_TOKEN is not set")
+    if not is_admin_token(token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
@@ -0,0 +1,187 @@
+import asyncio
+import heapq
+import json
+import math
+import os
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from itertools import count
+from typing import List, Tuple
+
+from fastapi import APIRouter
+
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "4"))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "16"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "30"))
+ADMISSION_PATHS = ("/run", "/run_sse")
+PRIORITY_HEADER = "x-priority"
+PRIORITY_CLASSES = {"high": 0, "normal": 1, "low": 2}
+RUN_SECONDS_ALPHA = 0.2
+
+
+class AdmissionRejected(Exception):
+    """A pipeline run was turned away: 429 when the queue is full, 503 when it waited too long or was displaced."""
+
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Caps concurrent pipeline runs and queues the overflow by priority class.
+
+    Up to `max_in_flight` runs execute at once; up to `queue_size` more wait, highest
+    priority first and FIFO within a class. When the queue is full a new request
+    displaces the lowest-priority waiter if it outranks it, otherwise it is rejected.
+    """
+
+    def __init__(self, max_in_flight: int = ADMISSION_MAX_IN_FLIGHT, queue_size: int = ADMISSION_QUEUE_SIZE,
+                 queue_timeout: float = ADMISSION_QUEUE_TIMEOUT):
+        self.max_in_flight = max_in_flight
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = count()
+        self._run_seconds = 0.0
+        self._wait_seconds_total = 0.0
+        self.counters: Counter = Counter()
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to free up, from the average run time and queue depth."""
+        run_seconds = self._run_seconds or 30.0
+        return max(1, math.ceil(run_seconds * (len(self._waiters) + 1) / self.max_in_flight))
+
+    def _reject(self, status_code: int, reason: str, priority: str) -> AdmissionRejected:
+        self.counters[f"rejected_{reason}"] += 1
+        self.counters[f"rejected_{priority}"] += 1
+        return AdmissionRejected(status_code, reason, self.retry_after())
+
+    async def acquire(self, priority: str = "normal") -> None:
+        rank = PRIORITY_CLASSES.get(priority, PRIORITY_CLASSES["normal"])
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self.counters["admitted"] += 1
+            return
+
+        if len(self._waiters) >= self.queue_size:
+            worst = max(self._waiters)
+            if worst[0] <= rank:
+                raise self._reject(429, "queue_full", priority)
+            self._waiters.remove(worst)
+            heapq.heapify(self._waiters)
+            worst[2].set_exception(self._reject(503, "displaced", _priority_name(worst[0])))
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (rank, next(self._sequence), waiter)
+        heapq.heappush(self._waiters, entry)
+        self.counters["queued"] += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._forget(entry)
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                self.release(0.0)
+            raise self._reject(503, "queue_timeout", priority)
+        except asyncio.CancelledError:
+            self._forget(entry)
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                self.release(0.0)
+            raise
+        finally:
+            self._wait_seconds_total += time.monotonic() - started
+        self.counters["admitted"] += 1
+
+    def _forget(self, entry) -> None:
+        if entry in self._waiters:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+
+    def release(self, run_seconds: float) -> None:
+        """Free a slot, handing it straight to the best waiter if there is one."""
+        if run_seconds:
+            self._run_seconds += RUN_SECONDS_ALPHA * (run_seconds - self._run_seconds) if self._run_seconds else run_seconds
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: str = "normal"):
+        await self.acquire(priority)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def metrics(self) -> dict:
+        queued = Counter(_priority_name(rank) for rank, _, _ in self._waiters)
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": len(self._waiters),
+            "queue_size": self.queue_size,
+            "queued_by_priority": {name: queued.get(name, 0) for name in PRIORITY_CLASSES},
+            "avg_run_seconds": round(self._run_seconds, 3),
+            "avg_queue_wait_seconds": round(self._wait_seconds_total / self.counters["queued"], 3)
+            if self.counters["queued"] else 0.0,
+            "retry_after_seconds": self.retry_after(),
+            "counters": dict(self.counters),
+        }
+
+
+def _priority_name(rank: int) -> str:
+    return next(name for name, value in PRIORITY_CLASSES.items() if value == rank)
+
+
+admission_controller = AdmissionController()
+
+
+class AdmissionMiddleware:
+    """ASGI middleware that holds an admission slot for the whole of each pipeline run request.
+
+    The slot is held until the response finishes streaming, so /run_sse counts for its full length.
+    Other routes pass straight through. Priority comes from the X-Priority header.
+    """
+
+    def __init__(self, app, controller: AdmissionController = admission_controller, paths=ADMISSION_PATHS):
+        self.app = app
+        self.controller = controller
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        priority = headers.get(PRIORITY_HEADER.encode("latin-1"), b"normal").decode("latin-1").lower()
+        try:
+            async with self.controller.slot(priority):
+                await self.app(scope, receive, send)
+        except AdmissionRejected as e:
+            body = json.dumps({"detail": f"Server busy: {e.reason}", "retry_after": e.retry_after}).encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": e.status_code,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"retry-after", str(e.retry_after).encode("latin-1")),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+
+
+router = APIRouter(prefix="/admission", tags=["admission"])
+
+
+@router.get("/metrics")
+def admission_metrics():
+    return admission_controller.metrics()
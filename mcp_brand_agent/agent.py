@@ -1,56 +1,37 @@
 import os
 # import litellm
-from google.adk.agents import LlmAgent, ParallelAgent, LoopAgent, SequentialAgent
-from pydantic import BaseModel
-from typing import List, Dict, Literal
+from google.adk.agents import LlmAgent, LoopAgent, SequentialAgent
 from google.adk.models.lite_llm import LiteLlm
 from google.adk.tools import ToolContext
 from mcp_brand_agent.tool_helper import search_web
+from mcp_brand_agent.schemas import (
+    SentimentBreakdown,
+    PlatformSentiment,
+    WordCloudTheme,
+    Mention,
+    PlatformMentions,
+    SinglePlatformAnalysisReport,
+    BrandSentimentReport,
+)
+from mcp_brand_agent.stream_parser import SchemaRetryAgent, stream_validation_callbacks
+from mcp_brand_agent.mapreduce import MENTION_TARGET, MapReducePlatformAgent
+from mcp_brand_agent.fanout import BoundedParallelAgent
+from mcp_brand_agent.platforms import PLATFORM_CONCURRENCY, PlatformConfig, enabled_platforms
+from mcp_brand_agent.listeners import add_mention_listener, add_run_listener, publish_platform_results
+from mcp_brand_agent.rollups import sentiment_rollups
+from mcp_brand_agent.search_index import mention_index
+from mcp_brand_agent.anomaly import anomaly_detector
+from mcp_brand_agent.metering import record_run_cost, usage_meter
+from mcp_brand_agent.cache import CachingLiteLLMClient
+from mcp_brand_agent.http_pool import llm_pool
+from mcp_brand_agent.live import broadcaster
+from mcp_brand_agent.singleflight import CoalescingAgent
+from mcp_brand_agent.snapshots import snapshot_store
+from mcp_brand_agent.warm_cache import WARM_CACHE_ENABLED, warm_cache
 from dotenv import load_dotenv
 
 load_dotenv()
 
-class SentimentBreakdown(BaseModel):
-    positive: float
-    negative: float
-    neutral: float
-
-class PlatformSentiment(SentimentBreakdown):
-    count: int
-
-class WordCloudTheme(BaseModel):
-    word: str
-    weight: float
-
-class Mention(BaseModel):
-    date: str
-    text: str
-    sentiment: Literal["positive", "negative", "neutral"]
-    ethical_context: str
-    url: str
-
-class PlatformMentions(BaseModel):
-    name: Literal["Twitter", "LinkedIn", "Reddit", "News"]
-    mentions: List[Mention]
-
-class SinglePlatformAnalysisReport(BaseModel):
-    brand_name: str
-    platform_name: Literal["Twitter", "LinkedIn", "Reddit", "News"]
-    total_mentions_on_platform: int
-    platform_sentiment_breakdown: SentimentBreakdown
-    ethical_highlights_on_platform: List[str]
-    word_cloud_themes_on_platform: List[WordCloudTheme]
-    mentions_on_platform: List[Mention]
-
-class BrandSentimentReport(BaseModel):
-    brand_name: str
-    total_mentions: int
-    overall_sentiment: SentimentBreakdown
-    platform_sentiment: Dict[Literal["Twitter", "LinkedIn", "Reddit", "News"], PlatformSentiment]
-    ethical_highlights: List[str]
-    word_cloud_themes: List[WordCloudTheme]
-    platforms: List[PlatformMentions]
-
 # model_groq = LiteLlm(
 #     model="groq/qwen-qwq-32b",
 #     api_key=os.getenv("GROQ_API_KEY"),
@@ -59,16 +40,21 @@ class BrandSentimentReport(BaseModel):
 #     model="o4-mini",
 #     api_key=os.getenv("OPENAI_API_KEY")
 # )
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "agent")  # "agent" or "mapreduce"
+
 if not os.getenv("OPENAI_API_KEY"):
     raise ValueError("OPENAI_API_KEY is not set")
 
+llm_pool.install()
 model_extract = LiteLlm(
     model="o4-mini",
-    api_key=os.getenv("OPENAI_API_KEY")
+    api_key=os.getenv("OPENAI_API_KEY"),
+    llm_client=CachingLiteLLMClient(),
 )
 model_analysis = LiteLlm(
     model="o4-mini",
-    api_key=os.getenv("OPENAI_API_KEY")
+    api_key=os.getenv("OPENAI_API_KEY"),
+    llm_client=CachingLiteLLMClient(),
 )
 # model_extract = model_analysis = "gemini-2.5-flash-preview-05-20"
 # model_qwen = LiteLlm(
@@ -86,379 +72,151 @@ def exit_loop(tool_context: ToolContext):
   return {}
 
 
-# Create platform-specific search agents
-twitter_agent = LlmAgent(
-    model=model_analysis,
-    name='twitter_agent',
-    description="Searches Twitter/X for brand mentions and provides analysis",
-    instruction="""
-Search for exactly 3 Twitter/X posts about the brand, then analyze and return structured data.
-
-First, search using brand name, hashtags, and keywords from x.com domain only. Extract 10+ significant words for word_cloud_themes_on_platform.
-
-CRITICAL: Return ONLY valid JSON in this EXACT structure (no markdown, no explanations):
-{
-  "brand_name": "the brand name",
-  "platform_name": "Twitter",
-  "total_mentions_on_platform": 3,
-  "platform_sentiment_breakdown": {
-    "positive": 0.6,
-    "negative": 0.3,
-    "neutral": 0.1
-  },
-  "ethical_highlights_on_platform": [
-    "key ethical theme 1",
-    "key ethical theme 2"
-  ],
-  "word_cloud_themes_on_platform": [
-    {"word": "theme_word", "weight": 8}
-  ],
-  "mentions_on_platform": [
-    {
-      "date": "actual date or Recent",
-      "text": "actual post content",
-      "sentiment": "positive",
-      "ethical_context": "relevant theme",
-      "url": "post link or x.com domain"
-    }
-  ]
-}
-
-IMPORTANT: 
-- sentiment must be exactly "positive", "negative", or "neutral"
-- platform_name must be exactly "Twitter"
-- Return ONLY the JSON object, no other text
-    """,
-    tools=[search_web],
-    # output_schema=SinglePlatformAnalysisReport,
-    output_key="twitter_results"
-)
-
-twitter_extract_agent = LlmAgent(
-    model=model_extract,
-    name='twitter_extract_agent',
-    description="Extracts the results from the twitter_agent in the structured JSON format",
-    instruction="""
-    You will receive data from the twitter_agent. Your task is to extract and return ONLY valid JSON that matches the required schema.
-
-    Input data: {twitter_results}
-
-    IMPORTANT INSTRUCTIONS:
-    1. If the input contains JSON wrapped in markdown (```json ... ```), extract only the JSON content
-    2. If the input is already valid JSON, return it as-is
-    3. Ensure all required fields are present: brand_name, platform_name, total_mentions_on_platform, platform_sentiment_breakdown, ethical_highlights_on_platform, word_cloud_themes_on_platform, mentions_on_platform
-    4. Return ONLY the JSON object, no markdown formatting, no explanations
-    5. Ensure platform_name is exactly "Twitter"
-    
-    Return the clean JSON:
-    """,
-    output_key="final_twitter_results",
-    output_schema=SinglePlatformAnalysisReport,
-    # disallow_transfer_to_parent=True,
-    # disallow_transfer_to_peers=True
-        # generate_content_config=types.GenerateContentConfig(temperature=0.01)
-)
-# twitter_agent.planner = twitter_extract_agent.planner = BuiltInPlanner(
-#     thinking_config=types.ThinkingConfig(
-#         thinking_budget=0,
-#     )
-# )
-
-twitter_sequential_agent = SequentialAgent(
-    name="twitter_sequential_agent",
-    description="Runs the twitter_agent and twitter_extract_agent sequentially",
-    sub_agents=[twitter_agent, twitter_extract_agent]
-)
-
-# twitter_loop_agent = LoopAgent(
-#     name="twitter_loop_agent",
-#     description="Loop agent for Twitter search",
-#     sub_agents=[twitter_agent],
-#     max_iterations=2
-# )
-
-linkedin_agent = LlmAgent(
-    model=model_analysis,
-    name='linkedin_agent',
-    description="Searches LinkedIn for brand mentions and provides analysis",
-    instruction="""
-Search for exactly 3 LinkedIn posts about the brand, then analyze and return structured data.
-
-First, search company pages, executives, and industry posts from linkedin.com domain only. Extract 10+ significant words for word_cloud_themes_on_platform.
-
-CRITICAL: Return ONLY valid JSON in this EXACT structure (no markdown, no explanations):
-{
-  "brand_name": "the brand name",
-  "platform_name": "LinkedIn",
-  "total_mentions_on_platform": 3,
-  "platform_sentiment_breakdown": {
-    "positive": 0.6,
-    "negative": 0.3,
-    "neutral": 0.1
-  },
-  "ethical_highlights_on_platform": [
-    "key ethical theme 1",
-    "key ethical theme 2"
-  ],
-  "word_cloud_themes_on_platform": [
-    {"word": "theme_word", "weight": 8}
-  ],
-  "mentions_on_platform": [
-    {
-      "date": "actual date or Recent",
-      "text": "actual post content",
-      "sentiment": "positive",
-      "ethical_context": "relevant theme",
-      "url": "post link or linkedin.com domain"
-    }
-  ]
-}
-
-IMPORTANT: 
-- sentiment must be exactly "positive", "negative", or "neutral"
-- platform_name must be exactly "LinkedIn"
-- Return ONLY the JSON object, no other text
-    """,
-    tools=[search_web],
-    # output_schema=SinglePlatformAnalysisReport,
-    output_key="linkedin_results",
-    # generate_content_config=types.GenerateContentConfig(temperature=0.01),
-)
-
-linkedin_extract_agent = LlmAgent(
-    model=model_extract,
-    name='linkedin_extract_agent',
-    description="Extracts the results from the linkedin_agent in the structured JSON format",
-    instruction="""
-    You will receive data from the linkedin_agent. Your task is to extract and return ONLY valid JSON that matches the required schema.
-
-    Input data: {linkedin_results}
-
-    IMPORTANT INSTRUCTIONS:
-    1. If the input contains JSON wrapped in markdown (```json ... ```), extract only the JSON content
-    2. If the input is already valid JSON, return it as-is
-    3. Ensure all required fields are present: brand_name, platform_name, total_mentions_on_platform, platform_sentiment_breakdown, ethical_highlights_on_platform, word_cloud_themes_on_platform, mentions_on_platform
-    4. Return ONLY the JSON object, no markdown formatting, no explanations
-    5. Ensure platform_name is exactly "LinkedIn"
-    
-    Return the clean JSON:
-    """,
-    output_key="final_linkedin_results",
-    output_schema=SinglePlatformAnalysisReport,
-    # disallow_transfer_to_parent=True,
-    # disallow_transfer_to_peers=True
-    # generate_content_config=types.GenerateContentConfig(temperature=0.01)
-)
-# linkedin_agent.planner = linkedin_extract_agent.planner = BuiltInPlanner(
-#     thinking_config=types.ThinkingConfig(
-#         thinking_budget=0,
-#     )
-# )
-
-linkedin_sequential_agent = SequentialAgent(
-    name="linkedin_sequential_agent",
-    description="Runs the linkedin_agent and linkedin_extract_agent sequentially",
-    sub_agents=[linkedin_agent, linkedin_extract_agent]
-)
-
-# linkedin_loop_agent = LoopAgent(
-#     name="linkedin_loop_agent",
-#     description="Loop agent for LinkedIn search",
-#     sub_agents=[linkedin_agent],
-#     max_iterations=2
-# )
-
-reddit_agent = LlmAgent(
-    model=model_analysis,
-    name='reddit_agent',
-    description="Searches Reddit for brand mentions and provides analysis",
-    instruction="""
-Search for exactly 3 Reddit posts about the brand, then analyze and return structured data.
-
-First, search relevant subreddits and brand discussions from reddit.com domain only. Extract 10+ significant words for word_cloud_themes_on_platform.
-
-CRITICAL: Return ONLY valid JSON in this EXACT structure (no markdown, no explanations):
-{
-  "brand_name": "the brand name",
-  "platform_name": "Reddit",
-  "total_mentions_on_platform": 3,
-  "platform_sentiment_breakdown": {
-    "positive": 0.6,
-    "negative": 0.3,
-    "neutral": 0.1
-  },
-  "ethical_highlights_on_platform": [
-    "key ethical theme 1",
-    "key ethical theme 2"
-  ],
-  "word_cloud_themes_on_platform": [
-    {"word": "theme_word", "weight": 8}
-  ],
-  "mentions_on_platform": [
-    {
-      "date": "actual date or Recent",
-      "text": "actual post content",
-      "sentiment": "positive",
-      "ethical_context": "relevant theme",
-      "url": "post link or reddit.com domain"
-    }
-  ]
-}
-
-IMPORTANT: 
-- sentiment must be exactly "positive", "negative", or "neutral"
-- platform_name must be exactly "Reddit"
-- Return ONLY the JSON object, no other text
-    """,
-    tools=[search_web],
-    # output_schema=SinglePlatformAnalysisReport,
-    output_key="reddit_results",
-    # generate_content_config=types.GenerateContentConfig(temperature=0.01),
-)
-
-reddit_extract_agent = LlmAgent(
-    name='reddit_extract_agent',
-    model=model_extract,
-    description="Extracts the results from the reddit_agent in the structured JSON format",
-    instruction="""
-    You will receive data from the reddit_agent. Your task is to extract and return ONLY valid JSON that matches the required schema.
-
-    Input data: {reddit_results}
-
-    IMPORTANT INSTRUCTIONS:
-    1. If the input contains JSON wrapped in markdown (```json ... ```), extract only the JSON content
-    2. If the input is already valid JSON, return it as-is
-    3. Ensure all required fields are present: brand_name, platform_name, total_mentions_on_platform, platform_sentiment_breakdown, ethical_highlights_on_platform, word_cloud_themes_on_platform, mentions_on_platform
-    4. Return ONLY the JSON object, no markdown formatting, no explanations
-    5. Ensure platform_name is exactly "Reddit"
-    
-    Return the clean JSON:
-    """,
-    output_key="final_reddit_results",
-    output_schema=SinglePlatformAnalysisReport,
-    # disallow_transfer_to_parent=True,
-    # disallow_transfer_to_peers=True
-    # generate_content_config=types.GenerateContentConfig(temperature=0.01)
-)
-# reddit_agent.planner = reddit_extract_agent.planner = BuiltInPlanner(
-#     thinking_config=types.ThinkingConfig(
-#         thinking_budget=0,
-#     )
-# )
-
-reddit_sequential_agent = SequentialAgent(
-    name="reddit_sequential_agent",
-    description="Runs the reddit_agent and reddit_extract_agent sequentially",
-    sub_agents=[reddit_agent, reddit_extract_agent]
-)
-
+DEFAULT_MENTION_BUDGET = 3
 
-# reddit_loop_agent = LoopAgent(
-#     name="reddit_loop_agent",
-#     description="Loop agent for Reddit search",
-#     sub_agents=[reddit_agent],
-#     max_iterations=2
-# )
 
-news_agent = LlmAgent(
-    model=model_analysis,
-    name='news_agent',
-    description="Searches news sites for brand mentions and provides analysis",
-    instruction="""
-Search for exactly 3 news articles about the brand, then analyze and return structured data.
+def build_search_agent(platform: PlatformConfig) -> LlmAgent:
+    """Search agent that finds and analyzes the platform's mentions."""
+    budget = platform.mention_budget or DEFAULT_MENTION_BUDGET
+    stream_callbacks = stream_validation_callbacks(platform.name, platform.key)
+    before_model, after_model, before_tool, after_tool = usage_meter.callbacks(
+        platform.name, platform.key, model_analysis.model,
+    )
+    return LlmAgent(
+        model=model_analysis,
+        name=f'{platform.key}_agent',
+        description=f"Searches {platform.display_name} for brand mentions and provides analysis",
+        instruction=f"""
+Search for exactly {budget} {platform.content_label} about the brand, then analyze and return structured data.
 
-First, search major news sites and industry publications from reputable news sites only. Extract 10+ significant words for word_cloud_themes_on_platform.
+First, {platform.query_hints} {platform.sources}. Extract 10+ significant words for word_cloud_themes_on_platform.
 
 CRITICAL: Return ONLY valid JSON in this EXACT structure (no markdown, no explanations):
-{
+{{
   "brand_name": "the brand name",
-  "platform_name": "News",
-  "total_mentions_on_platform": 3,
-  "platform_sentiment_breakdown": {
+  "platform_name": "{platform.name}",
+  "total_mentions_on_platform": {budget},
+  "platform_sentiment_breakdown": {{
     "positive": 0.6,
     "negative": 0.3,
     "neutral": 0.1
-  },
+  }},
   "ethical_highlights_on_platform": [
     "key ethical theme 1",
     "key ethical theme 2"
   ],
   "word_cloud_themes_on_platform": [
-    {"word": "theme_word", "weight": 8}
+    {{"word": "theme_word", "weight": 8}}
   ],
   "mentions_on_platform": [
-    {
+    {{
       "date": "actual date or Recent",
-      "text": "actual article excerpt",
+      "text": "{platform.text_hint}",
       "sentiment": "positive",
       "ethical_context": "relevant theme",
-      "url": "article link or news site domain"
-    }
+      "url": "{platform.url_example}"
+    }}
   ]
-}
+}}
 
 IMPORTANT: 
 - sentiment must be exactly "positive", "negative", or "neutral"
-- platform_name must be exactly "News"
+- platform_name must be exactly "{platform.name}"
 - Return ONLY the JSON object, no other text
     """,
-    tools=[search_web],
-    # output_schema=SinglePlatformAnalysisReport,
-    output_key="news_results",
-    # generate_content_config=types.GenerateContentConfig(temperature=0.01),
-)
-
-news_extract_agent = LlmAgent(
-    name='news_extract_agent',
-    model=model_extract,
-    description="Extracts the results from the news_agent in the structured JSON format",
-    instruction="""
-    You will receive data from the news_agent. Your task is to extract and return ONLY valid JSON that matches the required schema.
-
-    Input data: {news_results}
+        tools=[search_web],
+        # output_schema=SinglePlatformAnalysisReport,
+        before_model_callback=[before_model, stream_callbacks[0]],
+        after_model_callback=[after_model, stream_callbacks[1]],
+        before_tool_callback=before_tool,
+        after_tool_callback=after_tool,
+        output_key=f"{platform.key}_results"
+    )
+
+
+def build_extract_agent(platform: PlatformConfig) -> LlmAgent:
+    """Extract agent that turns the search agent's output into a SinglePlatformAnalysisReport."""
+    before_model, after_model, _, _ = usage_meter.callbacks(platform.name, platform.key, model_extract.model)
+    return LlmAgent(
+        model=model_extract,
+        name=f'{platform.key}_extract_agent',
+        description=f"Extracts the results from the {platform.key}_agent in the structured JSON format",
+        instruction=f"""
+    You will receive data from the {platform.key}_agent. Your task is to extract and return ONLY valid JSON that matches the required schema.
+
+    Input data: {{{platform.key}_results}}
 
     IMPORTANT INSTRUCTIONS:
     1. If the input contains JSON wrapped in markdown (```json ... ```), extract only the JSON content
     2. If the input is already valid JSON, return it as-is
     3. Ensure all required fields are present: brand_name, platform_name, total_mentions_on_platform, platform_sentiment_breakdown, ethical_highlights_on_platform, word_cloud_themes_on_platform, mentions_on_platform
     4. Return ONLY the JSON object, no markdown formatting, no explanations
-    5. Ensure platform_name is exactly "News"
+    5. Ensure platform_name is exactly "{platform.name}"
     
     Return the clean JSON:
     """,
-    output_key="final_news_results",
-    output_schema=SinglePlatformAnalysisReport,
-    # disallow_transfer_to_parent=True,
-    # disallow_transfer_to_peers=True
-    # generate_content_config=types.GenerateContentConfig(temperature=0.01)
-)
-# news_agent.planner = news_extract_agent.planner = BuiltInPlanner(
-#     thinking_config=types.ThinkingConfig(
-#         thinking_budget=0,
-#     )
-# )
-news_sequential_agent = SequentialAgent(
-    name="news_sequential_agent",
-    description="Runs the news_agent and news_extract_agent sequentially",
-    sub_agents=[news_agent, news_extract_agent]
+        output_key=f"final_{platform.key}_results",
+        output_schema=SinglePlatformAnalysisReport,
+        before_model_callback=before_model,
+        after_model_callback=after_model,
+        disallow_transfer_to_parent=True,
+        disallow_transfer_to_peers=True
+    )
+
+
+def build_platform_pipeline(platform: PlatformConfig):
+    """Agent that produces final_<key>_results for one platform in the configured ANALYSIS_MODE."""
+    if ANALYSIS_MODE == "mapreduce":
+        return MapReducePlatformAgent(
+            name=f"{platform.key}_mapreduce_agent",
+            description=f"Classifies {platform.display_name} mentions in parallel batches",
+            platform_name=platform.name,
+            state_prefix=platform.key,
+            domain=platform.domain,
+            query_hint="" if platform.domain else "news",
+            model=model_analysis,
+            mention_target=platform.mention_budget or MENTION_TARGET,
+            after_agent_callback=publish_platform_results(platform.key),
+        )
+
+    return SequentialAgent(
+        name=f"{platform.key}_sequential_agent",
+        description=f"Runs the {platform.key}_agent and {platform.key}_extract_agent sequentially",
+        sub_agents=[
+            SchemaRetryAgent(
+                name=f"{platform.key}_stream_retry_agent",
+                description=f"Re-prompts the {platform.key}_agent when its streamed output goes off-schema",
+                state_prefix=platform.key,
+                sub_agents=[build_search_agent(platform)],
+            ),
+            build_extract_agent(platform),
+        ],
+        after_agent_callback=publish_platform_results(platform.key),
+    )
+
+
+add_mention_listener(sentiment_rollups.add_mentions)
+add_mention_listener(mention_index.add_mentions)
+add_mention_listener(anomaly_detector.observe_mentions)
+add_mention_listener(broadcaster.on_mentions)
+add_run_listener(snapshot_store.add_run)
+add_run_listener(broadcaster.on_run)
+if WARM_CACHE_ENABLED:
+    add_run_listener(warm_cache.store)
+
+platform_pipelines = {platform.name: build_platform_pipeline(platform) for platform in enabled_platforms()}
+
+platform_fanout = BoundedParallelAgent(
+    name="platform_fanout",
+    description="Searches and analyzes brand mentions across multiple platforms in parallel.",
+    max_concurrency=PLATFORM_CONCURRENCY,
+    sub_agents=list(platform_pipelines.values()),
+    branch_keys={platform_pipelines[platform.name].name: platform.key for platform in enabled_platforms()},
 )
 
-# news_loop_agent = LoopAgent(
-#     name="news_loop_agent",
-#     description="Loop agent for news search",
-#     sub_agents=[news_agent],
-#     max_iterations=2
-# )
-# Create platform search sequential agent
-
-
-root_agent = ParallelAgent(
+root_agent = CoalescingAgent(
     name="mcp_brand_agent",
     description="Searches and analyzes brand mentions across multiple platforms in parallel.",
-    sub_agents=[
-        twitter_sequential_agent,
-        linkedin_sequential_agent,
-        reddit_sequential_agent,
-        news_sequential_agent 
-    ]
-)
\ No newline at end of file
+    sub_agents=[platform_fanout],
+    after_agent_callback=record_run_cost,
+)
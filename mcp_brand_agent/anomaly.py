@@ -0,0 +1,243 @@
+import math
+import os
+import threading
+import urllib.request
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter
+from pydantic import BaseModel
+
+from mcp_brand_agent.brands import normalize_brand
+from mcp_brand_agent.rollups import mention_key
+from mcp_brand_agent.schemas import Mention
+
+ANOMALY_BUCKET_SECONDS = int(os.getenv("ANOMALY_BUCKET_SECONDS", "3600"))
+ANOMALY_ALPHA = float(os.getenv("ANOMALY_ALPHA", "0.2"))
+ANOMALY_Z_THRESHOLD = float(os.getenv("ANOMALY_Z_THRESHOLD", "3.0"))
+ANOMALY_MIN_BUCKETS = int(os.getenv("ANOMALY_MIN_BUCKETS", "3"))
+ANOMALY_MIN_VOLUME = int(os.getenv("ANOMALY_MIN_VOLUME", "5"))
+ANOMALY_CUSUM_SLACK = float(os.getenv("ANOMALY_CUSUM_SLACK", "0.05"))
+ANOMALY_CUSUM_THRESHOLD = float(os.getenv("ANOMALY_CUSUM_THRESHOLD", "0.5"))
+ANOMALY_COOLDOWN_SECONDS = int(os.getenv("ANOMALY_COOLDOWN_SECONDS", "900"))
+ALERT_WEBHOOK_URL = os.getenv("ALERT_WEBHOOK_URL")
+MAX_EMPTY_BUCKETS_FOLDED = 48
+MAX_RECENT_MENTION_KEYS = 50_000
+
+
+class Alert(BaseModel):
+    brand: str
+    platform: str
+    kind: str  # "negative_spike", "negative_shift" or "volume_spike"
+    value: float
+    baseline: float
+    score: float
+    observed_at: datetime
+    message: str
+
+
+class LogAlertSink:
+    def send(self, alert: Alert) -> None:
+        print(f"  [Alert] {alert.message}")
+
+
+class QueueAlertSink:
+    """Keeps the most recent alerts in memory for polling."""
+
+    def __init__(self, maxlen: int = 1000):
+        self.alerts: Deque[Alert] = deque(maxlen=maxlen)
+
+    def send(self, alert: Alert) -> None:
+        self.alerts.append(alert)
+
+    def recent(self, limit: int = 50) -> List[Alert]:
+        return list(self.alerts)[-limit:][::-1]
+
+
+class WebhookAlertSink:
+    """POSTs each alert as JSON from a background thread so detection never waits on the network."""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="alert-webhook")
+
+    def send(self, alert: Alert) -> None:
+        self._executor.submit(self._post, alert.model_dump_json().encode("utf-8"))
+
+    def _post(self, body: bytes) -> None:
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        try:
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+        except OSError as e:
+            print(f"  [Alert] webhook delivery to {self.url} failed: {e}")
+
+
+class Ewma:
+    """Exponentially weighted mean and variance in constant memory."""
+
+    __slots__ = ("alpha", "mean", "var", "count")
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.mean = 0.0
+        self.var = 0.0
+        self.count = 0
+
+    def update(self, value: float) -> None:
+        if self.count == 0:
+            self.mean = value
+        else:
+            diff = value - self.mean
+            increment = self.alpha * diff
+            self.mean += increment
+            self.var = (1 - self.alpha) * (self.var + diff * increment)
+        self.count += 1
+
+    def zscore(self, value: float, min_std: float) -> float:
+        """Standard score of `value`; `min_std` stops a perfectly flat baseline from flagging tiny changes."""
+        return (value - self.mean) / max(math.sqrt(self.var), min_std)
+
+
+class SeriesState:
+    """Detector state for one brand and platform: the open bucket plus baselines of closed ones."""
+
+    __slots__ = ("bucket", "total", "negative", "volume", "negative_fraction", "cusum", "last_alert")
+
+    def __init__(self, bucket: int, alpha: float):
+        self.bucket = bucket
+        self.total = 0
+        self.negative = 0
+        self.volume = Ewma(alpha)
+        self.negative_fraction = Ewma(alpha)
+        self.cusum = 0.0
+        self.last_alert: Dict[str, float] = {}
+
+
+class AnomalyDetector:
+    """Streaming spike detector for negative sentiment and mention volume.
+
+    Mentions are counted into fixed time buckets per brand and platform. Closed buckets feed
+    EWMA baselines, and the open bucket is scored on every arriving batch, so an alert fires
+    as soon as the spike is visible rather than at the end of the bucket. A CUSUM on each
+    batch's negative fraction catches slower drifts the z-score misses.
+    """
+
+    def __init__(self, sinks: Optional[list] = None):
+        self.sinks = sinks if sinks is not None else [LogAlertSink()]
+        self._series: Dict[Tuple[str, str], SeriesState] = {}
+        self._recent_keys: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def observe_mentions(self, brand: str, platform: str, mentions: List[Mention], observed_at: datetime) -> List[Alert]:
+        """Mention listener: score a batch of new mentions and fire any alerts."""
+        fresh = [m for m in mentions if self._is_new(mention_key(brand, platform, m))]
+        if not fresh:
+            return []
+        negative = sum(1 for m in fresh if m.sentiment == "negative")
+        with self._lock:
+            alerts = self._observe(brand, platform, len(fresh), negative, observed_at)
+        for alert in alerts:
+            for sink in self.sinks:
+                sink.send(alert)
+        return alerts
+
+    def _is_new(self, key: str) -> bool:
+        with self._lock:
+            if key in self._recent_keys:
+                return False
+            self._recent_keys[key] = None
+            if len(self._recent_keys) > MAX_RECENT_MENTION_KEYS:
+                self._recent_keys.popitem(last=False)
+            return True
+
+    def _observe(self, brand: str, platform: str, total: int, negative: int, observed_at: datetime) -> List[Alert]:
+        now = observed_at.timestamp()
+        bucket = int(now // ANOMALY_BUCKET_SECONDS)
+        key = (normalize_brand(brand), platform)
+        state = self._series.get(key)
+        if state is None:
+            state = self._series[key] = SeriesState(bucket, ANOMALY_ALPHA)
+        elif bucket > state.bucket:
+            self._close_bucket(state, bucket)
+
+        state.total += total
+        state.negative += negative
+        alerts = []
+
+        def fire(kind, value, baseline, score, message):
+            if now - state.last_alert.get(kind, float("-inf")) < ANOMALY_COOLDOWN_SECONDS:
+                return
+            state.last_alert[kind] = now
+            alerts.append(Alert(
+                brand=brand, platform=platform, kind=kind, value=round(value, 4),
+                baseline=round(baseline, 4), score=round(score, 2), observed_at=observed_at,
+                message=f"{brand} on {platform}: {message}",
+            ))
+
+        batch_fraction = negative / total
+        if state.negative_fraction.count:
+            state.cusum = max(0.0, state.cusum + batch_fraction - state.negative_fraction.mean - ANOMALY_CUSUM_SLACK)
+            if state.cusum > ANOMALY_CUSUM_THRESHOLD:
+                fire("negative_shift", batch_fraction, state.negative_fraction.mean, state.cusum,
+                     f"sustained rise in negative share (CUSUM {state.cusum:.2f})")
+                state.cusum = 0.0
+
+        if state.volume.count >= ANOMALY_MIN_BUCKETS and state.total >= ANOMALY_MIN_VOLUME:
+            fraction = state.negative / state.total
+            z = state.negative_fraction.zscore(fraction, min_std=0.05)
+            if z > ANOMALY_Z_THRESHOLD:
+                fire("negative_spike", fraction, state.negative_fraction.mean, z,
+                     f"negative share {fraction:.0%} vs baseline {state.negative_fraction.mean:.0%} (z={z:.1f})")
+            z = state.volume.zscore(state.total, min_std=1.0)
+            if z > ANOMALY_Z_THRESHOLD:
+                fire("volume_spike", state.total, state.volume.mean, z,
+                     f"{state.total} mentions this bucket vs baseline {state.volume.mean:.1f} (z={z:.1f})")
+        return alerts
+
+    def _close_bucket(self, state: SeriesState, bucket: int) -> None:
+        state.volume.update(state.total)
+        if state.total:
+            state.negative_fraction.update(state.negative / state.total)
+        for _ in range(min(bucket - state.bucket - 1, MAX_EMPTY_BUCKETS_FOLDED)):
+            state.volume.update(0)
+        state.bucket = bucket
+        state.total = 0
+        state.negative = 0
+
+    def baselines(self) -> List[dict]:
+        with self._lock:
+            return [
+                {
+                    "brand": brand,
+                    "platform": platform,
+                    "bucket_volume": state.total,
+                    "volume_mean": round(state.volume.mean, 4),
+                    "negative_fraction_mean": round(state.negative_fraction.mean, 4),
+                    "buckets_seen": state.volume.count,
+                    "cusum": round(state.cusum, 4),
+                }
+                for (brand, platform), state in self._series.items()
+            ]
+
+
+alert_queue = QueueAlertSink()
+alert_sinks = [LogAlertSink(), alert_queue]
+if ALERT_WEBHOOK_URL:
+    alert_sinks.append(WebhookAlertSink(ALERT_WEBHOOK_URL))
+
+anomaly_detector = AnomalyDetector(alert_sinks)
+
+router = APIRouter(prefix="/alerts", tags=["alerts"])
+
+
+@router.get("")
+def list_alerts(limit: int = 50):
+    return alert_queue.recent(limit)
+
+
+@router.get("/baselines")
+def list_baselines():
+    return anomaly_detector.baselines()
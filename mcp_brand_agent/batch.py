@@ -0,0 +1,156 @@
+"""Run the brand analysis pipeline over many brands without the HTTP server.
+
+Reads one request per line from a JSONL file (or stdin) and writes one NDJSON result per
+brand as soon as it finishes:
+
+    python -m mcp_brand_agent.batch brands.jsonl -o results.ndjson --concurrency 4
+
+A request line is either a JSON string ("Nike") or an object with a "brand" and an
+optional "id" and "state". Results are the only thing written to stdout
+with `-o -`; logs go to stderr. Finished ids are appended to a checkpoint file
+(`<output>.checkpoint` by default); re-running the same command skips them, so an
+interrupted batch resumes where it stopped. Only "ok" results are checkpointed: brands
+that failed ("error") or came back without any results ("empty") are retried on the next run.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import time
+from typing import Iterator, Optional, Set, TextIO
+
+from pydantic import BaseModel
+
+from mcp_brand_agent.cassettes import cassette
+from mcp_brand_agent.runner import APP_NAME, get_session_service, run_brand_analysis
+from mcp_brand_agent.warm_cache import cacheable_state
+
+BATCH_USER_ID = "batch"
+
+
+class BatchRequest(BaseModel):
+    id: str
+    brand: str
+    state: Optional[dict] = None
+
+
+def read_requests(lines: Iterator[str]) -> Iterator[BatchRequest]:
+    """Parse request lines lazily; a line without an id is keyed by its line number."""
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError:
+            value = line
+        if isinstance(value, str):
+            value = {"brand": value}
+        if not isinstance(value, dict) or not value.get("brand"):
+            print(f"  [Batch] skipping line {number}: no brand", file=sys.stderr)
+            continue
+        yield BatchRequest(id=str(value.get("id") or f"line-{number}"), brand=value["brand"], state=value.get("state"))
+
+
+class Checkpoint:
+    """Append-only file of finished request ids, flushed after every result."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.done: Set[str] = set()
+        self._file: Optional[TextIO] = None
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.done = {line.strip() for line in f if line.strip()}
+        if path:
+            self._file = open(path, "a")
+
+    def mark(self, request_id: str) -> None:
+        self.done.add(request_id)
+        if self._file:
+            self._file.write(request_id + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file:
+            self._file.close()
+
+
+async def run_one(request: BatchRequest) -> dict:
+    started = time.monotonic()
+    session_id = f"batch-{request.id}-{int(time.time())}"
+    try:
+        state = await run_brand_analysis(request.brand, user_id=BATCH_USER_ID, session_id=session_id, state=request.state)
+    except Exception as e:
+        return {"id": request.id, "brand": request.brand, "status": "error", "error": repr(e),
+                "elapsed_seconds": round(time.monotonic() - started, 3)}
+    finally:
+        await get_session_service().delete_session(app_name=APP_NAME, user_id=BATCH_USER_ID, session_id=session_id)
+    results = {key: value for key, value in cacheable_state(state).items() if key.startswith("final_")}
+    return {"id": request.id, "brand": request.brand, "status": "ok" if results else "empty", "results": results,
+            "elapsed_seconds": round(time.monotonic() - started, 3)}
+
+
+async def run_batch(requests: Iterator[BatchRequest], output: TextIO, checkpoint: Checkpoint,
+                    concurrency: int = 4) -> dict:
+    """Stream `requests` through `concurrency` workers, writing each result as it completes."""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    counts = {"ok": 0, "empty": 0, "error": 0, "skipped": 0}
+
+    async def produce():
+        for request in requests:
+            if request.id in checkpoint.done:
+                counts["skipped"] += 1
+                continue
+            await queue.put(request)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def work():
+        while (request := await queue.get()) is not None:
+            result = await run_one(request)
+            output.write(json.dumps(result, default=str) + "\n")
+            output.flush()
+            counts[result["status"]] += 1
+            if result["status"] == "ok":
+                checkpoint.mark(request.id)
+            print(f"  [Batch] {request.id} {request.brand!r}: {result['status']} in {result['elapsed_seconds']}s",
+                  file=sys.stderr)
+
+    await asyncio.gather(produce(), *(work() for _ in range(concurrency)))
+    return counts
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m mcp_brand_agent.batch", description=__doc__.splitlines()[0])
+    parser.add_argument("input", nargs="?", default="-", help="JSONL file of brand requests, '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="NDJSON output file, appended to; '-' for stdout")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <output>.checkpoint; none for stdout)")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("BATCH_CONCURRENCY", "4")))
+    args = parser.parse_args(argv)
+
+    checkpoint_path = args.checkpoint or (f"{args.output}.checkpoint" if args.output != "-" else None)
+    checkpoint = Checkpoint(checkpoint_path)
+    source = sys.stdin if args.input == "-" else open(args.input)
+    output = sys.stdout if args.output == "-" else open(args.output, "a")
+    try:
+        # Results go to `output`, which may be the real stdout; the pipeline's logs go to stderr.
+        with contextlib.redirect_stdout(sys.stderr):
+            counts = asyncio.run(run_batch(read_requests(source), output, checkpoint, args.concurrency))
+    finally:
+        checkpoint.close()
+        with contextlib.redirect_stdout(sys.stderr):
+            cassette.close()
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    print(f"  [Batch] done: {counts}", file=sys.stderr)
+    return 1 if counts["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
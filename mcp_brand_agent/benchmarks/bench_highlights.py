@@ -0,0 +1,53 @@
+"""Time to cluster thousands of paraphrased ethical highlights for one brand.
+
+    python -m mcp_brand_agent.benchmarks.bench_highlights --highlights 1000 5000 20000
+"""
+import argparse
+import random
+import time
+
+from mcp_brand_agent.highlights import cluster_highlights
+
+PLATFORMS = ["Twitter", "LinkedIn", "Reddit", "News"]
+TOPICS = [
+    ("safety", ["autonomous vehicle", "self-driving car", "driver assistance", "robotaxi"]),
+    ("privacy", ["customer data", "user tracking", "AI training data", "location data"]),
+    ("labor practices", ["factory worker", "warehouse staff", "contractor", "union"]),
+    ("sustainability", ["clean energy", "battery recycling", "carbon emission", "supply chain"]),
+    ("governance", ["board oversight", "regulatory compliance", "executive pay", "shareholder"]),
+]
+TEMPLATES = [
+    "{topic} concerns around {subject}",
+    "Concerns about {topic} of {subject}",
+    "{subject} {topic} under scrutiny",
+    "Public debate on {subject} and {topic}",
+    "Regulators question {topic} in {subject} programs",
+]
+
+
+def synthetic_highlights(count: int, seed: int = 11):
+    rng = random.Random(seed)
+    for i in range(count):
+        topic, subjects = rng.choice(TOPICS)
+        text = rng.choice(TEMPLATES).format(topic=topic, subject=rng.choice(subjects))
+        if rng.random() < 0.3:
+            text += f" ({rng.choice(['report', 'thread', 'analysis', 'op-ed'])} {i % 97})"
+        yield rng.choice(PLATFORMS), text
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--highlights", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--threshold", type=float, default=None)
+    args = parser.parse_args()
+    for count in args.highlights:
+        highlights = list(synthetic_highlights(count))
+        started = time.perf_counter()
+        themes = cluster_highlights(highlights) if args.threshold is None else cluster_highlights(highlights, args.threshold)
+        elapsed = time.perf_counter() - started
+        top = ", ".join(f"{theme.theme!r} x{theme.count}" for theme in themes[:3])
+        print(f"{count:>7} highlights -> {len(themes):>5} themes in {elapsed * 1000:8.1f} ms   top: {top}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Memory and aggregation cost of a list of `Mention` objects versus a MentionTable.
+
+    python -m mcp_brand_agent.benchmarks.bench_mention_table --mentions 100000
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from mcp_brand_agent.mention_table import MentionTableBuilder
+from mcp_brand_agent.schemas import Mention
+
+BRANDS = ["Tesla", "Nike", "Patagonia", "Shein", "Apple"]
+PLATFORMS = ["Twitter", "LinkedIn", "Reddit", "News"]
+SENTIMENTS = ["positive", "negative", "neutral"]
+CONTEXTS = ["labor practices", "environmental impact", "product safety", "data privacy", "executive conduct"]
+
+
+def synthetic_rows(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for i in range(count):
+        date = (start + timedelta(minutes=rng.randrange(365 * 24 * 60))).strftime("%Y-%m-%d")
+        yield (rng.choice(BRANDS), rng.choice(PLATFORMS), Mention(
+            date=date,
+            text=f"Post {i} about {rng.choice(CONTEXTS)} " + "lorem ipsum " * rng.randrange(3, 20),
+            sentiment=rng.choice(SENTIMENTS),
+            ethical_context=rng.choice(CONTEXTS),
+            url=f"https://example.com/post/{i}",
+        ))
+
+
+def measure(build):
+    """Build once untraced for the time (tracemalloc slows allocation-heavy code a lot), once traced for memory."""
+    gc.collect()
+    started = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size, elapsed
+
+
+def best_of(runs: int, fn):
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return result, min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mentions", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    observed_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    rows = list(synthetic_rows(args.mentions))
+    texts = [(brand, platform, m.model_dump()) for brand, platform, m in rows]
+    del rows
+
+    objects, object_bytes, object_seconds = measure(
+        lambda: [(brand, platform, Mention(**fields)) for brand, platform, fields in texts]
+    )
+
+    def build_table():
+        builder = MentionTableBuilder()
+        for brand, platform, fields in texts:
+            builder.add(brand, platform, Mention.model_construct(**fields), observed_at)
+        return builder.build()
+
+    table, table_bytes, table_seconds = measure(build_table)
+
+    def aggregate_objects():
+        counts = Counter()
+        for _, platform, mention in objects:
+            counts[(platform, mention.sentiment)] += 1
+        return counts
+
+    _, loop_seconds = best_of(args.runs, aggregate_objects)
+    _, vector_seconds = best_of(args.runs, lambda: table.sentiment_counts(by="platform"))
+    _, daily_seconds = best_of(args.runs, table.daily_counts)
+    _, filter_seconds = best_of(args.runs, lambda: table.where(brand="Tesla", sentiment="negative").sentiment_counts(by="platform"))
+
+    print(f"mentions={args.mentions}")
+    print(f"memory   list[Mention] {object_bytes / 2**20:8.1f} MiB   MentionTable {table_bytes / 2**20:8.1f} MiB"
+          f"   x{object_bytes / table_bytes:.1f} smaller")
+    print(f"build    list[Mention] {object_seconds:8.3f} s     MentionTable {table_seconds:8.3f} s")
+    print(f"sentiment by platform: python loop {loop_seconds * 1000:8.2f} ms   numpy {vector_seconds * 1000:8.2f} ms"
+          f"   x{loop_seconds / vector_seconds:.0f} faster")
+    print(f"daily counts {daily_seconds * 1000:.2f} ms, filtered counts {filter_seconds * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Throughput of the server with 1, 2 and 4 workers behind the session-affine proxy.
+
+Each request creates a session carrying an output.json-sized state and reads it back,
+which exercises the Pydantic and JSON work that a single process serializes on one core.
+
+    python -m mcp_brand_agent.benchmarks.bench_workers --workers 1 2 4 --requests 400
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def sample_state(copies: int) -> dict:
+    with open(os.path.join(ROOT, "output.json")) as f:
+        report = json.load(f)
+    return {f"copy_{i}": report for i in range(copies)}
+
+
+async def wait_ready(url: str, timeout: float = 180) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{url}/workers", timeout=2)).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError("server did not start")
+
+
+async def drive(url: str, requests: int, concurrency: int, state: dict) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=120, limits=limits) as client:
+
+        async def one(i: int):
+            async with semaphore:
+                created = await client.post("/apps/mcp_brand_agent/users/bench/sessions", json=state)
+                created.raise_for_status()
+                session_id = created.json()["id"]
+                fetched = await client.get(f"/apps/mcp_brand_agent/users/bench/sessions/{session_id}")
+                fetched.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        return requests / (time.perf_counter() - start)
+
+
+def run(workers: int, port: int, requests: int, concurrency: int, state: dict) -> float:
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(port), WORKER_BASE_PORT=str(port + 100))
+    env.setdefault("OPENAI_API_KEY", "benchmark")
+    # WEB_CONCURRENCY=1 still goes through the proxy so every row pays the same hop.
+    server = subprocess.Popen(
+        [sys.executable, "-c", "from mcp_brand_agent import workers; "
+         f"workers.serve(host='127.0.0.1', port={port}, workers={workers})"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}"
+        asyncio.run(wait_ready(url))
+        asyncio.run(drive(url, max(concurrency, requests // 10), concurrency, state))  # warm up
+        return asyncio.run(drive(url, requests, concurrency, state))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--state-copies", type=int, default=20, help="output.json reports per session state")
+    parser.add_argument("--port", type=int, default=18500)
+    args = parser.parse_args()
+
+    state = sample_state(args.state_copies)
+    print(f"cores={os.cpu_count()} state={len(json.dumps(state)) // 1024}KiB "
+          f"requests={args.requests} concurrency={args.concurrency}")
+    baseline = None
+    for workers in args.workers:
+        rate = run(workers, args.port, args.requests, args.concurrency, state)
+        baseline = baseline or rate
+        print(f"workers={workers:<2} {rate:8.1f} sessions/s  x{rate / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+import re
+from typing import Optional
+
+from google.genai import types
+
+
+def brand_from_content(content: Optional[types.Content]) -> str:
+    """Return the brand the user asked about, taken from the text of their message."""
+    if not content or not content.parts:
+        return ""
+    return " ".join(part.text.strip() for part in content.parts if part.text).strip()
+
+
+def normalize_brand(brand: str) -> str:
+    """Canonical key for a brand name: lower-cased with whitespace collapsed."""
+    return re.sub(r"\s+", " ", brand).strip().lower()
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Optional
+
+from litellm import ModelResponse
+
+from mcp_brand_agent.cassettes import CassetteLiteLLMClient, cassette
+from mcp_brand_agent.storage import connect
+
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "900"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "0"))  # 0 disables LLM response caching
+CACHE_MAX_ROWS = int(os.getenv("CACHE_MAX_ROWS", "50000"))
+
+
+def cache_key(*parts: Any) -> str:
+    """Stable hash of JSON-serializable parts."""
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SharedCache:
+    """TTL key-value cache in a SQLite file under DATA_DIR.
+
+    SQLite in WAL mode lets every worker process on the host read and write the
+    same cache, so a search or LLM result computed by one worker is reused by all.
+    """
+
+    def __init__(self, db_name: str = "cache.db", max_rows: int = CACHE_MAX_ROWS):
+        self.db_name = db_name
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = connect(self.db_name)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+        return self._conn
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?", (namespace, key),
+            ).fetchone()
+            if row is None or row["expires_at"] < time.time():
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row["value"])
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value, default=str), time.time() + ttl),
+            )
+            self._writes += 1
+            if self._writes % 500 == 0:
+                self._evict()
+
+    def _evict(self) -> None:
+        self.conn.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+        self.conn.execute(
+            """DELETE FROM cache WHERE rowid IN (
+                   SELECT rowid FROM cache ORDER BY expires_at LIMIT MAX(0, (SELECT COUNT(*) FROM cache) - ?))""",
+            (self.max_rows,),
+        )
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hits / total, 4) if total else 0.0}
+
+
+shared_cache = SharedCache()
+
+
+class CachingLiteLLMClient(CassetteLiteLLMClient):
+    """LiteLLMClient that serves repeated non-streaming completions from the shared cache.
+
+    The cache is bypassed while a cassette is recording or replaying.
+    """
+
+    def __init__(self, ttl: int = LLM_CACHE_TTL):
+        self.ttl = ttl
+
+    async def acompletion(self, model, messages, tools, **kwargs):
+        if not self.ttl or cassette.active:
+            return await super().acompletion(model, messages, tools, **kwargs)
+        response_format = kwargs.get("response_format")
+        if hasattr(response_format, "model_json_schema"):
+            response_format = response_format.model_json_schema()
+        key = cache_key(model, messages, tools, response_format)
+        cached = shared_cache.get("llm", key)
+        if cached is not None:
+            return ModelResponse(**cached)
+        response = await super().acompletion(model, messages, tools, **kwargs)
+        shared_cache.set("llm", key, response.model_dump(warnings=False), self.ttl)
+        return response
@@ -0,0 +1,242 @@
+"""Record and replay of LLM and MCP traffic for offline, repeatable runs of the pipeline.
+
+With CASSETTE_MODE=record every LiteLLM completion (streamed or not) and every MCP search
+made by the process is written, with its timing, to a gzipped NDJSON cassette at
+CASSETTE_PATH. With CASSETTE_MODE=replay the same calls are answered from the cassette
+without network access, after sleeping the recorded latency times CASSETTE_LATENCY_SCALE
+(1 replays the original timings, 0 answers immediately):
+
+    CASSETTE_MODE=record CASSETTE_PATH=nike.cassette python -m mcp_brand_agent.batch brands.jsonl -o out.ndjson
+    CASSETTE_MODE=replay CASSETTE_PATH=nike.cassette python -m mcp_brand_agent.batch brands.jsonl -o replay.ndjson
+
+Calls are matched by a hash of the request (model, messages, tools and response format
+for the LLM; the tool arguments for MCP), so concurrent platform branches replay
+correctly whatever order they run in; identical requests are served in recording order.
+A request missing from the cassette, e.g. after a prompt change, raises CassetteMiss
+unless CASSETTE_ON_MISS=live. The search, LLM and warm report caches are bypassed, and the
+warm cache refresher is not started, while a cassette is active so that every call is
+recorded and replayed. Record with a single worker process: each process writes the
+whole cassette file.
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, Optional
+
+from fastapi import APIRouter
+from google.adk.models.lite_llm import LiteLLMClient
+from litellm import ModelResponse, ModelResponseStream
+
+from mcp_brand_agent.storage import DATA_DIR
+
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off")  # "off", "record" or "replay"
+CASSETTE_PATH = os.getenv("CASSETTE_PATH") or os.path.join(DATA_DIR, "cassettes", "default.cassette")
+CASSETTE_LATENCY_SCALE = float(os.getenv("CASSETTE_LATENCY_SCALE", "1"))
+CASSETTE_ON_MISS = os.getenv("CASSETTE_ON_MISS", "error")  # "error" or "live"
+CASSETTE_VERSION = 1
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode for a request the cassette has no recording of."""
+
+
+class ReplayedError(RuntimeError):
+    """An error the live call raised while recording, raised again on replay."""
+
+
+def request_key(kind: str, *parts: Any) -> str:
+    raw = json.dumps([kind, *parts], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def llm_request_key(model, messages, tools, stream: bool = False, **kwargs) -> str:
+    response_format = kwargs.get("response_format")
+    if hasattr(response_format, "model_json_schema"):
+        response_format = response_format.model_json_schema()
+    return request_key("llm_stream" if stream else "llm", model, messages, tools, response_format)
+
+
+class Cassette:
+    """The cassette of this process: appends interactions when recording, serves them when replaying."""
+
+    def __init__(self, mode: str = CASSETTE_MODE, path: str = CASSETTE_PATH,
+                 latency_scale: float = CASSETTE_LATENCY_SCALE, on_miss: str = CASSETTE_ON_MISS):
+        if mode not in ("off", "record", "replay"):
+            raise ValueError(f"CASSETTE_MODE must be off, record or replay, not {mode!r}")
+        self.mode = mode
+        self.path = path
+        self.latency_scale = latency_scale
+        self.on_miss = on_miss
+        self.counters: Counter = Counter()
+        self._lock = threading.Lock()
+        self._file = None
+        self._opened_at = time.monotonic()
+        self._recorded: Optional[Dict[str, Deque[dict]]] = None
+        self._last: Dict[str, dict] = {}
+
+    @property
+    def active(self) -> bool:
+        return self.mode != "off"
+
+    def _write(self, interaction: dict) -> None:
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._file = gzip.open(self.path, "wt", encoding="utf-8")
+                self._file.write(json.dumps({"version": CASSETTE_VERSION,
+                                             "recorded_at": datetime.now(timezone.utc).isoformat()}) + "\n")
+            self._file.write(json.dumps(interaction, separators=(",", ":"), default=str) + "\n")
+            self._file.flush()  # a sync flush, so a crashed recording is readable up to here
+            self.counters[f"recorded_{interaction['kind']}"] += 1
+
+    def _record(self, kind: str, key: str, name: str, started: float, **fields) -> None:
+        self._write({"kind": kind, "key": key, "name": name, "started": round(started - self._opened_at, 6),
+                     "elapsed": round(time.monotonic() - started, 6), **fields})
+
+    def _load(self) -> Dict[str, Deque[dict]]:
+        if self._recorded is None:
+            recorded: Dict[str, Deque[dict]] = defaultdict(deque)
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                if header.get("version") != CASSETTE_VERSION:
+                    raise ValueError(f"Unsupported cassette version {header.get('version')} in {self.path}")
+                for line in f:
+                    interaction = json.loads(line)
+                    recorded[interaction["key"]].append(interaction)
+            self._recorded = recorded
+            print(f"  [Cassette] replaying {sum(map(len, recorded.values()))} interactions from {self.path}")
+        return self._recorded
+
+    def _next(self, key: str, kind: str, name: str) -> Optional[dict]:
+        """The next recording of `key`; once they are used up the last one is served again."""
+        with self._lock:
+            queue = self._load().get(key)
+            if queue:
+                self._last[key] = queue.popleft()
+            interaction = self._last.get(key)
+        if interaction is None:
+            self.counters[f"missed_{kind}"] += 1
+            if self.on_miss != "live":
+                raise CassetteMiss(f"No recorded {kind} call to {name} matches this request (key {key[:12]})")
+            return None
+        self.counters[f"replayed_{kind}"] += 1
+        return interaction
+
+    def _delay(self, seconds: float) -> float:
+        return max(0.0, seconds * self.latency_scale)
+
+    @staticmethod
+    def _raise(interaction: dict) -> None:
+        error = interaction.get("error")
+        if error is not None:
+            raise ReplayedError(f"{error['type']}: {error['message']}")
+
+    async def call(self, kind: str, key: str, name: str, live: Callable[[], Awaitable[Any]],
+                   encode: Callable[[Any], Any] = lambda value: value,
+                   decode: Callable[[Any], Any] = lambda value: value) -> Any:
+        """Run `live()` (recording its result) or replay its recorded result, according to the mode."""
+        if self.mode == "replay":
+            interaction = self._next(key, kind, name)
+            if interaction is not None:
+                await asyncio.sleep(self._delay(interaction["elapsed"]))
+                self._raise(interaction)
+                return decode(interaction["response"])
+        if self.mode != "record":
+            return await live()
+        started = time.monotonic()
+        try:
+            result = await live()
+        except Exception as e:
+            self._record(kind, key, name, started, error={"type": type(e).__name__, "message": str(e)})
+            raise
+        self._record(kind, key, name, started, response=encode(result))
+        return result
+
+    def stream(self, key: str, name: str, live: Callable[[], Iterator]) -> Iterator:
+        """Streamed completion chunks, live (recorded with their offsets) or replayed with their pacing.
+
+        Chunks are produced by a blocking iterator, as LiteLLM's streaming completion is, so
+        replay paces them with time.sleep to reproduce the same behaviour.
+        """
+        if self.mode == "replay":
+            interaction = self._next(key, "llm_stream", name)
+            if interaction is not None:
+                return self._replay_stream(interaction)
+        if self.mode != "record":
+            return live()
+        return self._record_stream(key, name, live)
+
+    def _replay_stream(self, interaction: dict) -> Iterator:
+        previous = 0.0
+        for offset, chunk in interaction["chunks"]:
+            time.sleep(self._delay(offset - previous))
+            previous = offset
+            yield ModelResponseStream(**chunk)
+        self._raise(interaction)
+
+    def _record_stream(self, key: str, name: str, live: Callable[[], Iterator]) -> Iterator:
+        started = time.monotonic()
+        chunks = []
+        try:
+            for chunk in live():
+                chunks.append([round(time.monotonic() - started, 6), chunk.model_dump(warnings=False)])
+                yield chunk
+        except Exception as e:
+            self._record("llm_stream", key, name, started, chunks=chunks,
+                         error={"type": type(e).__name__, "message": str(e)})
+            raise
+        self._record("llm_stream", key, name, started, chunks=chunks)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                print(f"  [Cassette] recorded to {self.path}: {dict(self.counters)}")
+            elif self._recorded is not None:
+                unused = sum(map(len, self._recorded.values()))
+                print(f"  [Cassette] replay finished: {dict(self.counters)}, {unused} recorded calls unused")
+
+    def metrics(self) -> dict:
+        unused = sum(map(len, self._recorded.values())) if self._recorded is not None else None
+        return {"mode": self.mode, "path": self.path, "latency_scale": self.latency_scale,
+                "on_miss": self.on_miss, "unused": unused, "counters": dict(self.counters)}
+
+
+cassette = Cassette()
+
+
+class CassetteLiteLLMClient(LiteLLMClient):
+    """LiteLLMClient whose completions go through the process cassette when one is active."""
+
+    async def acompletion(self, model, messages, tools, **kwargs):
+        if not cassette.active:
+            return await super().acompletion(model, messages, tools, **kwargs)
+        return await cassette.call(
+            "llm", llm_request_key(model, messages, tools, **kwargs), model,
+            lambda: super(CassetteLiteLLMClient, self).acompletion(model, messages, tools, **kwargs),
+            encode=lambda response: response.model_dump(warnings=False),
+            decode=lambda response: ModelResponse(**response),
+        )
+
+    def completion(self, model, messages, tools, stream=False, **kwargs):
+        if not cassette.active or not stream:
+            return super().completion(model, messages, tools, stream=stream, **kwargs)
+        return cassette.stream(
+            llm_request_key(model, messages, tools, stream=True, **kwargs), model,
+            lambda: super(CassetteLiteLLMClient, self).completion(model, messages, tools, stream=True, **kwargs),
+        )
+
+
+router = APIRouter(prefix="/cassette", tags=["cassette"])
+
+
+@router.get("/metrics")
+def cassette_metrics():
+    return cassette.metrics()
@@ -0,0 +1,204 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from mcp_brand_agent.admission import AdmissionRejected, admission_controller
+from mcp_brand_agent.brands import normalize_brand
+from mcp_brand_agent.mention_table import SENTIMENT_CODES, SENTIMENTS, MentionTable
+from mcp_brand_agent.platforms import enabled_platforms
+from mcp_brand_agent.runner import run_brand_analysis
+from mcp_brand_agent.search_index import mention_index
+from mcp_brand_agent.warm_cache import BYPASS_CACHE_STATE_KEY
+
+COMPARE_MAX_BRANDS = int(os.getenv("COMPARE_MAX_BRANDS", "10"))
+COMPARE_DEFAULT_DAYS = int(os.getenv("COMPARE_DEFAULT_DAYS", "30"))
+
+
+class ComparisonRequest(BaseModel):
+    brands: List[str] = Field(min_length=2)
+    days: int = COMPARE_DEFAULT_DAYS
+    fresh: bool = False  # run every brand's pipeline first instead of only those without stored mentions
+
+
+class BrandComparison(BaseModel):
+    brand: str
+    mentions: int
+    share_of_voice: float
+    sentiment: Dict[str, float]
+    net_sentiment: float
+    net_sentiment_delta: float  # versus the first (focal) brand
+    unique_themes: List[str]
+
+
+class PlatformComparison(BaseModel):
+    platform: str
+    mentions: Dict[str, int]
+    share_of_voice: Dict[str, float]
+    net_sentiment: Dict[str, Optional[float]]
+    net_sentiment_delta: Dict[str, Optional[float]]
+
+
+class ComparisonReport(BaseModel):
+    focal_brand: str
+    since: str
+    until: str
+    brands: List[BrandComparison]
+    platforms: List[PlatformComparison]
+    shared_themes: Dict[str, List[str]]  # theme -> brands mentioning it, for themes of two or more brands
+    refreshed: List[str]
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / np.maximum(denominator, 1), np.nan)
+
+
+def _rounded(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+def comparison_matrices(table: MentionTable, brands: List[str], platforms: List[str]) -> Dict[str, np.ndarray]:
+    """Count cubes for `brands` from one pass over the table.
+
+    `counts` is platform x brand x sentiment and `themes` is brand x theme, each built with a
+    single bincount over the table's code columns after remapping them to the requested
+    brand and platform order; rows of other brands or platforms are dropped.
+    """
+    brand_index = {normalize_brand(brand): i for i, brand in enumerate(brands)}
+    platform_index = {platform: i for i, platform in enumerate(platforms)}
+    brand_of_code = np.array([brand_index.get(normalize_brand(value), -1) for value in table.brands.values] or [-1])
+    platform_of_code = np.array([platform_index.get(value, -1) for value in table.platforms.values] or [-1])
+    theme_names = sorted({value.strip().lower() for value in table.contexts.values})
+    theme_index = {name: i for i, name in enumerate(theme_names)}
+    theme_of_code = np.array([theme_index[value.strip().lower()] for value in table.contexts.values] or [0])
+
+    columns = table.to_numpy()
+    brand_rows = brand_of_code[columns["brand_codes"].astype(np.int64)]
+    platform_rows = platform_of_code[columns["platform_codes"].astype(np.int64)]
+    keep = (brand_rows >= 0) & (platform_rows >= 0)
+    brand_rows, platform_rows = brand_rows[keep], platform_rows[keep]
+    sentiments = columns["sentiment_codes"][keep].astype(np.int64)
+    themes = theme_of_code[columns["context_codes"][keep].astype(np.int64)]
+
+    sizes = (len(platforms), len(brands), len(SENTIMENTS))
+    counts = np.bincount((platform_rows * len(brands) + brand_rows) * len(SENTIMENTS) + sentiments,
+                         minlength=int(np.prod(sizes))).reshape(sizes)
+    theme_counts = np.bincount(brand_rows * len(theme_names) + themes,
+                               minlength=len(brands) * len(theme_names)).reshape(len(brands), len(theme_names))
+    return {"counts": counts, "themes": theme_counts, "theme_names": np.array(theme_names, dtype=object)}
+
+
+def compare_table(table: MentionTable, brands: List[str], platforms: List[str]) -> dict:
+    """Share of voice, sentiment, deltas against brands[0] and shared/unique themes, all from array arithmetic."""
+    matrices = comparison_matrices(table, brands, platforms)
+    counts, theme_counts, theme_names = matrices["counts"], matrices["themes"], matrices["theme_names"]
+
+    per_platform = counts.sum(axis=2)  # platform x brand
+    per_brand = counts.sum(axis=0)  # brand x sentiment
+    brand_totals = per_brand.sum(axis=1)
+    platform_share = _ratio(per_platform, per_platform.sum(axis=1, keepdims=True))
+    brand_share = _ratio(brand_totals, np.array(brand_totals.sum()))
+    brand_fractions = _ratio(per_brand, brand_totals[:, None])
+    positive, negative = SENTIMENT_CODES["positive"], SENTIMENT_CODES["negative"]
+    platform_net = _ratio(counts[:, :, positive] - counts[:, :, negative], per_platform)
+    brand_net = brand_fractions[:, positive] - brand_fractions[:, negative]
+    platform_delta = platform_net - platform_net[:, :1]
+    brand_delta = brand_net - brand_net[0]
+
+    present = theme_counts > 0  # brand x theme
+    brands_per_theme = present.sum(axis=0)
+    unique = present & (brands_per_theme == 1)
+
+    return {
+        "brands": [
+            BrandComparison(
+                brand=brand,
+                mentions=int(brand_totals[b]),
+                share_of_voice=_rounded(brand_share[b]) or 0.0,
+                sentiment={s: _rounded(brand_fractions[b, i]) or 0.0 for i, s in enumerate(SENTIMENTS)},
+                net_sentiment=_rounded(brand_net[b]) or 0.0,
+                net_sentiment_delta=_rounded(brand_delta[b]) or 0.0,
+                unique_themes=theme_names[unique[b]].tolist(),
+            )
+            for b, brand in enumerate(brands)
+        ],
+        "platforms": [
+            PlatformComparison(
+                platform=platform,
+                mentions={brand: int(per_platform[p, b]) for b, brand in enumerate(brands)},
+                share_of_voice={brand: _rounded(platform_share[p, b]) or 0.0 for b, brand in enumerate(brands)},
+                net_sentiment={brand: _rounded(platform_net[p, b]) for b, brand in enumerate(brands)},
+                net_sentiment_delta={brand: _rounded(platform_delta[p, b]) for b, brand in enumerate(brands)},
+            )
+            for p, platform in enumerate(platforms)
+        ],
+        "shared_themes": {
+            str(theme_names[t]): [brands[b] for b in np.flatnonzero(present[:, t])]
+            for t in np.argsort(-brands_per_theme, kind="stable") if brands_per_theme[t] >= 2
+        },
+    }
+
+
+async def refresh_brands(brands: List[str], bypass_cache: bool) -> None:
+    """Run the pipeline for `brands` concurrently, each in a normal-priority admission slot.
+
+    Completed runs feed the mention index through the run's mention listeners. A brand
+    whose pipeline fails is logged and compared on whatever is already stored; admission
+    rejections are re-raised so the caller can answer 429.
+    """
+    async def refresh(brand: str) -> None:
+        async with admission_controller.slot("normal"):
+            await run_brand_analysis(brand, user_id="compare",
+                                     state={BYPASS_CACHE_STATE_KEY: True} if bypass_cache else None)
+
+    results = await asyncio.gather(*(refresh(brand) for brand in brands), return_exceptions=True)
+    for brand, result in zip(brands, results):
+        if isinstance(result, AdmissionRejected):
+            raise result
+        if isinstance(result, BaseException):
+            print(f"  [Compare] refreshing {brand!r} failed: {result}")
+
+
+async def compare_brands(request: ComparisonRequest) -> ComparisonReport:
+    brands: List[str] = []
+    for brand in request.brands:
+        if brand.strip() and normalize_brand(brand) not in {normalize_brand(seen) for seen in brands}:
+            brands.append(brand.strip())
+    if not brands:
+        raise HTTPException(status_code=422, detail="At least one brand name must not be blank")
+    until = datetime.now(timezone.utc)
+    since = until - timedelta(days=request.days)
+    platforms = [platform.name for platform in enabled_platforms()]
+
+    table = await asyncio.to_thread(mention_index.load_table, since=since, until=until, brands=brands)
+    stored = {normalize_brand(value) for value in table.brands.values}
+    refreshed = brands if request.fresh else [brand for brand in brands if normalize_brand(brand) not in stored]
+    if refreshed:
+        print(f"  [Compare] running the pipeline for {refreshed}")
+        await refresh_brands(refreshed, bypass_cache=request.fresh)
+        table = await asyncio.to_thread(mention_index.load_table, since=since, until=until, brands=brands)
+
+    return ComparisonReport(
+        focal_brand=brands[0], since=since.isoformat(), until=until.isoformat(), refreshed=refreshed,
+        **compare_table(table, brands, platforms),
+    )
+
+
+router = APIRouter(prefix="/compare", tags=["compare"])
+
+
+@router.post("", response_model=ComparisonReport)
+async def compare(request: ComparisonRequest):
+    """Compare the first brand with its competitors across platforms, running pipelines for brands without data."""
+    if len(request.brands) > COMPARE_MAX_BRANDS:
+        raise HTTPException(status_code=422, detail=f"At most {COMPARE_MAX_BRANDS} brands can be compared")
+    try:
+        return await compare_brands(request)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=f"Server busy: {e.reason}",
+                            headers={"Retry-After": str(e.retry_after)})
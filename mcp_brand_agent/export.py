@@ -0,0 +1,340 @@
+"""Columnar export of stored mention and report history for warehouse loading.
+
+Streams the mention index (mentions.db) and the per-platform rows of every report
+snapshot (snapshots.db) into hive-partitioned Parquet or Arrow IPC files:
+
+    <output>/mentions/brand=<brand>/date=<YYYY-MM-DD>/part-<run>-<n>.parquet
+    <output>/reports/brand=<brand>/date=<YYYY-MM-DD>/part-<run>-<n>.parquet
+
+    python -m mcp_brand_agent.export -o warehouse/ --format parquet
+
+Rows are read EXPORT_CHUNK_ROWS at a time, so memory stays at one chunk plus the open
+writers whatever the size of the history. Each table keeps a watermark per output
+directory (the last exported row id, in exports.db); the next run exports only rows
+added since, unless --full is given. Files are written under hidden temporary names
+and renamed, and the watermark advanced, only once the whole table has been written: an
+interrupted export leaves no partial files and is redone from the old watermark.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi import APIRouter, Header, HTTPException
+from pydantic import BaseModel
+
+from mcp_brand_agent.admin import check_admin_token
+from mcp_brand_agent.brands import normalize_brand
+from mcp_brand_agent.search_index import mention_index
+from mcp_brand_agent.snapshots import SENTIMENTS, snapshot_store
+from mcp_brand_agent.storage import connect, data_path
+
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "10000"))
+EXPORT_MAX_OPEN_FILES = int(os.getenv("EXPORT_MAX_OPEN_FILES", "32"))  # partitions written at once
+EXPORT_FORMAT = os.getenv("EXPORT_FORMAT", "parquet")  # "parquet" or "arrow" (Arrow IPC file)
+EXPORT_COMPRESSION = os.getenv("EXPORT_COMPRESSION", "zstd")
+FORMAT_EXTENSIONS = {"parquet": "parquet", "arrow": "arrow"}
+IPC_CODECS = {"lz4", "zstd"}  # the only codecs Arrow IPC files support
+
+TIMESTAMP = pa.timestamp("s", tz="UTC")
+
+MENTIONS_SCHEMA = pa.schema([
+    ("mention_id", pa.int64()),
+    ("brand", pa.string()),
+    ("platform", pa.string()),
+    ("date", pa.string()),  # as reported by the platform, e.g. "2 days ago"
+    ("mentioned_at", TIMESTAMP),  # `date` resolved against the time it was observed
+    ("sentiment", pa.string()),
+    ("ethical_context", pa.string()),
+    ("url", pa.string()),
+    ("text", pa.string()),
+    ("indexed_at", TIMESTAMP),
+])
+
+REPORTS_SCHEMA = pa.schema([
+    ("snapshot_id", pa.int64()),
+    ("brand", pa.string()),
+    ("version", pa.int32()),
+    ("created_at", TIMESTAMP),
+    ("platform", pa.string()),
+    ("total_mentions", pa.int32()),
+    *[(sentiment, pa.float64()) for sentiment in SENTIMENTS],  # SentimentBreakdown fractions
+    ("ethical_highlights", pa.list_(pa.string())),
+    ("stored_mentions", pa.int32()),
+])
+
+
+def _utc(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def _pending(path: str) -> str:
+    """In-progress name of an export file; the leading dot hides it from dataset readers."""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.tmp")
+
+
+def _partition(brand_key: str, timestamp: float) -> str:
+    return os.path.join(f"brand={quote(brand_key, safe='')}", f"date={_utc(timestamp).date().isoformat()}")
+
+
+def mention_chunks(after_id: int, chunk_rows: int, brand: Optional[str] = None) -> Iterator[Tuple[int, List[Tuple[str, dict]]]]:
+    """(last id, [(partition, row)]) for each chunk of indexed mentions after `after_id`."""
+    while True:
+        rows = mention_index.rows_after(after_id, chunk_rows, brand)
+        if not rows:
+            return
+        after_id = rows[-1]["id"]
+        yield after_id, [
+            (_partition(row["brand_key"], row["ts"]), {
+                "mention_id": row["id"], "brand": row["brand"], "platform": row["platform"], "date": row["date"],
+                "mentioned_at": _utc(row["ts"]), "sentiment": row["sentiment"],
+                "ethical_context": row["ethical_context"], "url": row["url"], "text": row["text"],
+                "indexed_at": _utc(row["indexed_at"]),
+            })
+            for row in rows
+        ]
+
+
+def report_chunks(after_id: int, chunk_rows: int, brand: Optional[str] = None) -> Iterator[Tuple[int, List[Tuple[str, dict]]]]:
+    """(last id, [(partition, row)]) for each chunk of snapshots after `after_id`, one row per platform."""
+    while True:
+        snapshots = snapshot_store.documents_after(after_id, chunk_rows, brand)
+        if not snapshots:
+            return
+        after_id = snapshots[-1][0]["id"]
+        yield after_id, [
+            (_partition(row["brand_key"], row["created_at"]), {
+                "snapshot_id": row["id"], "brand": row["brand"], "version": row["version"],
+                "created_at": _utc(row["created_at"]), "platform": platform,
+                "total_mentions": report["total_mentions"],
+                **{sentiment: report["sentiment"][sentiment] for sentiment in SENTIMENTS},
+                "ethical_highlights": report["highlights"], "stored_mentions": len(report["mentions"]),
+            })
+            for row, document in snapshots
+            for platform, report in sorted(document.items())
+        ]
+
+
+TABLES: Dict[str, Tuple[pa.Schema, Callable]] = {
+    "mentions": (MENTIONS_SCHEMA, mention_chunks),
+    "reports": (REPORTS_SCHEMA, report_chunks),
+}
+
+
+class PartitionedWriter:
+    """Writers for the partitions of one table, at most EXPORT_MAX_OPEN_FILES open at a time.
+
+    When the limit is reached the least recently written partition is closed; writing to
+    it again starts its next part file. Files keep a hidden in-progress name until commit().
+    """
+
+    def __init__(self, directory: str, schema: pa.Schema, fmt: str, run_id: str,
+                 max_open: int = EXPORT_MAX_OPEN_FILES):
+        self.directory = directory
+        self.schema = schema
+        self.fmt = fmt
+        self.run_id = run_id
+        self.max_open = max_open
+        self.rows = 0
+        self.files: List[str] = []
+        self._writers: "OrderedDict[str, object]" = OrderedDict()
+        self._parts: Dict[str, int] = defaultdict(int)
+
+    def _open(self, partition: str):
+        directory = os.path.join(self.directory, partition)
+        os.makedirs(directory, exist_ok=True)
+        part = self._parts[partition]
+        self._parts[partition] += 1
+        path = os.path.join(directory, f"part-{self.run_id}-{part:04d}.{FORMAT_EXTENSIONS[self.fmt]}")
+        self.files.append(path)
+        if self.fmt == "parquet":
+            return pq.ParquetWriter(_pending(path), self.schema, compression=EXPORT_COMPRESSION)
+        return pa.ipc.new_file(_pending(path), self.schema,
+                               options=pa.ipc.IpcWriteOptions(
+                                   compression=EXPORT_COMPRESSION if EXPORT_COMPRESSION in IPC_CODECS else None))
+
+    def write(self, partition: str, rows: List[dict]) -> None:
+        writer = self._writers.pop(partition, None)
+        if writer is None:
+            if len(self._writers) >= self.max_open:
+                self._writers.popitem(last=False)[1].close()
+            writer = self._open(partition)
+        self._writers[partition] = writer
+        writer.write_table(pa.Table.from_pylist(rows, schema=self.schema))
+        self.rows += len(rows)
+
+    def commit(self) -> None:
+        while self._writers:
+            self._writers.popitem()[1].close()
+        for path in self.files:
+            os.replace(_pending(path), path)
+
+    def abort(self) -> None:
+        while self._writers:
+            try:
+                self._writers.popitem()[1].close()
+            except Exception:
+                pass
+        for path in self.files:
+            if os.path.exists(_pending(path)):
+                os.remove(_pending(path))
+
+
+class ExportWatermarks:
+    """Last exported row id per (output directory, table, brand filter), in exports.db."""
+
+    def __init__(self, db_name: str = "exports.db"):
+        self.db_name = db_name
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = connect(self.db_name)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS watermarks (
+                    destination TEXT NOT NULL,
+                    table_name TEXT NOT NULL,
+                    brand_key TEXT NOT NULL,
+                    last_id INTEGER NOT NULL,
+                    rows INTEGER NOT NULL,
+                    exported_at REAL NOT NULL,
+                    PRIMARY KEY (destination, table_name, brand_key)
+                );
+            """)
+        return self._conn
+
+    def get(self, destination: str, table: str, brand_key: str = "") -> int:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT last_id FROM watermarks WHERE destination = ? AND table_name = ? AND brand_key = ?",
+                (destination, table, brand_key),
+            ).fetchone()
+        return row["last_id"] if row else 0
+
+    def advance(self, destination: str, table: str, brand_key: str, last_id: int, rows: int) -> None:
+        with self._lock:
+            self.conn.execute(
+                """INSERT INTO watermarks (destination, table_name, brand_key, last_id, rows, exported_at)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (destination, table_name, brand_key)
+                   DO UPDATE SET last_id = excluded.last_id, rows = watermarks.rows + excluded.rows,
+                                 exported_at = excluded.exported_at""",
+                (destination, table, brand_key, last_id, rows, time.time()),
+            )
+
+    def list(self) -> List[dict]:
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM watermarks ORDER BY destination, table_name, brand_key").fetchall()
+        return [{**dict(row), "exported_at": _utc(row["exported_at"]).isoformat()} for row in rows]
+
+
+export_watermarks = ExportWatermarks()
+_export_lock = threading.Lock()
+
+
+def export_table(table: str, output_dir: str, fmt: str = EXPORT_FORMAT, full: bool = False,
+                 brand: Optional[str] = None, chunk_rows: int = EXPORT_CHUNK_ROWS) -> dict:
+    """Export one table's rows added since its watermark (all rows when `full`) into `output_dir`/<table>."""
+    if table not in TABLES:
+        raise ValueError(f"Unknown table {table!r}; expected one of {sorted(TABLES)}")
+    if fmt not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {sorted(FORMAT_EXTENSIONS)}")
+    destination = os.path.abspath(output_dir)
+    brand_key = normalize_brand(brand) if brand else ""
+    after_id = 0 if full else export_watermarks.get(destination, table, brand_key)
+    schema, chunks = TABLES[table]
+    writer = PartitionedWriter(os.path.join(destination, table), schema, fmt,
+                               run_id=f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{after_id}")
+    started = time.perf_counter()
+    last_id = after_id
+    try:
+        for last_id, rows in chunks(after_id, chunk_rows, brand):
+            by_partition: Dict[str, List[dict]] = defaultdict(list)
+            for partition, row in rows:
+                by_partition[partition].append(row)
+            for partition, partition_rows in by_partition.items():
+                writer.write(partition, partition_rows)
+        writer.commit()
+    except BaseException:
+        writer.abort()
+        raise
+    if last_id != after_id:
+        export_watermarks.advance(destination, table, brand_key, last_id, writer.rows)
+    summary = {"table": table, "format": fmt, "from_id": after_id, "to_id": last_id, "rows": writer.rows,
+               "files": [os.path.relpath(path, destination) for path in writer.files],
+               "seconds": round(time.perf_counter() - started, 3)}
+    print(f"  [Export] {table}: {writer.rows} rows in {len(writer.files)} files (ids {after_id}..{last_id})")
+    return summary
+
+
+def export_history(output_dir: str, tables: Optional[List[str]] = None, fmt: str = EXPORT_FORMAT,
+                   full: bool = False, brand: Optional[str] = None, chunk_rows: int = EXPORT_CHUNK_ROWS) -> List[dict]:
+    """Export each of `tables` (all by default); one export runs at a time per process."""
+    if not _export_lock.acquire(blocking=False):
+        raise RuntimeError("Another export is already running")
+    try:
+        return [export_table(table, output_dir, fmt, full, brand, chunk_rows) for table in tables or list(TABLES)]
+    finally:
+        _export_lock.release()
+
+
+class ExportRequest(BaseModel):
+    name: str = "default"  # subdirectory of DATA_DIR/exports to write to
+    tables: Optional[List[str]] = None
+    format: str = EXPORT_FORMAT
+    full: bool = False
+    brand: Optional[str] = None
+
+
+def exports_dir(name: str) -> str:
+    return data_path(os.path.join("exports", os.path.basename(name) or "default"))
+
+
+router = APIRouter(prefix="/admin/exports", tags=["admin"])
+
+
+@router.post("")
+def run_export(request: ExportRequest, x_admin_token: Optional[str] = Header(None)):
+    """Incrementally export mention and report history under DATA_DIR/exports/<name>."""
+    check_admin_token(x_admin_token)
+    try:
+        return {"output_dir": exports_dir(request.name), "tables": export_history(
+            exports_dir(request.name), request.tables, request.format, request.full, request.brand,
+        )}
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/watermarks")
+def list_watermarks(x_admin_token: Optional[str] = Header(None)):
+    check_admin_token(x_admin_token)
+    return export_watermarks.list()
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m mcp_brand_agent.export", description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", required=True, help="output directory; one subdirectory per table")
+    parser.add_argument("--tables", nargs="+", choices=sorted(TABLES), help="tables to export (default: all)")
+    parser.add_argument("--format", choices=sorted(FORMAT_EXTENSIONS), default=EXPORT_FORMAT)
+    parser.add_argument("--full", action="store_true", help="export everything, ignoring the watermark")
+    parser.add_argument("--brand", help="only this brand (tracked with its own watermark)")
+    parser.add_argument("--chunk-rows", type=int, default=EXPORT_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+    export_history(args.output, args.tables, args.format, args.full, args.brand, args.chunk_rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
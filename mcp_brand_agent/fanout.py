@@ -0,0 +1,121 @@
+import asyncio
+from typing import AsyncGenerator, Dict, List
+
+from google.adk.agents import BaseAgent, SequentialAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from mcp_brand_agent.brands import brand_from_content
+from mcp_brand_agent.listeners import publish_platform_results
+from mcp_brand_agent.metering import BudgetExceededError, usage_meter
+from mcp_brand_agent.resume import (
+    EXTRACT, FULL, SKIP, branch_status, branch_status_key, cleared_results, is_resume, resume_plan,
+)
+
+
+def branch_context(agent: BaseAgent, sub_agent: BaseAgent, ctx: InvocationContext) -> InvocationContext:
+    """Copy of `ctx` on its own branch, as ParallelAgent gives each sub-agent."""
+    ctx = ctx.model_copy()
+    suffix = f"{agent.name}.{sub_agent.name}"
+    ctx.branch = f"{ctx.branch}.{suffix}" if ctx.branch else suffix
+    return ctx
+
+
+async def merge_runs(runs: List[AsyncGenerator[Event, None]]) -> AsyncGenerator[Event, None]:
+    """Interleave event generators as their events arrive.
+
+    Each generator only moves on once its previous event has been yielded (and so
+    processed by the runner), as with ParallelAgent.
+    """
+    tasks = [asyncio.ensure_future(run.__anext__()) for run in runs]
+    pending = set(tasks)
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            try:
+                event = task.result()
+            except StopAsyncIteration:
+                continue
+            yield event
+            i = tasks.index(task)
+            tasks[i] = asyncio.ensure_future(runs[i].__anext__())
+            pending.add(tasks[i])
+
+
+class BoundedParallelAgent(BaseAgent):
+    """ParallelAgent that runs at most `max_concurrency` branches at once.
+
+    Branches start in sub_agents order, so list them highest priority first. A branch that
+    runs out of budget is stopped on its own; the other branches keep going.
+
+    Sub-agents named in `branch_keys` record their outcome in `<platform key>_branch_status`.
+    When the brand is sent again to a session whose previous run had a failed branch, the
+    run resumes: branches with valid final results are skipped, and a SequentialAgent branch
+    whose raw `<key>_results` were saved only re-runs its last (extract) agent. A branch's
+    results are cleared as it starts, so a run never resumes from another run's output.
+    """
+
+    max_concurrency: int = 4
+    branch_keys: Dict[str, str] = {}  # sub-agent name -> platform key
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        usage_meter.start_run(ctx.invocation_id, ctx.session.id)
+        brand = brand_from_content(ctx.user_content)
+        plan: Dict[str, str] = {}
+        if self.branch_keys and is_resume(ctx.session.state, brand, list(self.branch_keys.values())):
+            plan = resume_plan(
+                ctx.session.state, brand, list(self.branch_keys.values()),
+                {key: isinstance(agent, SequentialAgent)
+                 for agent in self.sub_agents if (key := self.branch_keys.get(agent.name))},
+            )
+            print(f"  [Resume] {brand!r}: {plan}")
+
+        def status_event(branch_ctx: InvocationContext, sub_agent: BaseAgent, key: str, status: str,
+                         error: str = None, text: str = None) -> Event:
+            return Event(
+                invocation_id=ctx.invocation_id,
+                author=sub_agent.name,
+                branch=branch_ctx.branch,
+                content=types.Content(role="model", parts=[types.Part(text=text)]) if text else None,
+                actions=EventActions(state_delta={
+                    branch_status_key(key): branch_status(brand, status, ctx.invocation_id, error),
+                }),
+            )
+
+        async def gated(sub_agent: BaseAgent) -> AsyncGenerator[Event, None]:
+            branch_ctx = branch_context(self, sub_agent, ctx)
+            key = self.branch_keys.get(sub_agent.name)
+            mode = plan.get(key, FULL)
+            if mode == SKIP:
+                return
+            agent = sub_agent.sub_agents[-1] if mode == EXTRACT else sub_agent
+            async with semaphore:
+                if key:
+                    event = status_event(branch_ctx, sub_agent, key, "running")
+                    event.actions.state_delta.update(cleared_results(key, keep_raw=mode == EXTRACT))
+                    yield event
+                try:
+                    async for event in agent.run_async(branch_ctx):
+                        yield event
+                except BudgetExceededError as e:
+                    print(f"  [Budget] stopping {sub_agent.name}: {e}")
+                    event = status_event(branch_ctx, sub_agent, key or e.platform_key, "budget_exceeded", str(e),
+                                         text=f"Stopped: {e}")
+                    event.actions.state_delta[f"{e.platform_key}_budget_exceeded"] = str(e)
+                    yield event
+                except Exception as e:
+                    if key:
+                        yield status_event(branch_ctx, sub_agent, key, "failed", repr(e))
+                    raise
+                else:
+                    if mode == EXTRACT:
+                        # The branch agent's own after_agent_callback did not run; publish like it would.
+                        publish_platform_results(key)(CallbackContext(branch_ctx))
+                    if key:
+                        yield status_event(branch_ctx, sub_agent, key, "succeeded")
+
+        async for event in merge_runs([gated(sub_agent) for sub_agent in self.sub_agents]):
+            yield event
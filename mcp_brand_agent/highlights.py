@@ -0,0 +1,194 @@
+import os
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from mcp_brand_agent.mapreduce import STOPWORDS
+from mcp_brand_agent.snapshots import snapshot_store
+
+HIGHLIGHT_HASH_DIM = int(os.getenv("HIGHLIGHT_HASH_DIM", "2048"))
+HIGHLIGHT_SIMILARITY = float(os.getenv("HIGHLIGHT_SIMILARITY", "0.45"))
+HIGHLIGHT_BLOCK_ROWS = 512  # rows of the similarity matrix computed at once
+MAX_VARIANTS = 10
+CHAR_NGRAM = 4
+CHAR_NGRAM_WEIGHT = 0.3  # character n-grams catch inflections; whole words and bigrams carry the meaning
+
+HIGHLIGHT_STOPWORDS = STOPWORDS | {"of", "to", "in", "on", "or", "a", "an", "is", "as", "by", "at", "around", "relating"}
+
+
+class HighlightTheme(BaseModel):
+    theme: str
+    count: int
+    platforms: List[str]
+    variants: List[str]
+
+
+def normalize_highlight(text: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def highlight_features(text: str) -> List[Tuple[str, float]]:
+    """Weighted features of a highlight: content words, word bigrams and character n-grams of the words."""
+    words = [word[:-1] if len(word) > 4 and word.endswith("s") else word
+             for word in normalize_highlight(text).split() if word not in HIGHLIGHT_STOPWORDS]
+    features = [(f"w:{word}", 1.0) for word in words]
+    features += [(f"b:{a} {b}", 1.0) for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f" {word} "
+        features += [(f"c:{padded[i:i + CHAR_NGRAM]}", CHAR_NGRAM_WEIGHT) for i in range(len(padded) - CHAR_NGRAM + 1)]
+    return features
+
+
+def hash_vectors(texts: List[str], dim: int = HIGHLIGHT_HASH_DIM) -> np.ndarray:
+    """L2-normalized TF-IDF vectors of hashed features, one float32 row per text.
+
+    IDF is computed over `texts` themselves, so words every platform repeats (such as the
+    brand's industry) count for little when comparing highlights.
+    """
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    buckets: Dict[str, int] = {}
+    for row, text in enumerate(texts):
+        for feature, weight in highlight_features(text):
+            bucket = buckets.get(feature)
+            if bucket is None:
+                bucket = buckets[feature] = zlib.crc32(feature.encode("utf-8")) % dim
+            vectors[row, bucket] += weight
+    np.log1p(vectors, out=vectors)
+    document_frequency = np.count_nonzero(vectors, axis=0)
+    vectors *= (np.log((1 + len(texts)) / (1 + document_frequency)) + 1).astype(np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    vectors /= norms
+    return vectors
+
+
+def assign_clusters(vectors: np.ndarray, weights: np.ndarray, threshold: float) -> np.ndarray:
+    """Cluster label of every row, by a single pass of nearest-centroid assignment.
+
+    Rows are visited in order, a block of HIGHLIGHT_BLOCK_ROWS at a time: each row joins the
+    cluster whose (weighted) centroid it is most similar to if that reaches `threshold`,
+    otherwise it starts a new cluster. This is not agglomerative: clusters are never merged
+    and the result depends on row order, so callers pass rows in a canonical order.
+    Comparing against centroids rather than individual members keeps a run of
+    pairwise-similar highlights from chaining unrelated themes together, and the work is a
+    matrix product per block against the current centroids.
+    """
+    rows, dim = vectors.shape
+    labels = np.empty(rows, dtype=np.int64)
+    sums = np.zeros((min(rows, HIGHLIGHT_BLOCK_ROWS), dim), dtype=np.float32)
+    centroids = np.zeros_like(sums)
+    clusters = 0
+
+    def add(row: int, cluster: int) -> None:
+        labels[row] = cluster
+        sums[cluster] += weights[row] * vectors[row]
+        centroids[cluster] = sums[cluster] / max(np.linalg.norm(sums[cluster]), 1e-12)
+
+    for start in range(0, rows, HIGHLIGHT_BLOCK_ROWS):
+        block = vectors[start:start + HIGHLIGHT_BLOCK_ROWS]
+        known = clusters
+        if known:
+            similarities = block @ centroids[:known].T
+            best = similarities.argmax(axis=1)
+            matched = similarities[np.arange(len(block)), best] >= threshold
+        else:
+            best = np.zeros(len(block), dtype=np.int64)
+            matched = np.zeros(len(block), dtype=bool)
+        for offset in range(len(block)):
+            row = start + offset
+            if matched[offset]:
+                add(row, int(best[offset]))
+                continue
+            # Clusters started earlier in this block were not in the block's matrix product.
+            if clusters > known:
+                fresh = centroids[known:clusters] @ vectors[row]
+                if fresh.max() >= threshold:
+                    add(row, known + int(fresh.argmax()))
+                    continue
+            if clusters == len(sums):
+                sums = np.concatenate([sums, np.zeros_like(sums)])
+                centroids = np.concatenate([centroids, np.zeros_like(centroids)])
+            add(row, clusters)
+            clusters += 1
+    return labels
+
+
+def cluster_highlights(highlights: Iterable[Tuple[str, str]], threshold: float = HIGHLIGHT_SIMILARITY,
+                       dim: int = HIGHLIGHT_HASH_DIM) -> List[HighlightTheme]:
+    """Group near-duplicate `(platform, highlight)` pairs into themes, largest first.
+
+    Exact duplicates (ignoring case and punctuation) are merged up front; the distinct texts
+    are then clustered on the cosine similarity of their hashed n-gram vectors (see
+    assign_clusters), most frequent phrasing first so it seeds its theme. Ties are broken on
+    the normalized text, so the themes do not depend on the order of `highlights`. Memory stays at
+    len(texts) * dim floats plus one block of similarities. The theme's name is the
+    variant closest to the cluster's centroid.
+    """
+    texts: List[str] = []
+    keys: List[str] = []
+    index: Dict[str, int] = {}
+    counts: List[int] = []
+    platforms: List[set] = []
+    for platform, highlight in highlights:
+        key = normalize_highlight(highlight)
+        if not key:
+            continue
+        row = index.get(key)
+        if row is None:
+            row = index[key] = len(texts)
+            texts.append(highlight.strip())
+            keys.append(key)
+            counts.append(0)
+            platforms.append(set())
+        else:
+            texts[row] = min(texts[row], highlight.strip())
+        counts[row] += 1
+        platforms[row].add(platform)
+    if not texts:
+        return []
+
+    order = sorted(range(len(texts)), key=lambda row: (-counts[row], keys[row]))
+    texts = [texts[row] for row in order]
+    counts = [counts[row] for row in order]
+    platforms = [platforms[row] for row in order]
+    vectors = hash_vectors(texts, dim)
+    labels = assign_clusters(vectors, np.array(counts, dtype=np.float32), threshold)
+
+    members: Dict[int, List[int]] = defaultdict(list)
+    for row, label in enumerate(labels.tolist()):
+        members[label].append(row)
+
+    themes = []
+    for rows in members.values():
+        centroid = (vectors[rows] * np.array([counts[row] for row in rows], dtype=np.float32)[:, None]).sum(axis=0)
+        canonical = rows[int(np.argmax(vectors[rows] @ centroid))]
+        themes.append(HighlightTheme(
+            theme=texts[canonical],
+            count=sum(counts[row] for row in rows),
+            platforms=sorted(set().union(*(platforms[row] for row in rows))),
+            variants=[texts[row] for row in rows[:MAX_VARIANTS]],
+        ))
+    themes.sort(key=lambda theme: (-theme.count, -len(theme.platforms), theme.theme))
+    return themes
+
+
+def document_highlights(document: Dict[str, dict]) -> List[Tuple[str, str]]:
+    """`(platform, highlight)` pairs of a snapshot document (see snapshots.report_document)."""
+    return [(platform, highlight) for platform, report in document.items() for highlight in report["highlights"]]
+
+
+router = APIRouter(prefix="/brands", tags=["highlights"])
+
+
+@router.get("/{brand}/themes", response_model=List[HighlightTheme])
+def get_highlight_themes(brand: str, snapshot_id: Optional[int] = None, threshold: float = HIGHLIGHT_SIMILARITY):
+    """Ethical highlights of a snapshot (the latest by default) merged across platforms into themes."""
+    snapshot = snapshot_store.snapshot(brand, snapshot_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"No snapshots for {brand}")
+    return cluster_highlights(document_highlights(snapshot["platforms"]), threshold)
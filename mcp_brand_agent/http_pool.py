@@ -0,0 +1,139 @@
+import asyncio
+import os
+import sys
+import weakref
+from collections import Counter
+from typing import List, Optional
+
+import httpx
+import litellm
+from fastapi import APIRouter
+
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20"))
+LLM_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "90"))
+LLM_HTTP_TIMEOUT = float(os.getenv("LLM_HTTP_TIMEOUT", "600"))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "1") == "1"  # negotiated via ALPN; providers without h2 get HTTP/1.1
+
+
+class LoopLocalTransport(httpx.AsyncBaseTransport):
+    """Keeps one connection pool per event loop, since pooled connections cannot cross loops."""
+
+    def __init__(self, **transport_kwargs):
+        self.transport_kwargs = transport_kwargs
+        self._transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = \
+            weakref.WeakKeyDictionary()
+
+    def _transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        transport = self._transports.get(loop)
+        if transport is None:
+            transport = self._transports[loop] = httpx.AsyncHTTPTransport(**self.transport_kwargs)
+        return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+    def connections(self) -> List:
+        return [connection for transport in list(self._transports.values())
+                for connection in list(transport._pool.connections)]
+
+
+class LLMConnectionPool:
+    """One keep-alive httpx client shared by every LiteLLM model in the process.
+
+    LiteLLM otherwise builds a client, and so a connection pool, per cached provider client,
+    so parallel branches each pay for their own TCP and TLS handshakes. `install()` sets
+    the shared client as `litellm.aclient_session`, which every OpenAI-compatible provider
+    uses. An httpcore trace hook counts requests, new connections and TLS handshakes, so
+    `metrics()` can report how often a request reused a warm connection.
+    """
+
+    def __init__(self):
+        self.counters: Counter = Counter()
+        self.http2 = False
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = self._build_client()
+        return self._client
+
+    def _build_client(self) -> httpx.AsyncClient:
+        self.http2 = LLM_HTTP2
+        if self.http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                print("  [HttpPool] h2 is not installed; using HTTP/1.1 keep-alive only", file=sys.stderr)
+                self.http2 = False
+        transport = LoopLocalTransport(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY,
+            ),
+            verify=litellm.ssl_verify,
+        )
+        return httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(LLM_HTTP_TIMEOUT, connect=10),
+            event_hooks={"request": [self._on_request]},
+        )
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        self.counters["requests"] += 1
+        request.extensions["trace"] = self._trace
+
+    async def _trace(self, event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self.counters["connections_opened"] += 1
+        elif event_name == "connection.start_tls.complete":
+            self.counters["tls_handshakes"] += 1
+        elif event_name == "http2.send_request_headers.started":
+            self.counters["http2_requests"] += 1
+
+    def install(self) -> None:
+        """Route LiteLLM's async provider calls through the shared client."""
+        litellm.aclient_session = self.client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            if litellm.aclient_session is self._client:
+                litellm.aclient_session = None
+            await self._client.aclose()
+            self._client = None
+
+    def metrics(self) -> dict:
+        requests = self.counters["requests"]
+        opened = self.counters["connections_opened"]
+        connections = self._client._transport.connections() if self._client is not None else []
+        return {
+            "http2": self.http2,
+            "max_connections": LLM_HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": LLM_HTTP_MAX_KEEPALIVE,
+            "open_connections": len(connections),
+            "idle_connections": sum(1 for connection in connections if connection.is_idle()),
+            "requests": requests,
+            "connections_opened": opened,
+            "tls_handshakes": self.counters["tls_handshakes"],
+            "http2_requests": self.counters["http2_requests"],
+            "reuse_ratio": round(1 - opened / requests, 4) if requests else None,
+        }
+
+
+llm_pool = LLMConnectionPool()
+
+router = APIRouter(prefix="/llm-pool", tags=["llm"])
+
+
+@router.get("/metrics")
+def llm_pool_metrics():
+    return llm_pool.metrics()
@@ -0,0 +1,275 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import Counter, defaultdict, deque
+from datetime import datetime, timezone
+from typing import Dict, List, Literal, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ValidationError
+
+from mcp_brand_agent.listeners import publish_mentions
+from mcp_brand_agent.mapreduce import classify_batches
+from mcp_brand_agent.metering import usage_meter
+from mcp_brand_agent.schemas import Mention, PlatformName
+
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "10000"))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "25"))
+INGEST_MAX_LATENCY_MS = int(os.getenv("INGEST_MAX_LATENCY_MS", "500"))  # flush a partial batch after this long
+INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", "4"))
+INGEST_CLASSIFIER = os.getenv("INGEST_CLASSIFIER", "local")  # "llm" or "local"
+INGEST_BUDGET_DAILY_USD = float(os.getenv("INGEST_BUDGET_DAILY_USD", "0"))  # 0 disables the budget
+INGEST_USAGE_PLATFORM = "ingest"  # platform that ingest classification is metered under in costs.db
+INGEST_MAX_ITEMS_PER_REQUEST = int(os.getenv("INGEST_MAX_ITEMS_PER_REQUEST", "5000"))
+THROUGHPUT_WINDOW_SECONDS = 60
+
+
+class IngestedMention(BaseModel):
+    """A pushed post about a brand; sentiment and ethical_context are filled in by classification if missing."""
+
+    brand: str
+    platform: PlatformName
+    text: str
+    url: str
+    date: str = "Recent"
+    sentiment: Optional[Literal["positive", "negative", "neutral"]] = None
+    ethical_context: Optional[str] = None
+
+
+class QueuedMention:
+    __slots__ = ("mention", "enqueued_at")
+
+    def __init__(self, mention: IngestedMention):
+        self.mention = mention
+        self.enqueued_at = time.monotonic()
+
+
+def parse_body(body: bytes, content_type: str) -> List[object]:
+    """Items of a JSON array, a single JSON object or NDJSON (one object per line)."""
+    text = body.decode("utf-8").strip()
+    if not text:
+        return []
+    if "ndjson" not in content_type and text[0] in "[{":
+        try:
+            value = json.loads(text)
+            return value if isinstance(value, list) else [value]
+        except json.JSONDecodeError:
+            if text[0] == "[":
+                raise
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+class MentionBatcher:
+    """Micro-batches pushed mentions through classification and into the stored aggregates.
+
+    Accepted mentions wait on an in-process queue. The batcher takes up to INGEST_BATCH_SIZE
+    of them, or whatever arrived within INGEST_MAX_LATENCY_MS of the first one, groups them
+    by brand and classifies each group with the map-reduce classifier (the local lexicon,
+    or with INGEST_CLASSIFIER=llm one LLM call per batch), at most INGEST_CONCURRENCY
+    batches at a time. LLM calls are metered in the cost ledger under the "ingest" platform;
+    once they have spent INGEST_BUDGET_DAILY_USD today (UTC) batches are classified locally.
+    Mentions that arrive already labelled skip classification. Results go to publish_mentions, so
+    rollups, the search index and anomaly detection see them like any search-driven run.
+    The queue is not persisted: mentions still queued when the process stops are lost.
+    """
+
+    def __init__(self, queue_size: int = INGEST_QUEUE_SIZE, batch_size: int = INGEST_BATCH_SIZE,
+                 max_latency_ms: int = INGEST_MAX_LATENCY_MS, concurrency: int = INGEST_CONCURRENCY,
+                 classifier: str = INGEST_CLASSIFIER):
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.max_latency = max_latency_ms / 1000
+        self.concurrency = concurrency
+        self.classifier = classifier
+        self.counters: Counter = Counter()
+        self.model = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._batches: set = set()
+        self._published: deque = deque()  # (monotonic time, count) for the throughput window
+        self._lag_ewma: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._loop_task is not None and not self._loop_task.done()
+
+    def start(self, model=None) -> None:
+        self.model = model
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._loop_task is None:
+            return
+        self._loop_task.cancel()
+        for task in list(self._batches):
+            task.cancel()
+        await asyncio.gather(self._loop_task, *self._batches, return_exceptions=True)
+        if self._queue.qsize():
+            print(f"  [Ingest] dropping {self._queue.qsize()} queued mentions on shutdown")
+        self._loop_task = None
+
+    def submit(self, mentions: List[IngestedMention]) -> int:
+        """Queue all of `mentions` or none; returns the queue depth afterwards."""
+        if not self.running:
+            raise HTTPException(status_code=503, detail="Ingestion is not running")
+        if self._queue.qsize() + len(mentions) > self.queue_size:
+            self.counters["rejected_queue_full"] += len(mentions)
+            raise HTTPException(status_code=429, detail="Ingestion queue is full",
+                                headers={"Retry-After": str(max(1, int(self.max_latency * 2)))})
+        for mention in mentions:
+            self._queue.put_nowait(QueuedMention(mention))
+        self.counters["accepted"] += len(mentions)
+        return self._queue.qsize()
+
+    async def _next_batch(self) -> List[QueuedMention]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            await self._slots.acquire()
+            task = asyncio.create_task(self._process(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _process(self, batch: List[QueuedMention]) -> None:
+        try:
+            self.counters["batches"] += 1
+            groups: Dict[str, List[QueuedMention]] = defaultdict(list)
+            for item in batch:
+                groups[item.mention.brand].append(item)
+            observed_at = datetime.now(timezone.utc)
+            for brand, items in groups.items():
+                try:
+                    classified = await self._classify(brand, [item.mention for item in items])
+                except Exception as e:
+                    self.counters["failed"] += len(items)
+                    print(f"  [Ingest] classifying {len(items)} mentions of {brand!r} failed: {e}")
+                    continue
+                by_platform: Dict[Tuple[str, str], List[Mention]] = defaultdict(list)
+                for item, mention in zip(items, classified):
+                    by_platform[(brand, item.mention.platform)].append(mention)
+                for (brand_name, platform), mentions in by_platform.items():
+                    publish_mentions(brand_name, platform, mentions, observed_at)
+                self._record_published(items)
+        finally:
+            self._slots.release()
+
+    async def _classify(self, brand: str, mentions: List[IngestedMention]) -> List[Mention]:
+        """Mentions with both labels are validated as-is; the rest go through the classifier in one batch."""
+        results: List[Optional[Mention]] = [None] * len(mentions)
+        unlabelled = []
+        for i, mention in enumerate(mentions):
+            if mention.sentiment and mention.ethical_context:
+                results[i] = Mention(date=mention.date, text=mention.text, sentiment=mention.sentiment,
+                                     ethical_context=mention.ethical_context, url=mention.url)
+            else:
+                unlabelled.append(i)
+        if unlabelled:
+            raw = [{"date": mentions[i].date, "text": mentions[i].text, "url": mentions[i].url} for i in unlabelled]
+            invocation_id = f"ingest-{uuid.uuid4().hex}"
+
+            def on_usage(prompt_tokens: int, completion_tokens: int) -> None:
+                self.counters["prompt_tokens"] += prompt_tokens
+                self.counters["completion_tokens"] += completion_tokens
+                usage_meter.record_llm(invocation_id, None, brand, INGEST_USAGE_PLATFORM, self.model.model,
+                                       prompt_tokens, completion_tokens)
+
+            try:
+                batches = await classify_batches(self.model, brand, raw, batch_size=len(raw), max_concurrency=1,
+                                                 classifier=self._classifier_for(len(raw)), on_usage=on_usage)
+            finally:
+                usage_meter.finish_run(invocation_id)
+            for i, mention in zip(unlabelled, batches[0]):
+                results[i] = mention
+            self.counters["classified"] += len(unlabelled)
+        return results
+
+    def _classifier_for(self, count: int) -> str:
+        """The configured classifier, or "local" once today's LLM spend has reached INGEST_BUDGET_DAILY_USD."""
+        if self.classifier != "llm" or not INGEST_BUDGET_DAILY_USD:
+            return self.classifier
+        midnight = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        spent = usage_meter.spent_usd(midnight, INGEST_USAGE_PLATFORM)
+        if spent < INGEST_BUDGET_DAILY_USD:
+            return self.classifier
+        if not self.counters["over_budget"]:
+            print(f"  [Ingest] spent ${spent:.4f} of the ${INGEST_BUDGET_DAILY_USD} daily budget; classifying locally")
+        self.counters["over_budget"] += count
+        return "local"
+
+    def _record_published(self, items: List[QueuedMention]) -> None:
+        now = time.monotonic()
+        self.counters["published"] += len(items)
+        self._published.append((now, len(items)))
+        for item in items:
+            lag = now - item.enqueued_at
+            self._lag_ewma = lag if self._lag_ewma is None else 0.9 * self._lag_ewma + 0.1 * lag
+
+    def metrics(self) -> dict:
+        now = time.monotonic()
+        while self._published and now - self._published[0][0] > THROUGHPUT_WINDOW_SECONDS:
+            self._published.popleft()
+        oldest = self._queue._queue[0].enqueued_at if self._queue is not None and self._queue.qsize() else None
+        return {
+            "running": self.running,
+            "classifier": self.classifier,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_capacity": self.queue_size,
+            "oldest_queued_seconds": round(now - oldest, 3) if oldest is not None else 0.0,
+            "batches_in_flight": len(self._batches),
+            "mentions_per_second": round(sum(count for _, count in self._published) / THROUGHPUT_WINDOW_SECONDS, 3),
+            "lag_seconds_ewma": round(self._lag_ewma, 3) if self._lag_ewma is not None else None,
+            "counters": dict(self.counters),
+        }
+
+
+mention_batcher = MentionBatcher()
+
+router = APIRouter(prefix="/ingest", tags=["ingest"])
+
+
+@router.post("/mentions", status_code=202)
+async def ingest_mentions(request: Request):
+    """Accept mentions as a JSON array or NDJSON; invalid items are reported and skipped."""
+    try:
+        items = parse_body(await request.body(), request.headers.get("content-type", ""))
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Body is not a JSON array or NDJSON: {e}")
+    if len(items) > INGEST_MAX_ITEMS_PER_REQUEST:
+        raise HTTPException(status_code=413, detail=f"At most {INGEST_MAX_ITEMS_PER_REQUEST} mentions per request")
+    accepted, rejected = [], []
+    for index, item in enumerate(items):
+        try:
+            accepted.append(IngestedMention.model_validate(item))
+        except ValidationError as e:
+            rejected.append({"index": index, "errors": e.errors(include_url=False, include_context=False)})
+    mention_batcher.counters["rejected_invalid"] += len(rejected)
+    queue_depth = mention_batcher.submit(accepted) if accepted else mention_batcher.metrics()["queue_depth"]
+    return JSONResponse(status_code=202, content={
+        "accepted": len(accepted), "rejected": rejected, "queue_depth": queue_depth,
+    })
+
+
+@router.get("/metrics")
+def ingest_metrics():
+    return mention_batcher.metrics()
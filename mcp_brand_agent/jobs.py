@@ -0,0 +1,336 @@
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from google.adk.events import Event
+from pydantic import BaseModel
+
+from mcp_brand_agent.admission import AdmissionRejected, admission_controller
+from mcp_brand_agent.platforms import enabled_platforms
+from mcp_brand_agent.runner import run_brand_analysis
+from mcp_brand_agent.storage import connect
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))  # 0 serves the API without running jobs in this process
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+TERMINAL_STATUSES = {"succeeded", "failed", "cancelled"}
+
+
+class JobRequest(BaseModel):
+    brand: str
+    user_id: str = "jobs"
+
+
+class Job(BaseModel):
+    id: str
+    brand: str
+    user_id: str
+    status: str  # "queued", "running", "succeeded", "failed" or "cancelled"
+    progress: dict
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+def _timestamp(value: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value, timezone.utc) if value is not None else None
+
+
+def _row_to_job(row) -> Job:
+    return Job(
+        id=row["id"], brand=row["brand"], user_id=row["user_id"], status=row["status"],
+        progress=json.loads(row["progress"]), attempts=row["attempts"], error=row["error"],
+        created_at=_timestamp(row["created_at"]), started_at=_timestamp(row["started_at"]),
+        finished_at=_timestamp(row["finished_at"]),
+    )
+
+
+class JobStore:
+    """Durable job queue in SQLite (jobs.db).
+
+    A worker claims a job by taking a lease on it and renews the lease while the run is
+    alive. If the worker dies, the lease runs out and any worker, in this process or
+    another, claims the job again, up to JOB_MAX_ATTEMPTS times.
+    """
+
+    def __init__(self, db_name: str = "jobs.db"):
+        self.db_name = db_name
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = connect(self.db_name)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    brand TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    progress TEXT NOT NULL DEFAULT '{}',
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    owner TEXT,
+                    lease_expires REAL,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, created_at);
+            """)
+        return self._conn
+
+    def submit(self, brand: str, user_id: str) -> Job:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO jobs (id, brand, user_id, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, brand, user_id, time.time()),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def list(self, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+        clause, params = ("WHERE status = ?", [status]) if status else ("", [])
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT * FROM jobs {clause} ORDER BY created_at DESC LIMIT ?", params + [limit],
+            ).fetchall()
+        return [_row_to_job(row) for row in rows]
+
+    def result(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self.conn.execute("SELECT result FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row["result"]) if row and row["result"] else None
+
+    def claim(self, owner: str) -> Optional[Job]:
+        """Lease the oldest queued job, or one whose previous worker's lease has expired."""
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                """UPDATE jobs SET status = 'failed', finished_at = ?, owner = NULL,
+                          error = COALESCE(error, 'worker lost') || ' (gave up after ' || attempts || ' attempts)'
+                   WHERE status = 'running' AND lease_expires < ? AND attempts >= ?""",
+                (now, now, JOB_MAX_ATTEMPTS),
+            )
+            row = self.conn.execute(
+                """UPDATE jobs SET status = 'running', owner = ?, lease_expires = ?, attempts = attempts + 1,
+                          started_at = COALESCE(started_at, ?)
+                   WHERE id = (
+                       SELECT id FROM jobs
+                       WHERE status = 'queued' OR (status = 'running' AND lease_expires < ?)
+                       ORDER BY created_at LIMIT 1
+                   )
+                   RETURNING *""",
+                (owner, now + JOB_LEASE_SECONDS, now, now),
+            ).fetchone()
+        return _row_to_job(row) if row else None
+
+    def heartbeat(self, job_id: str, owner: str, progress: dict) -> Optional[str]:
+        """Renew the lease and save progress; returns the job's status, or None if the lease was lost."""
+        with self._lock:
+            row = self.conn.execute(
+                """UPDATE jobs SET lease_expires = ?, progress = ? WHERE id = ? AND owner = ? RETURNING status""",
+                (time.time() + JOB_LEASE_SECONDS, json.dumps(progress), job_id, owner),
+            ).fetchone()
+        return row["status"] if row else None
+
+    def finish(self, job_id: str, owner: str, status: str, progress: dict,
+               result: Optional[dict] = None, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.conn.execute(
+                """UPDATE jobs SET status = ?, progress = ?, result = ?, error = ?, owner = NULL, lease_expires = NULL,
+                          finished_at = CASE WHEN ? = 'queued' THEN NULL ELSE ? END
+                   WHERE id = ? AND owner = ?""",
+                (status, json.dumps(progress), json.dumps(result, default=str) if result is not None else None,
+                 error, status, time.time(), job_id, owner),
+            )
+
+    def release(self, job_id: str, owner: str) -> None:
+        """Put a job interrupted by shutdown back in the queue without counting the attempt."""
+        with self._lock:
+            self.conn.execute(
+                """UPDATE jobs SET status = 'queued', owner = NULL, lease_expires = NULL, attempts = attempts - 1
+                   WHERE id = ? AND owner = ? AND status = 'running'""",
+                (job_id, owner),
+            )
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued job at once; a running job is stopped at its worker's next heartbeat."""
+        with self._lock:
+            self.conn.execute(
+                """UPDATE jobs SET status = 'cancelled',
+                          finished_at = CASE WHEN owner IS NULL THEN ? ELSE finished_at END
+                   WHERE id = ? AND status IN ('queued', 'running')""",
+                (time.time(), job_id),
+            )
+        return self.get(job_id)
+
+
+class JobWorkerPool:
+    """Runs queued jobs on `workers` asyncio tasks in this process."""
+
+    def __init__(self, store: JobStore, workers: int = JOB_WORKERS):
+        self.store = store
+        self.workers = workers
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+    async def start(self) -> None:
+        self._stopping = False
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks = [asyncio.create_task(self._work(f"{prefix}:{i}")) for i in range(self.workers)]
+        if self.workers:
+            print(f"  [Jobs] started {self.workers} job workers")
+
+    async def stop(self) -> None:
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self, owner: str) -> None:
+        while not self._stopping:
+            try:
+                job = await asyncio.to_thread(self.store.claim, owner)
+            except Exception as e:
+                print(f"  [Jobs] claim failed: {e}")
+                job = None
+            if job is None:
+                await asyncio.sleep(JOB_POLL_SECONDS)
+                continue
+            await self._run(job, owner)
+
+    async def _admitted_run(self, job: Job, on_event) -> dict:
+        """Run the analysis in a low-priority admission slot, waiting out rejections."""
+        while True:
+            try:
+                async with admission_controller.slot("low"):
+                    return await run_brand_analysis(
+                        job.brand, user_id=job.user_id, session_id=f"{job.id}-{job.attempts}", on_event=on_event,
+                    )
+            except AdmissionRejected as e:
+                await asyncio.sleep(e.retry_after)
+
+    async def _run(self, job: Job, owner: str) -> None:
+        platforms = [platform.key for platform in enabled_platforms()]
+        progress = {"platforms_total": len(platforms), "platforms_done": [], "events": 0}
+
+        async def on_event(event: Event) -> None:
+            progress["events"] += 1
+            for key in event.actions.state_delta:
+                for platform in platforms:
+                    if key in (f"final_{platform}_results", f"{platform}_budget_exceeded") \
+                            and platform not in progress["platforms_done"]:
+                        progress["platforms_done"].append(platform)
+
+        print(f"  [Jobs] {owner} running job {job.id} for {job.brand!r} (attempt {job.attempts})")
+        run = asyncio.create_task(self._admitted_run(job, on_event))
+        try:
+            while not run.done():
+                # Heartbeats also publish progress and pick up cancellation, so keep them frequent.
+                await asyncio.wait({run}, timeout=min(JOB_LEASE_SECONDS / 3, 5))
+                if run.done():
+                    break
+                status = await asyncio.to_thread(self.store.heartbeat, job.id, owner, progress)
+                if status != "running":
+                    print(f"  [Jobs] job {job.id} is {status or 'no longer ours'}, stopping the run")
+                    run.cancel()
+                    await asyncio.gather(run, return_exceptions=True)
+                    if status == "cancelled":
+                        await asyncio.to_thread(self.store.finish, job.id, owner, "cancelled", progress)
+                    return
+            state = run.result()
+        except asyncio.CancelledError:
+            run.cancel()
+            await asyncio.gather(run, return_exceptions=True)
+            self.store.release(job.id, owner)
+            raise
+        except Exception as e:
+            print(f"  [Jobs] job {job.id} failed: {e}")
+            status = "failed" if job.attempts >= JOB_MAX_ATTEMPTS else "queued"
+            await asyncio.to_thread(self.store.finish, job.id, owner, status, progress, None, str(e))
+            return
+        await asyncio.to_thread(self.store.finish, job.id, owner, "succeeded", progress, state)
+
+
+job_store = JobStore()
+job_workers = JobWorkerPool(job_store)
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def _get_job(job_id: str) -> Job:
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+
+@router.post("", status_code=202)
+def submit_job(request: JobRequest) -> Job:
+    return job_store.submit(request.brand, request.user_id)
+
+
+@router.get("")
+def list_jobs(status: Optional[str] = None, limit: int = 50) -> List[Job]:
+    return job_store.list(status, limit)
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str) -> Job:
+    return _get_job(job_id)
+
+
+@router.get("/{job_id}/result")
+def get_job_result(job_id: str):
+    job = _get_job(job_id)
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status}")
+    return job_store.result(job_id)
+
+
+@router.post("/{job_id}/cancel")
+def cancel_job(job_id: str) -> Job:
+    job = _get_job(job_id)
+    if job.status in TERMINAL_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is already {job.status}")
+    return job_store.cancel(job_id)
+
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-sent events with the job's status and progress until it finishes."""
+    _get_job(job_id)
+
+    async def stream():
+        last = None
+        while True:
+            job = await asyncio.to_thread(job_store.get, job_id)
+            payload = job.model_dump_json()
+            if payload != last:
+                last = payload
+                yield f"data: {payload}\n\n"
+            if job.status in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(JOB_POLL_SECONDS)
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
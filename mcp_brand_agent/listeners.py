@@ -0,0 +1,85 @@
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from pydantic import ValidationError
+
+from mcp_brand_agent.brands import brand_from_content
+from mcp_brand_agent.schemas import Mention, SinglePlatformAnalysisReport
+
+ReportListener = Callable[[SinglePlatformAnalysisReport, datetime], None]
+MentionListener = Callable[[str, str, List[Mention], datetime], None]
+RunListener = Callable[[str, dict, datetime], None]
+
+_report_listeners: List[ReportListener] = []
+_mention_listeners: List[MentionListener] = []
+_run_listeners: List[RunListener] = []
+
+
+def add_report_listener(listener: ReportListener) -> None:
+    """Call `listener(report, observed_at)` for every validated platform report."""
+    _report_listeners.append(listener)
+
+
+def add_mention_listener(listener: MentionListener) -> None:
+    """Call `listener(brand, platform, mentions, observed_at)` for every batch of validated mentions."""
+    _mention_listeners.append(listener)
+
+
+def add_run_listener(listener: RunListener) -> None:
+    """Call `listener(brand, state, observed_at)` with the state delta of every completed root_agent run."""
+    _run_listeners.append(listener)
+
+
+def publish_mentions(brand: str, platform: str, mentions: List[Mention], observed_at: Optional[datetime] = None) -> None:
+    observed_at = observed_at or datetime.now(timezone.utc)
+    for listener in _mention_listeners:
+        try:
+            listener(brand, platform, mentions, observed_at)
+        except Exception as e:
+            print(f"  [Listeners] mention listener {getattr(listener, '__qualname__', listener)} failed: {e}")
+
+
+def publish_report(report: SinglePlatformAnalysisReport, observed_at: Optional[datetime] = None,
+                   brand: Optional[str] = None) -> None:
+    """Publish a platform report and its mentions, keyed by `brand` (the requested brand) when given."""
+    observed_at = observed_at or datetime.now(timezone.utc)
+    if brand and brand != report.brand_name:
+        report = report.model_copy(update={"brand_name": brand})
+    for listener in _report_listeners:
+        try:
+            listener(report, observed_at)
+        except Exception as e:
+            print(f"  [Listeners] report listener {getattr(listener, '__qualname__', listener)} failed: {e}")
+    publish_mentions(report.brand_name, report.platform_name, report.mentions_on_platform, observed_at)
+
+
+def publish_run(brand: str, state: dict, observed_at: Optional[datetime] = None) -> None:
+    observed_at = observed_at or datetime.now(timezone.utc)
+    for listener in _run_listeners:
+        try:
+            listener(brand, state, observed_at)
+        except Exception as e:
+            print(f"  [Listeners] run listener {getattr(listener, '__qualname__', listener)} failed: {e}")
+
+
+def publish_platform_results(state_prefix: str):
+    """after_agent_callback that publishes the branch's final_<state_prefix>_results once validated.
+
+    The report is published under the brand the user asked for, as publish_run is, not the
+    model's `brand_name`, which may be normalized or misspelled.
+    """
+
+    def after_agent(callback_context: CallbackContext):
+        results = callback_context.state.get(f"final_{state_prefix}_results")
+        if not results:
+            return None
+        try:
+            report = SinglePlatformAnalysisReport.model_validate(results)
+        except ValidationError as e:
+            print(f"  [Listeners] final_{state_prefix}_results is not a valid report: {e}")
+            return None
+        publish_report(report, brand=brand_from_content(callback_context.user_content) or None)
+        return None
+
+    return after_agent
@@ -0,0 +1,303 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from starlette.websockets import WebSocketState
+
+from mcp_brand_agent.brands import normalize_brand
+from mcp_brand_agent.schemas import Mention
+from mcp_brand_agent.snapshots import report_document
+from mcp_brand_agent.storage import connect
+
+LIVE_CLIENT_BUFFER = int(os.getenv("LIVE_CLIENT_BUFFER", "32"))  # messages held per subscriber before dropping
+LIVE_MENTIONS_PER_MESSAGE = int(os.getenv("LIVE_MENTIONS_PER_MESSAGE", "20"))
+LIVE_PING_SECONDS = float(os.getenv("LIVE_PING_SECONDS", "30"))
+# Share updates between the worker processes of workers.serve, which sets WORKER_INDEX.
+LIVE_RELAY = os.getenv("LIVE_RELAY", "1" if "WORKER_INDEX" in os.environ else "0") == "1"
+LIVE_RELAY_POLL_SECONDS = float(os.getenv("LIVE_RELAY_POLL_SECONDS", "0.5"))
+LIVE_RELAY_RETENTION_SECONDS = 60
+
+
+class Subscriber:
+    """One WebSocket's bounded outbox; when it is full the oldest message is dropped."""
+
+    __slots__ = ("brand_key", "outbox", "dropped", "_ready")
+
+    def __init__(self, brand_key: str, buffer: int):
+        self.brand_key = brand_key
+        self.outbox: deque = deque(maxlen=buffer)
+        self.dropped = 0
+        self._ready = asyncio.Event()
+
+    def offer(self, message: str) -> bool:
+        """Queue `message`; returns False when it displaced the oldest queued one."""
+        full = len(self.outbox) == self.outbox.maxlen
+        if full:
+            self.dropped += 1
+        self.outbox.append(message)
+        self._ready.set()
+        return not full
+
+    async def next_messages(self) -> List[str]:
+        await self._ready.wait()
+        self._ready.clear()
+        messages = list(self.outbox)
+        self.outbox.clear()
+        return messages
+
+
+class LiveRelay:
+    """Carries live updates between worker processes through a shared SQLite table (live.db).
+
+    Each process records which brands it has subscribers for. A publish for a brand that
+    another process subscribes to is appended to `live_events`, and every process polls
+    the table for other processes' events and delivers them to its own subscribers.
+    """
+
+    def __init__(self, origin: str = os.getenv("WORKER_INDEX", str(os.getpid())), db_name: str = "live.db",
+                 poll_seconds: float = LIVE_RELAY_POLL_SECONDS):
+        self.origin = origin
+        self.db_name = db_name
+        self.poll_seconds = poll_seconds
+        self.remote_brands: Set[str] = set()
+        self.counters: Counter = Counter()
+        self._conn = None
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = connect(self.db_name)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS live_events (
+                    id INTEGER PRIMARY KEY,
+                    created_at REAL NOT NULL,
+                    origin TEXT NOT NULL,
+                    brand_key TEXT NOT NULL,
+                    message TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS live_subscriptions (
+                    origin TEXT NOT NULL,
+                    brand_key TEXT NOT NULL,
+                    PRIMARY KEY (origin, brand_key)
+                );
+            """)
+        return self._conn
+
+    def set_subscribed(self, brand_key: str, subscribed: bool) -> None:
+        with self._lock:
+            if subscribed:
+                self.conn.execute("INSERT OR IGNORE INTO live_subscriptions (origin, brand_key) VALUES (?, ?)",
+                                  (self.origin, brand_key))
+            else:
+                self.conn.execute("DELETE FROM live_subscriptions WHERE origin = ? AND brand_key = ?",
+                                  (self.origin, brand_key))
+
+    def append(self, brand_key: str, encoded: str) -> None:
+        with self._lock:
+            self.conn.execute("INSERT INTO live_events (created_at, origin, brand_key, message) VALUES (?, ?, ?, ?)",
+                              (time.time(), self.origin, brand_key, encoded))
+        self.counters["relayed_out"] += 1
+
+    def poll(self) -> List[Tuple[str, str]]:
+        """Other processes' events since the last poll, as (brand_key, message); also refreshes remote_brands."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, brand_key, message FROM live_events WHERE id > ? AND origin != ? ORDER BY id",
+                (self._last_id, self.origin),
+            ).fetchall()
+            self._last_id = max([self._last_id, *(row["id"] for row in rows)])
+            self.remote_brands = {row["brand_key"] for row in self.conn.execute(
+                "SELECT DISTINCT brand_key FROM live_subscriptions WHERE origin != ?", (self.origin,),
+            )}
+            self.conn.execute("DELETE FROM live_events WHERE created_at < ?",
+                              (time.time() - LIVE_RELAY_RETENTION_SECONDS,))
+        self.counters["relayed_in"] += len(rows)
+        return [(row["brand_key"], row["message"]) for row in rows]
+
+    def start(self, broadcaster: "Broadcaster") -> None:
+        with self._lock:
+            # A restarted worker keeps its origin; forget what its previous process subscribed to.
+            self.conn.execute("DELETE FROM live_subscriptions WHERE origin = ?", (self.origin,))
+            self._last_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM live_events").fetchone()[0]
+        broadcaster.relay = self
+        self._task = asyncio.create_task(self._run(broadcaster))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        with self._lock:
+            self.conn.execute("DELETE FROM live_subscriptions WHERE origin = ?", (self.origin,))
+
+    async def _run(self, broadcaster: "Broadcaster") -> None:
+        while True:
+            try:
+                for brand_key, encoded in self.poll():
+                    if brand_key in broadcaster.channels:
+                        broadcaster._deliver(brand_key, encoded)
+            except Exception as e:
+                print(f"  [Live] relay poll failed: {e}")
+            await asyncio.sleep(self.poll_seconds)
+
+
+class Broadcaster:
+    """Per-brand channels that fan one serialized update out to every subscribed WebSocket.
+
+    Updates are encoded to JSON once per publish and the same string is appended to each
+    subscriber's outbox, so the cost of a publish is one encode plus a deque append per
+    subscriber. Each socket drains its own outbox, so a slow consumer only loses its own
+    oldest messages (LIVE_CLIENT_BUFFER). An idle subscriber is a waiting coroutine and an
+    empty deque. Channels are per process; with WEB_CONCURRENCY > 1 a LiveRelay passes
+    updates to subscribers connected to other workers, within LIVE_RELAY_POLL_SECONDS.
+    """
+
+    def __init__(self, buffer: int = LIVE_CLIENT_BUFFER):
+        self.buffer = buffer
+        self.channels: Dict[str, Set[Subscriber]] = {}
+        self.counters: Counter = Counter()
+        self.relay: Optional[LiveRelay] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, brand: str) -> Subscriber:
+        self._loop = asyncio.get_running_loop()
+        subscriber = Subscriber(normalize_brand(brand), self.buffer)
+        if subscriber.brand_key not in self.channels and self.relay is not None:
+            self.relay.set_subscribed(subscriber.brand_key, True)
+        self.channels.setdefault(subscriber.brand_key, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        channel = self.channels.get(subscriber.brand_key)
+        if channel is not None:
+            channel.discard(subscriber)
+            if not channel:
+                del self.channels[subscriber.brand_key]
+                if self.relay is not None:
+                    self.relay.set_subscribed(subscriber.brand_key, False)
+        self.counters["dropped"] += subscriber.dropped
+
+    def wanted(self, brand_key: str) -> bool:
+        """Whether anyone, here or in another worker, subscribes to `brand_key`."""
+        return brand_key in self.channels or (self.relay is not None and brand_key in self.relay.remote_brands)
+
+    def publish(self, brand: str, message: dict) -> None:
+        """Broadcast `message` to the brand's subscribers; safe to call from any thread."""
+        brand_key = normalize_brand(brand)
+        local = brand_key in self.channels and self._loop is not None
+        remote = self.relay is not None and brand_key in self.relay.remote_brands
+        if not (local or remote):
+            return
+        encoded = json.dumps(message, default=str, separators=(",", ":"))
+        if remote:
+            self.relay.append(brand_key, encoded)
+        if not local:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._deliver(brand_key, encoded)
+        else:
+            self._loop.call_soon_threadsafe(self._deliver, brand_key, encoded)
+
+    def _deliver(self, brand_key: str, encoded: str) -> None:
+        subscribers = self.channels.get(brand_key, ())
+        self.counters["published"] += 1
+        for subscriber in subscribers:
+            self.counters["delivered" if subscriber.offer(encoded) else "displaced"] += 1
+
+    def on_run(self, brand: str, state: dict, observed_at: datetime) -> None:
+        """Run listener: per-platform summary of a completed run."""
+        if not self.wanted(normalize_brand(brand)):
+            return
+        platforms = {
+            name: {key: value for key, value in report.items() if key != "mentions"}
+            for name, report in report_document(brand, state).items()
+        }
+        self.publish(brand, {"type": "run_completed", "brand": brand, "observed_at": observed_at.isoformat(),
+                             "platforms": platforms})
+
+    def on_mentions(self, brand: str, platform: str, mentions: List[Mention], observed_at: datetime) -> None:
+        """Mention listener: counts by sentiment plus the first few new mentions."""
+        if not self.wanted(normalize_brand(brand)) or not mentions:
+            return
+        self.publish(brand, {
+            "type": "mentions", "brand": brand, "platform": platform, "observed_at": observed_at.isoformat(),
+            "count": len(mentions), "sentiment": dict(Counter(mention.sentiment for mention in mentions)),
+            "mentions": [mention.model_dump() for mention in mentions[:LIVE_MENTIONS_PER_MESSAGE]],
+        })
+
+    def metrics(self) -> dict:
+        subscribers = [subscriber for channel in self.channels.values() for subscriber in channel]
+        return {
+            "channels": len(self.channels),
+            "subscribers": len(subscribers),
+            "queued_messages": sum(len(subscriber.outbox) for subscriber in subscribers),
+            "top_channels": sorted(((key, len(channel)) for key, channel in self.channels.items()),
+                                   key=lambda item: -item[1])[:10],
+            "counters": {**self.counters, "dropped": self.counters["dropped"] + sum(s.dropped for s in subscribers)},
+            "relay": dict(self.relay.counters, remote_channels=len(self.relay.remote_brands)) if self.relay else None,
+        }
+
+
+broadcaster = Broadcaster()
+live_relay = LiveRelay()
+
+router = APIRouter(prefix="/live", tags=["live"])
+
+
+@router.websocket("/brands/{brand}")
+async def subscribe_brand(websocket: WebSocket, brand: str):
+    """Stream `run_completed` and `mentions` updates for one brand until the client disconnects."""
+    await websocket.accept()
+    subscriber = broadcaster.subscribe(brand)
+    await websocket.send_text(json.dumps({"type": "subscribed", "brand": brand, "buffer": broadcaster.buffer}))
+
+    async def drain_client():
+        # Nothing is expected from the client; reading is how a disconnect is noticed.
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    reader = asyncio.create_task(drain_client())
+    try:
+        while not reader.done():
+            waiter = asyncio.create_task(subscriber.next_messages())
+            done, _ = await asyncio.wait({waiter, reader}, timeout=LIVE_PING_SECONDS,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if waiter not in done:
+                waiter.cancel()
+                if not reader.done():
+                    await websocket.send_text('{"type":"ping"}')
+                continue
+            for message in waiter.result():
+                await websocket.send_text(message)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        reader.cancel()
+        broadcaster.unsubscribe(subscriber)
+        if websocket.application_state != WebSocketState.DISCONNECTED:
+            try:
+                await websocket.close()
+            except RuntimeError:
+                pass
+
+
+@router.get("/metrics")
+def live_metrics():
+    return broadcaster.metrics()
@@ -0,0 +1,319 @@
+import asyncio
+import json
+import os
+import re
+from collections import Counter
+from typing import Any, AsyncGenerator, Callable, Dict, List, Literal, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.models import LlmRequest
+from google.genai import types
+from pydantic import BaseModel
+
+from mcp_brand_agent.brands import brand_from_content
+from mcp_brand_agent.cassettes import CassetteMiss
+from mcp_brand_agent.schemas import (
+    Mention,
+    SentimentBreakdown,
+    SinglePlatformAnalysisReport,
+    WordCloudTheme,
+)
+from mcp_brand_agent.metering import usage_meter
+from mcp_brand_agent.tool_helper import search_web_async
+
+MENTION_TARGET = int(os.getenv("MENTION_TARGET", "200"))
+BATCH_SIZE = int(os.getenv("MAPREDUCE_BATCH_SIZE", "25"))
+MAX_CONCURRENCY = int(os.getenv("MAPREDUCE_CONCURRENCY", "8"))
+CLASSIFIER = os.getenv("MAPREDUCE_CLASSIFIER", "llm")  # "llm" or "local"
+MAX_EMPTY_PAGE_WAVES = 2
+
+POSITIVE_WORDS = {
+    "good", "great", "love", "excellent", "amazing", "best", "innovative", "impressive",
+    "win", "growth", "praise", "success", "support", "safe", "improve", "improved", "strong",
+}
+NEGATIVE_WORDS = {
+    "bad", "worst", "hate", "terrible", "lawsuit", "recall", "crash", "fraud", "scandal",
+    "layoff", "layoffs", "boycott", "unsafe", "fail", "failed", "problem", "complaint", "fine",
+}
+ETHICAL_THEMES = {
+    "sustainability": ("climate", "emission", "sustainab", "carbon", "environment", "recycl", "renewable"),
+    "labor practices": ("worker", "labor", "labour", "union", "wage", "layoff", "employee", "strike"),
+    "safety": ("safety", "recall", "crash", "accident", "injur", "unsafe"),
+    "privacy": ("privacy", "data", "surveillance", "tracking", "breach"),
+    "governance": ("lawsuit", "fraud", "regulat", "compliance", "board", "investigation", "sec "),
+    "social impact": ("community", "diversity", "inclusion", "donat", "charity", "access"),
+}
+STOPWORDS = {
+    "the", "and", "for", "that", "with", "this", "are", "was", "but", "not", "have", "has",
+    "from", "they", "you", "its", "their", "about", "will", "just", "more", "than", "been",
+    "what", "when", "your", "our", "who", "all", "can", "out", "new", "said", "also", "into",
+    "how", "why", "after", "over", "some", "https", "http", "www", "com",
+}
+
+
+class ClassifiedMention(BaseModel):
+    index: int
+    sentiment: Literal["positive", "negative", "neutral"]
+    ethical_context: str
+
+
+class BatchClassification(BaseModel):
+    mentions: List[ClassifiedMention]
+
+
+def parse_search_results(result: Any) -> List[Dict[str, str]]:
+    """Turn a raw search tool result into `{"url", "text", "date"}` candidates."""
+    if isinstance(result, dict) and "error" in result:
+        return []
+    if isinstance(result, list):
+        result = "\n".join(str(item.get("text", item)) if isinstance(item, dict) else str(item) for item in result)
+    if isinstance(result, str):
+        try:
+            result = json.loads(result)
+        except json.JSONDecodeError:
+            return _parse_markdown_results(result)
+
+    found = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            url = node.get("link") or node.get("url")
+            if isinstance(url, str) and url.startswith("http"):
+                text = " ".join(
+                    str(node[key]) for key in ("title", "description", "snippet") if node.get(key)
+                )
+                found.append({"url": url, "text": text.strip(), "date": str(node.get("date") or "Recent")})
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    walk(result)
+    return found
+
+
+def _parse_markdown_results(text: str) -> List[Dict[str, str]]:
+    found = []
+    for match in re.finditer(r"\[([^\]]+)\]\((https?://[^)\s]+)\)([^\[]*)", text):
+        title, url, tail = match.groups()
+        snippet = " ".join(tail.split())[:400]
+        found.append({"url": url, "text": f"{title} {snippet}".strip(), "date": "Recent"})
+    return found
+
+
+async def collect_raw_mentions(
+    brand: str,
+    domain: Optional[str],
+    query_hint: str,
+    target: int = MENTION_TARGET,
+    max_concurrency: int = MAX_CONCURRENCY,
+    on_search: Optional[Callable[[], None]] = None,
+) -> List[Dict[str, str]]:
+    """Page through search results until `target` unique mentions are collected.
+
+    Pages are fetched in waves of `max_concurrency` parallel requests; `on_search` is
+    called before each request (metering may raise to stop the branch).
+    """
+    query = f"{brand} {query_hint}".strip()
+    if domain:
+        query = f"{query} site:{domain}"
+
+    mentions: Dict[str, Dict[str, str]] = {}
+    page = 0
+    empty_waves = 0
+    while len(mentions) < target and empty_waves < MAX_EMPTY_PAGE_WAVES:
+        cursors = [str(p) if p else None for p in range(page, page + max_concurrency)]
+        page += max_concurrency
+        if on_search:
+            for _ in cursors:
+                on_search()
+        results = await asyncio.gather(*(search_web_async(query, cursor) for cursor in cursors))
+        before = len(mentions)
+        for result in results:
+            for candidate in parse_search_results(result):
+                if domain and domain not in candidate["url"]:
+                    continue
+                if candidate["text"]:
+                    mentions.setdefault(candidate["url"], candidate)
+        empty_waves = empty_waves + 1 if len(mentions) == before else 0
+
+    return list(mentions.values())[:target]
+
+
+def classify_locally(batch: List[Dict[str, str]]) -> List[Mention]:
+    """Deterministic lexicon classifier used when no LLM is wanted (or the LLM call fails)."""
+    classified = []
+    for raw in batch:
+        lowered = raw["text"].lower()
+        words = set(re.findall(r"[a-z']+", lowered))
+        score = len(words & POSITIVE_WORDS) - len(words & NEGATIVE_WORDS)
+        sentiment = "positive" if score > 0 else "negative" if score < 0 else "neutral"
+        context = next(
+            (theme for theme, needles in ETHICAL_THEMES.items() if any(n in lowered for n in needles)),
+            "general",
+        )
+        classified.append(Mention(
+            date=raw["date"], text=raw["text"], sentiment=sentiment, ethical_context=context, url=raw["url"],
+        ))
+    return classified
+
+
+async def classify_with_llm(
+    model,
+    brand: str,
+    batch: List[Dict[str, str]],
+    on_usage: Optional[Callable[[int, int], None]] = None,
+) -> List[Mention]:
+    """Classify one batch of mentions in a single LLM call; `on_usage(prompt, completion)` gets its token counts."""
+    lines = "\n".join(f"{i}. {raw['text'][:500]}" for i, raw in enumerate(batch))
+    request = LlmRequest(
+        model=model.model,
+        contents=[types.Content(role="user", parts=[types.Part(text=lines)])],
+        config=types.GenerateContentConfig(
+            system_instruction=f"""
+You classify social media posts and articles about the brand "{brand}".
+For every numbered item return its index, sentiment ("positive", "negative" or "neutral")
+and a short ethical_context theme (e.g. sustainability, labor practices, safety, privacy, governance).
+Return ONLY JSON: {{"mentions": [{{"index": 0, "sentiment": "neutral", "ethical_context": "theme"}}]}}
+""",
+            response_schema=BatchClassification,
+        ),
+    )
+    text = ""
+    async for response in model.generate_content_async(request):
+        if on_usage and response.usage_metadata:
+            on_usage(response.usage_metadata.prompt_token_count or 0, response.usage_metadata.candidates_token_count or 0)
+        if response.content and response.content.parts:
+            text += "".join(part.text for part in response.content.parts if part.text)
+
+    labels = {item.index: item for item in BatchClassification.model_validate_json(text).mentions}
+    fallback = classify_locally(batch)
+    return [
+        Mention(
+            date=raw["date"],
+            text=raw["text"],
+            sentiment=labels[i].sentiment,
+            ethical_context=labels[i].ethical_context,
+            url=raw["url"],
+        ) if i in labels else fallback[i]
+        for i, raw in enumerate(batch)
+    ]
+
+
+async def classify_batches(
+    model,
+    brand: str,
+    raw_mentions: List[Dict[str, str]],
+    batch_size: int = BATCH_SIZE,
+    max_concurrency: int = MAX_CONCURRENCY,
+    classifier: str = CLASSIFIER,
+    on_usage: Optional[Callable[[int, int], None]] = None,
+) -> List[List[Mention]]:
+    """Map step: classify fixed-size batches concurrently, at most `max_concurrency` at a time.
+
+    A batch whose LLM call fails for any reason is classified locally instead, so one bad
+    batch does not fail the platform.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    batches = [raw_mentions[i:i + batch_size] for i in range(0, len(raw_mentions), batch_size)]
+
+    async def run(batch):
+        if classifier != "llm" or model is None:
+            return classify_locally(batch)
+        async with semaphore:
+            try:
+                return await classify_with_llm(model, brand, batch, on_usage)
+            except CassetteMiss:
+                raise
+            except Exception as e:  # malformed output as well as API errors, timeouts and rate limits
+                print(f"  [MapReduce] LLM batch classification failed, using local classifier: {e!r}")
+                return classify_locally(batch)
+
+    return list(await asyncio.gather(*(run(batch) for batch in batches)))
+
+
+def reduce_batches(brand: str, platform_name: str, batches: List[List[Mention]]) -> SinglePlatformAnalysisReport:
+    """Reduce step: deterministically merge classified batches into one platform report."""
+    mentions = [mention for batch in batches for mention in batch]
+    total = len(mentions)
+    sentiments = Counter(mention.sentiment for mention in mentions)
+    themes = Counter(mention.ethical_context for mention in mentions)
+    negative_themes = Counter(m.ethical_context for m in mentions if m.sentiment == "negative")
+
+    def fraction(label):
+        return round(sentiments[label] / total, 4) if total else 0.0
+
+    words = Counter()
+    brand_words = set(brand.lower().split())
+    for mention in mentions:
+        for word in re.findall(r"[a-z][a-z'-]{2,}", mention.text.lower()):
+            if word not in STOPWORDS and word not in brand_words:
+                words[word] += 1
+    top_words = sorted(words.items(), key=lambda item: (-item[1], item[0]))[:15]
+    max_count = top_words[0][1] if top_words else 1
+
+    return SinglePlatformAnalysisReport(
+        brand_name=brand,
+        platform_name=platform_name,
+        total_mentions_on_platform=total,
+        platform_sentiment_breakdown=SentimentBreakdown(
+            positive=fraction("positive"), negative=fraction("negative"), neutral=fraction("neutral"),
+        ),
+        ethical_highlights_on_platform=[
+            f"{theme}: {count} of {total} mentions ({negative_themes[theme]} negative)"
+            for theme, count in sorted(themes.items(), key=lambda item: (-item[1], item[0]))[:5]
+        ],
+        word_cloud_themes_on_platform=[
+            WordCloudTheme(word=word, weight=round(1 + 9 * count / max_count, 1)) for word, count in top_words
+        ],
+        mentions_on_platform=mentions,
+    )
+
+
+class MapReducePlatformAgent(BaseAgent):
+    """Analyzes hundreds of mentions on one platform with paginated search and batched classification.
+
+    Writes its report to `final_<state_prefix>_results`, like the sequential LLM pipeline.
+    """
+
+    platform_name: str
+    state_prefix: str
+    domain: Optional[str] = None
+    query_hint: str = ""
+    model: Any = None
+    mention_target: int = MENTION_TARGET
+    batch_size: int = BATCH_SIZE
+    max_concurrency: int = MAX_CONCURRENCY
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        brand = brand_from_content(ctx.user_content)
+        ids = (ctx.invocation_id, ctx.session.id, brand, self.platform_name)
+
+        def on_search():
+            usage_meter.check_budget(ctx.invocation_id, self.platform_name, self.state_prefix, searching=True)
+            usage_meter.record_search(*ids)
+
+        def on_usage(prompt_tokens, completion_tokens):
+            usage_meter.record_llm(*ids, self.model.model, prompt_tokens, completion_tokens)
+
+        raw_mentions = await collect_raw_mentions(
+            brand, self.domain, self.query_hint, self.mention_target, self.max_concurrency, on_search,
+        )
+        usage_meter.check_budget(ctx.invocation_id, self.platform_name, self.state_prefix)
+        batches = await classify_batches(
+            self.model, brand, raw_mentions, self.batch_size, self.max_concurrency, on_usage=on_usage,
+        )
+        report = reduce_batches(brand, self.platform_name, batches)
+        print(f"  [MapReduce] {self.platform_name}: {report.total_mentions_on_platform} mentions in {len(batches)} batches")
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={
+                f"final_{self.state_prefix}_results": report.model_dump(),
+                f"{self.state_prefix}_cost": usage_meter.run_usage(ctx.invocation_id)["platforms"].get(self.platform_name),
+            }),
+        )
@@ -0,0 +1,214 @@
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from mcp_brand_agent.rollups import normalize_mention_date
+from mcp_brand_agent.schemas import Mention
+
+SENTIMENTS = ("positive", "negative", "neutral")
+SENTIMENT_CODES = {sentiment: code for code, sentiment in enumerate(SENTIMENTS)}
+GROUP_COLUMNS = {"brand": "brand_codes", "platform": "platform_codes", "ethical_context": "context_codes"}
+
+
+class Categories:
+    """Interned values of a categorical column; rows store the small integer code."""
+
+    def __init__(self, values: Sequence[str] = ()):
+        self.values: List[str] = list(values)
+        self.codes: Dict[str, int] = {value: code for code, value in enumerate(self.values)}
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class StringArena:
+    """Append-only UTF-8 buffer; rows keep (start, length) pairs into it instead of str objects."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.starts: List[int] = []
+        self.lengths: List[int] = []
+
+    def append(self, value: str) -> None:
+        encoded = value.encode("utf-8")
+        self.starts.append(len(self.buffer))
+        self.lengths.append(len(encoded))
+        self.buffer += encoded
+
+
+class MentionTable:
+    """Array-backed collection of mentions for aggregation over large histories.
+
+    Brand, platform, sentiment and ethical context are categorical code columns, dates are
+    int64 epoch seconds and text, url and the raw date live in string arenas. Every column
+    is a NumPy array, so `to_numpy()` hands them out without copying and aggregations run
+    vectorized. `Mention` objects are only built on demand, e.g. at the API boundary.
+    """
+
+    def __init__(self, brands: Categories, platforms: Categories, contexts: Categories, columns: Dict[str, np.ndarray],
+                 arenas: Dict[str, np.ndarray]):
+        self.brands = brands
+        self.platforms = platforms
+        self.contexts = contexts
+        self.columns = columns
+        self.arenas = arenas
+
+    @classmethod
+    def from_mentions(cls, brand: str, platform: str, mentions: Sequence[Mention], observed_at: datetime) -> "MentionTable":
+        builder = MentionTableBuilder()
+        for mention in mentions:
+            builder.add(brand, platform, mention, observed_at)
+        return builder.build()
+
+    def __len__(self) -> int:
+        return len(self.columns["ts"])
+
+    def to_numpy(self) -> Dict[str, np.ndarray]:
+        """The table's columns as NumPy arrays (views, not copies)."""
+        return dict(self.columns)
+
+    def _string(self, name: str, row: int) -> str:
+        start = self.columns[f"{name}_starts"][row]
+        end = start + self.columns[f"{name}_lengths"][row]
+        return self.arenas[name][start:end].tobytes().decode("utf-8")
+
+    def text(self, row: int) -> str:
+        return self._string("text", row)
+
+    def mention(self, row: int) -> Mention:
+        """Materialize one row; rows were validated when added, so validation is skipped."""
+        return Mention.model_construct(
+            date=self._string("date", row),
+            text=self._string("text", row),
+            sentiment=SENTIMENTS[self.columns["sentiment_codes"][row]],
+            ethical_context=self.contexts.values[self.columns["context_codes"][row]],
+            url=self._string("url", row),
+        )
+
+    def mentions(self, rows: Optional[Sequence[int]] = None) -> Iterator[Mention]:
+        for row in range(len(self)) if rows is None else rows:
+            yield self.mention(int(row))
+
+    def __iter__(self) -> Iterator[Mention]:
+        return self.mentions()
+
+    def brand(self, row: int) -> str:
+        return self.brands.values[self.columns["brand_codes"][row]]
+
+    def platform(self, row: int) -> str:
+        return self.platforms.values[self.columns["platform_codes"][row]]
+
+    def take(self, rows: np.ndarray) -> "MentionTable":
+        """Rows selected by index or boolean mask; the string arenas and categories are shared, not copied."""
+        return MentionTable(self.brands, self.platforms, self.contexts,
+                            {name: column[rows] for name, column in self.columns.items()}, self.arenas)
+
+    def where(self, brand: Optional[str] = None, platform: Optional[str] = None, sentiment: Optional[str] = None,
+              since: Optional[datetime] = None, until: Optional[datetime] = None) -> "MentionTable":
+        mask = np.ones(len(self), dtype=bool)
+        for value, categories, column in ((brand, self.brands, "brand_codes"), (platform, self.platforms, "platform_codes")):
+            if value is not None:
+                mask &= self.columns[column] == categories.codes.get(value, -1)
+        if sentiment is not None:
+            mask &= self.columns["sentiment_codes"] == SENTIMENT_CODES[sentiment]
+        if since is not None:
+            mask &= self.columns["ts"] >= int(since.timestamp())
+        if until is not None:
+            mask &= self.columns["ts"] < int(until.timestamp())
+        return self.take(mask)
+
+    def sentiment_counts(self, by: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """Positive, negative and neutral counts overall or per brand, platform or ethical context."""
+        sentiments = self.columns["sentiment_codes"].astype(np.int64)
+        if by is None:
+            counts = np.bincount(sentiments, minlength=len(SENTIMENTS))
+            return {"all": dict(zip(SENTIMENTS, counts.tolist()))}
+        categories = {"brand": self.brands, "platform": self.platforms, "ethical_context": self.contexts}[by]
+        groups = self.columns[GROUP_COLUMNS[by]].astype(np.int64)
+        counts = np.bincount(groups * len(SENTIMENTS) + sentiments, minlength=len(categories) * len(SENTIMENTS))
+        counts = counts.reshape(-1, len(SENTIMENTS))
+        return {
+            categories.values[code]: dict(zip(SENTIMENTS, row.tolist()))
+            for code, row in enumerate(counts) if row.any()
+        }
+
+    def daily_counts(self) -> Dict[str, np.ndarray]:
+        """Per-day sentiment counts: `days` (epoch seconds at UTC midnight) and a (days, 3) `counts` matrix."""
+        if not len(self):
+            return {"days": np.empty(0, dtype=np.int64), "counts": np.empty((0, len(SENTIMENTS)), dtype=np.int64)}
+        days, day_index = np.unique(self.columns["ts"] // 86400, return_inverse=True)
+        counts = np.bincount(day_index * len(SENTIMENTS) + self.columns["sentiment_codes"],
+                             minlength=len(days) * len(SENTIMENTS)).reshape(-1, len(SENTIMENTS))
+        return {"days": days * 86400, "counts": counts}
+
+    def nbytes(self) -> int:
+        """Bytes held by the columns and arenas (excludes the small category lists)."""
+        return sum(column.nbytes for column in self.columns.values()) + sum(arena.nbytes for arena in self.arenas.values())
+
+
+class MentionTableBuilder:
+    """Accumulates rows, then freezes them into a MentionTable in one pass."""
+
+    def __init__(self):
+        self.brands = Categories()
+        self.platforms = Categories()
+        self.contexts = Categories()
+        self._brand_codes: List[int] = []
+        self._platform_codes: List[int] = []
+        self._sentiment_codes: List[int] = []
+        self._context_codes: List[int] = []
+        self._ts: List[int] = []
+        self._strings = {"text": StringArena(), "url": StringArena(), "date": StringArena()}
+        self._parsed_dates: Dict[tuple, int] = {}
+
+    def add(self, brand: str, platform: str, mention: Mention, observed_at: datetime) -> None:
+        # Dates repeat heavily across a collection, and parsing them dominates the cost of adding a row.
+        ts = self._parsed_dates.get((mention.date, observed_at))
+        if ts is None:
+            ts = self._parsed_dates[(mention.date, observed_at)] = int(
+                normalize_mention_date(mention.date, observed_at).timestamp()
+            )
+        self.add_row(brand, platform, mention.date, ts, mention.sentiment, mention.ethical_context, mention.text,
+                     mention.url)
+
+    def add_row(self, brand: str, platform: str, date: str, ts: int, sentiment: str, ethical_context: str,
+                text: str, url: str) -> None:
+        self._brand_codes.append(self.brands.code(brand))
+        self._platform_codes.append(self.platforms.code(platform))
+        self._sentiment_codes.append(SENTIMENT_CODES[sentiment])
+        self._context_codes.append(self.contexts.code(ethical_context))
+        self._ts.append(ts)
+        self._strings["text"].append(text)
+        self._strings["url"].append(url)
+        self._strings["date"].append(date)
+
+    def build(self) -> MentionTable:
+        columns = {
+            "brand_codes": np.array(self._brand_codes, dtype=_code_dtype(len(self.brands))),
+            "platform_codes": np.array(self._platform_codes, dtype=_code_dtype(len(self.platforms))),
+            "sentiment_codes": np.array(self._sentiment_codes, dtype=np.int8),
+            "context_codes": np.array(self._context_codes, dtype=_code_dtype(len(self.contexts))),
+            "ts": np.array(self._ts, dtype=np.int64),
+        }
+        arenas = {}
+        for name, arena in self._strings.items():
+            arenas[name] = np.frombuffer(bytes(arena.buffer), dtype=np.uint8)
+            columns[f"{name}_starts"] = np.array(arena.starts, dtype=np.int64)
+            columns[f"{name}_lengths"] = np.array(arena.lengths, dtype=np.int32)
+        return MentionTable(self.brands, self.platforms, self.contexts, columns, arenas)
+
+
+def _code_dtype(cardinality: int):
+    if cardinality <= np.iinfo(np.uint8).max:
+        return np.uint8
+    if cardinality <= np.iinfo(np.uint16).max:
+        return np.uint16
+    return np.int32
@@ -0,0 +1,267 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+import litellm
+from fastapi import APIRouter, HTTPException
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.tools import BaseTool, ToolContext
+
+from mcp_brand_agent.brands import brand_from_content, normalize_brand
+from mcp_brand_agent.storage import connect
+
+BUDGET_BRANCH_USD = float(os.getenv("BUDGET_BRANCH_USD", "0"))  # 0 disables a budget
+BUDGET_BRANCH_TOKENS = int(os.getenv("BUDGET_BRANCH_TOKENS", "0"))
+BUDGET_BRANCH_SEARCH_CALLS = int(os.getenv("BUDGET_BRANCH_SEARCH_CALLS", "0"))
+BUDGET_RUN_USD = float(os.getenv("BUDGET_RUN_USD", "0"))
+SEARCH_CALL_COST_USD = float(os.getenv("SEARCH_CALL_COST_USD", "0"))
+MAX_TRACKED_RUNS = 1000
+GROUP_BY_COLUMNS = {"brand": "brand", "platform": "platform", "day": "day", "model": "model"}
+
+
+class BudgetExceededError(RuntimeError):
+    """Raised from a model or tool callback when a branch or run has spent its budget."""
+
+    def __init__(self, platform_key: str, reason: str):
+        super().__init__(reason)
+        self.platform_key = platform_key
+
+
+def _empty_usage() -> Dict[str, float]:
+    return {"llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "search_calls": 0, "cost_usd": 0.0}
+
+
+def llm_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """USD cost of one call from litellm's price table; 0 for models it does not know."""
+    try:
+        prompt_cost, completion_cost = litellm.cost_per_token(
+            model=model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+        )
+    except Exception:
+        return 0.0
+    return prompt_cost + completion_cost
+
+
+class UsageMeter:
+    """Meters LLM tokens, search calls and spend per run, platform branch and brand.
+
+    Running totals live in memory for budget checks; every call is also appended to a
+    SQLite ledger (costs.db) that the report API aggregates over time.
+    """
+
+    def __init__(self, db_name: str = "costs.db"):
+        self.db_name = db_name
+        self._conn = None
+        self._runs: "OrderedDict[str, Dict[str, Dict[str, float]]]" = OrderedDict()
+        self._sessions: "OrderedDict[str, str]" = OrderedDict()  # invocation id -> session id
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = connect(self.db_name)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS usage_events (
+                    ts INTEGER NOT NULL,
+                    day TEXT NOT NULL,
+                    invocation_id TEXT NOT NULL,
+                    session_id TEXT,
+                    brand TEXT NOT NULL,
+                    platform TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    model TEXT,
+                    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                    completion_tokens INTEGER NOT NULL DEFAULT 0,
+                    cost_usd REAL NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS usage_by_time ON usage_events (ts);
+                CREATE INDEX IF NOT EXISTS usage_by_invocation ON usage_events (invocation_id);
+            """)
+        return self._conn
+
+    def start_run(self, invocation_id: str, session_id: str) -> None:
+        """Note the session of a run, for the ledger rows of its model and tool callbacks."""
+        with self._lock:
+            self._sessions[invocation_id] = session_id
+            if len(self._sessions) > MAX_TRACKED_RUNS:
+                self._sessions.popitem(last=False)
+
+    def _branch(self, invocation_id: str, platform: str) -> Dict[str, float]:
+        run = self._runs.get(invocation_id)
+        if run is None:
+            run = self._runs[invocation_id] = {}
+            if len(self._runs) > MAX_TRACKED_RUNS:
+                self._runs.popitem(last=False)
+        return run.setdefault(platform, _empty_usage())
+
+    def _record(self, invocation_id, session_id, brand, platform, kind, model, prompt_tokens, completion_tokens, cost):
+        now = time.time()
+        with self._lock:
+            usage = self._branch(invocation_id, platform)
+            if kind == "llm":
+                usage["llm_calls"] += 1
+                usage["prompt_tokens"] += prompt_tokens
+                usage["completion_tokens"] += completion_tokens
+            else:
+                usage["search_calls"] += 1
+            usage["cost_usd"] += cost
+            snapshot = dict(usage)
+            self.conn.execute(
+                """INSERT INTO usage_events (ts, day, invocation_id, session_id, brand, platform, kind, model,
+                   prompt_tokens, completion_tokens, cost_usd) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    int(now), datetime.fromtimestamp(now, timezone.utc).strftime("%Y-%m-%d"), invocation_id,
+                    session_id, normalize_brand(brand), platform, kind, model, prompt_tokens, completion_tokens, cost,
+                ),
+            )
+        return snapshot
+
+    def record_llm(self, invocation_id, session_id, brand, platform, model, prompt_tokens, completion_tokens):
+        cost = llm_cost(model, prompt_tokens, completion_tokens)
+        return self._record(invocation_id, session_id, brand, platform, "llm", model, prompt_tokens, completion_tokens, cost)
+
+    def record_search(self, invocation_id, session_id, brand, platform):
+        return self._record(invocation_id, session_id, brand, platform, "search", None, 0, 0, SEARCH_CALL_COST_USD)
+
+    def check_budget(self, invocation_id: str, platform: str, platform_key: str, searching: bool = False) -> None:
+        """Raise BudgetExceededError if the branch or its run is out of budget."""
+        with self._lock:
+            run = self._runs.get(invocation_id, {})
+            usage = run.get(platform, _empty_usage())
+            run_cost = sum(branch["cost_usd"] for branch in run.values())
+        tokens = usage["prompt_tokens"] + usage["completion_tokens"]
+        if BUDGET_BRANCH_USD and usage["cost_usd"] >= BUDGET_BRANCH_USD:
+            reason = f"{platform} branch spent ${usage['cost_usd']:.4f} of its ${BUDGET_BRANCH_USD} budget"
+        elif BUDGET_BRANCH_TOKENS and tokens >= BUDGET_BRANCH_TOKENS:
+            reason = f"{platform} branch used {tokens} of its {BUDGET_BRANCH_TOKENS} token budget"
+        elif searching and BUDGET_BRANCH_SEARCH_CALLS and usage["search_calls"] >= BUDGET_BRANCH_SEARCH_CALLS:
+            reason = f"{platform} branch made {usage['search_calls']} of its {BUDGET_BRANCH_SEARCH_CALLS} search calls"
+        elif BUDGET_RUN_USD and run_cost >= BUDGET_RUN_USD:
+            reason = f"run spent ${run_cost:.4f} of its ${BUDGET_RUN_USD} budget"
+        else:
+            return
+        raise BudgetExceededError(platform_key, reason)
+
+    def spent_usd(self, since: datetime, platform: Optional[str] = None) -> float:
+        """USD recorded in the ledger since `since`, for one platform or all of them."""
+        clause, params = ("AND platform = ?", [platform]) if platform else ("", [])
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT COALESCE(SUM(cost_usd), 0) FROM usage_events WHERE ts >= ? {clause}",
+                [int(since.timestamp()), *params],
+            ).fetchone()
+        return row[0]
+
+    def run_usage(self, invocation_id: str) -> dict:
+        with self._lock:
+            branches = {platform: dict(usage) for platform, usage in self._runs.get(invocation_id, {}).items()}
+        total = _empty_usage()
+        for usage in branches.values():
+            for field, value in usage.items():
+                total[field] += value
+        return {"total": total, "platforms": branches}
+
+    def finish_run(self, invocation_id: str) -> dict:
+        usage = self.run_usage(invocation_id)
+        with self._lock:
+            self._runs.pop(invocation_id, None)
+            self._sessions.pop(invocation_id, None)
+        return usage
+
+    def callbacks(self, platform_name: str, platform_key: str, model: str):
+        """Model and tool callbacks that meter and budget one platform branch calling `model`."""
+        cost_key = f"{platform_key}_cost"
+
+        def context_ids(context: CallbackContext):
+            session_id = self._sessions.get(context.invocation_id)
+            return context.invocation_id, session_id, brand_from_content(context.user_content)
+
+        def before_model(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+            self.check_budget(callback_context.invocation_id, platform_name, platform_key)
+            return None
+
+        def after_model(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+            usage = llm_response.usage_metadata
+            if llm_response.partial or not usage:
+                return None
+            callback_context.state[cost_key] = self.record_llm(
+                *context_ids(callback_context), platform_name, model,
+                usage.prompt_token_count or 0, usage.candidates_token_count or 0,
+            )
+            return None
+
+        def before_tool(tool: BaseTool, args: dict, tool_context: ToolContext) -> Optional[dict]:
+            self.check_budget(tool_context.invocation_id, platform_name, platform_key, searching=True)
+            return None
+
+        def after_tool(tool: BaseTool, args: dict, tool_context: ToolContext, tool_response) -> Optional[dict]:
+            if tool.name == "search_web":
+                tool_context.state[cost_key] = self.record_search(*context_ids(tool_context), platform_name)
+            return None
+
+        return before_model, after_model, before_tool, after_tool
+
+    def report(self, group_by: str = "day", since: Optional[datetime] = None, until: Optional[datetime] = None,
+               brand: Optional[str] = None) -> list:
+        """Spend aggregated over time by brand, platform, day or model."""
+        column = GROUP_BY_COLUMNS[group_by]
+        where, params = [], []
+        if since:
+            where.append("ts >= ?")
+            params.append(int(since.timestamp()))
+        if until:
+            where.append("ts < ?")
+            params.append(int(until.timestamp()))
+        if brand:
+            where.append("brand = ?")
+            params.append(normalize_brand(brand))
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        with self._lock:
+            rows = self.conn.execute(
+                f"""SELECT {column} AS key, COUNT(DISTINCT invocation_id) AS runs,
+                           SUM(kind = 'llm') AS llm_calls, SUM(kind = 'search') AS search_calls,
+                           SUM(prompt_tokens) AS prompt_tokens, SUM(completion_tokens) AS completion_tokens,
+                           ROUND(SUM(cost_usd), 6) AS cost_usd
+                    FROM usage_events {clause} GROUP BY {column} ORDER BY {column}""",
+                params,
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def invocation_report(self, invocation_id: str) -> list:
+        with self._lock:
+            rows = self.conn.execute(
+                """SELECT platform, kind, model, COUNT(*) AS calls, SUM(prompt_tokens) AS prompt_tokens,
+                          SUM(completion_tokens) AS completion_tokens, ROUND(SUM(cost_usd), 6) AS cost_usd
+                   FROM usage_events WHERE invocation_id = ? GROUP BY platform, kind, model""",
+                (invocation_id,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+usage_meter = UsageMeter()
+
+
+def record_run_cost(callback_context: CallbackContext):
+    """Root after_agent_callback: attach the finished run's spend to session state as `run_cost`."""
+    callback_context.state["run_cost"] = usage_meter.finish_run(callback_context.invocation_id)
+    return None
+
+
+router = APIRouter(prefix="/costs", tags=["costs"])
+
+
+@router.get("")
+def get_cost_report(group_by: str = "day", since: Optional[datetime] = None, until: Optional[datetime] = None,
+                    brand: Optional[str] = None):
+    if group_by not in GROUP_BY_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of {', '.join(GROUP_BY_COLUMNS)}")
+    return usage_meter.report(group_by, since, until, brand)
+
+
+@router.get("/runs/{invocation_id}")
+def get_run_cost(invocation_id: str):
+    return usage_meter.invocation_report(invocation_id)
@@ -0,0 +1,154 @@
+import json
+import os
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+PLATFORM_REGISTRY_FILE = os.getenv("PLATFORM_REGISTRY_FILE")
+ENABLED_PLATFORMS = os.getenv("ENABLED_PLATFORMS")  # comma separated names, overrides `enabled`
+PLATFORM_CONCURRENCY = int(os.getenv("PLATFORM_CONCURRENCY", "4"))
+
+
+class PlatformConfig(BaseModel):
+    """One source the pipeline searches; every agent for it is generated from this entry."""
+
+    name: str
+    key: str
+    display_name: str
+    content_label: str
+    domain: Optional[str] = None
+    query_hints: str
+    source_hint: Optional[str] = None
+    text_hint: str = "actual post content"
+    url_hint: Optional[str] = None
+    mention_budget: Optional[int] = None
+    priority: int = 100
+    enabled: bool = True
+
+    @property
+    def sources(self) -> str:
+        return self.source_hint or f"from {self.domain} domain only"
+
+    @property
+    def url_example(self) -> str:
+        return self.url_hint or f"post link or {self.domain} domain"
+
+
+PLATFORMS: Dict[str, PlatformConfig] = {}
+
+
+def register_platform(platform: PlatformConfig) -> PlatformConfig:
+    """Add or replace a platform in the registry."""
+    PLATFORMS[platform.name] = platform
+    return platform
+
+
+def get_platform(name: str) -> PlatformConfig:
+    return PLATFORMS[name]
+
+
+def platform_names() -> List[str]:
+    return list(PLATFORMS)
+
+
+def enabled_platforms() -> List[PlatformConfig]:
+    """Enabled platforms, highest priority (lowest number) first."""
+    if ENABLED_PLATFORMS:
+        wanted = {name.strip() for name in ENABLED_PLATFORMS.split(",") if name.strip()}
+        selected = [p for p in PLATFORMS.values() if p.name in wanted]
+    else:
+        selected = [p for p in PLATFORMS.values() if p.enabled]
+    return sorted(selected, key=lambda p: (p.priority, p.name))
+
+
+def validate_platform_name(name: str) -> str:
+    """Pydantic validator restricting platform names to registered platforms."""
+    if name not in PLATFORMS:
+        raise ValueError(f"unknown platform {name!r}, expected one of {', '.join(PLATFORMS)}")
+    return name
+
+
+def load_platform_file(path: str) -> None:
+    """Register every platform defined in a JSON list of PlatformConfig objects."""
+    with open(path) as f:
+        for entry in json.load(f):
+            register_platform(PlatformConfig(**entry))
+
+
+register_platform(PlatformConfig(
+    name="Twitter",
+    key="twitter",
+    display_name="Twitter/X",
+    content_label="Twitter/X posts",
+    domain="x.com",
+    query_hints="search using brand name, hashtags, and keywords",
+    priority=10,
+))
+register_platform(PlatformConfig(
+    name="LinkedIn",
+    key="linkedin",
+    display_name="LinkedIn",
+    content_label="LinkedIn posts",
+    domain="linkedin.com",
+    query_hints="search company pages, executives, and industry posts",
+    priority=20,
+))
+register_platform(PlatformConfig(
+    name="Reddit",
+    key="reddit",
+    display_name="Reddit",
+    content_label="Reddit posts",
+    domain="reddit.com",
+    query_hints="search relevant subreddits and brand discussions",
+    priority=30,
+))
+register_platform(PlatformConfig(
+    name="News",
+    key="news",
+    display_name="news sites",
+    content_label="news articles",
+    query_hints="search major news sites and industry publications",
+    source_hint="from reputable news sites only",
+    text_hint="actual article excerpt",
+    url_hint="article link or news site domain",
+    priority=40,
+))
+register_platform(PlatformConfig(
+    name="YouTube",
+    key="youtube",
+    display_name="YouTube",
+    content_label="YouTube videos or comments",
+    domain="youtube.com",
+    query_hints="search brand reviews, channels, and video comments",
+    text_hint="actual video title, description, or comment",
+    url_hint="video link or youtube.com domain",
+    priority=50,
+    enabled=False,
+))
+register_platform(PlatformConfig(
+    name="Glassdoor",
+    key="glassdoor",
+    display_name="Glassdoor",
+    content_label="Glassdoor employee reviews",
+    domain="glassdoor.com",
+    query_hints="search employee reviews and company ratings",
+    text_hint="actual review content",
+    url_hint="review link or glassdoor.com domain",
+    priority=60,
+    enabled=False,
+))
+register_platform(PlatformConfig(
+    name="Trustpilot",
+    key="trustpilot",
+    display_name="Trustpilot",
+    content_label="Trustpilot customer reviews",
+    domain="trustpilot.com",
+    query_hints="search customer reviews and ratings",
+    text_hint="actual review content",
+    url_hint="review link or trustpilot.com domain",
+    priority=70,
+    enabled=False,
+))
+
+if PLATFORM_REGISTRY_FILE:
+    load_platform_file(PLATFORM_REGISTRY_FILE)
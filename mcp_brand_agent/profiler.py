@@ -0,0 +1,246 @@
+import asyncio
+import contextvars
+import os
+import re
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from google.adk.agents.invocation_context import InvocationContext
+
+from mcp_brand_agent.admin import ADMIN_HEADER, check_admin_token, is_admin_token
+from mcp_brand_agent.storage import data_path
+
+PROFILE_RUNS = os.getenv("PROFILE_RUNS", "0") == "1"  # profile every run, not only requests asking for it
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "900"))
+PROFILE_HEADER = "x-profile"
+MAX_STACK_DEPTH = 128
+
+profile_requested: contextvars.ContextVar[bool] = contextvars.ContextVar("profile_requested", default=False)
+_active_profile: contextvars.ContextVar[Optional["RunProfile"]] = contextvars.ContextVar("active_profile", default=None)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _thread_stack(frame) -> List[str]:
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    return stack[::-1]
+
+
+def _await_stack(task: asyncio.Task) -> List[str]:
+    """Where a suspended task is waiting: its chain of awaiting coroutines, outermost first."""
+    return [_frame_label(frame) for frame in task.get_stack(limit=MAX_STACK_DEPTH)]
+
+
+class RunProfile:
+    """Samples collected for one root_agent invocation.
+
+    Each tick records the Python stack of the event-loop thread under "cpu" when one of the
+    run's tasks is executing, and the await chain of every other task of the run under
+    "await", so wall-clock time spent waiting on LLMs, search and sleeps is attributed to
+    the code that is waiting. Stacks are folded (`frame;frame;frame count`), the input
+    format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, session_id: str, invocation_id: str, loop: asyncio.AbstractEventLoop):
+        self.session_id = session_id
+        self.invocation_id = invocation_id
+        self.loop = loop
+        self.thread_id = threading.get_ident()
+        self.tasks: "weakref.WeakSet[asyncio.Task]" = weakref.WeakSet()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.cpu_samples = 0
+        self.started = time.time()
+        self.finished: Optional[float] = None
+
+    def sample(self, frames: Dict[int, object]) -> None:
+        self.samples += 1
+        running = asyncio.current_task(self.loop)
+        for task in list(self.tasks):
+            if task.done():
+                continue
+            if task is running:
+                frame = frames.get(self.thread_id)
+                if frame is not None:
+                    self.cpu_samples += 1
+                    self.stacks[";".join(["cpu", *_thread_stack(frame)])] += 1
+            else:
+                self.stacks[";".join(["await", *_await_stack(task)])] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    @property
+    def file_name(self) -> str:
+        safe_session = re.sub(r"[^A-Za-z0-9_.-]", "_", self.session_id)
+        return f"{safe_session}-{int(self.started)}-{self.invocation_id[-8:]}.folded"
+
+
+class Sampler:
+    """Background thread that samples every active RunProfile; it only runs while a profile is active."""
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.profiles: Dict[str, RunProfile] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._factories: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    def start(self, profile: RunProfile) -> None:
+        self._track_tasks(profile.loop)
+        with self._lock:
+            self.profiles[profile.invocation_id] = profile
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="run-profiler", daemon=True)
+                self._thread.start()
+
+    def stop(self, invocation_id: str) -> Optional[RunProfile]:
+        with self._lock:
+            profile = self.profiles.pop(invocation_id, None)
+        if profile is not None:
+            profile.finished = time.time()
+        return profile
+
+    def _track_tasks(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Install a task factory that adds tasks spawned inside a profiled run to its profile."""
+        if loop in self._factories:
+            return
+        previous = loop.get_task_factory()
+
+        def factory(loop, coro, **kwargs):
+            task = previous(loop, coro, **kwargs) if previous else asyncio.Task(coro, loop=loop, **kwargs)
+            context = kwargs.get("context") or contextvars.copy_context()
+            profile = context.get(_active_profile)
+            if profile is not None and profile.finished is None:
+                profile.tasks.add(task)
+            return task
+
+        loop.set_task_factory(factory)
+        self._factories[loop] = factory
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                profiles = list(self.profiles.values())
+                if not profiles:
+                    self._thread = None
+                    return
+            frames = sys._current_frames()
+            now = time.time()
+            for profile in profiles:
+                if now - profile.started > PROFILE_MAX_SECONDS:
+                    finish_profile(profile.invocation_id)
+                    continue
+                try:
+                    profile.sample(frames)
+                except RuntimeError:
+                    # A WeakSet or Counter changed size under us; skip this tick for the profile.
+                    pass
+            del frames
+            time.sleep(self.interval)
+
+
+sampler = Sampler()
+
+
+def profiles_dir() -> str:
+    path = data_path("profiles")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def finish_profile(invocation_id: str) -> Optional[str]:
+    """Stop sampling an invocation and write its folded stacks; returns the file name."""
+    profile = sampler.stop(invocation_id)
+    if profile is None:
+        return None
+    with open(os.path.join(profiles_dir(), profile.file_name), "w") as f:
+        f.write(profile.folded())
+    print(f"  [Profiler] {profile.file_name}: {profile.samples} samples over "
+          f"{profile.finished - profile.started:.1f}s, {profile.cpu_samples} on CPU")
+    return profile.file_name
+
+
+@contextmanager
+def run_profile(ctx: InvocationContext):
+    """Profile the root agent's run of `ctx` when PROFILE_RUNS is set or the request sent X-Profile.
+
+    The profile is written when the block exits, also when the run raises or is cancelled.
+    """
+    if not (PROFILE_RUNS or profile_requested.get()):
+        yield
+        return
+    profile = RunProfile(ctx.session.id, ctx.invocation_id, asyncio.get_running_loop())
+    profile.tasks.add(asyncio.current_task())
+    _active_profile.set(profile)
+    sampler.start(profile)
+    try:
+        yield
+    finally:
+        finish_profile(ctx.invocation_id)
+
+
+class ProfileRequestMiddleware:
+    """ASGI middleware that marks a request for profiling when it carries `X-Profile: 1`.
+
+    Profiling writes files under DATA_DIR, so the header is honoured only together with a
+    valid X-Admin-Token.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            headers = dict(scope["headers"])
+            requested = headers.get(PROFILE_HEADER.encode("latin-1"), b"").lower() in (b"1", b"true", b"yes")
+            if requested and is_admin_token(headers.get(ADMIN_HEADER.encode("latin-1"), b"").decode("latin-1")):
+                token = profile_requested.set(True)
+                try:
+                    await self.app(scope, receive, send)
+                finally:
+                    profile_requested.reset(token)
+                return
+        await self.app(scope, receive, send)
+
+
+router = APIRouter(prefix="/admin/profiles", tags=["admin"])
+
+
+@router.get("")
+def list_profiles(session_id: Optional[str] = None, x_admin_token: Optional[str] = Header(None)):
+    check_admin_token(x_admin_token)
+    entries = []
+    for name in sorted(os.listdir(profiles_dir()), reverse=True):
+        if session_id and not name.startswith(re.sub(r"[^A-Za-z0-9_.-]", "_", session_id) + "-"):
+            continue
+        path = os.path.join(profiles_dir(), name)
+        entries.append({"name": name, "bytes": os.path.getsize(path), "created_at": os.path.getmtime(path)})
+    return {"active": [
+        {"session_id": p.session_id, "invocation_id": p.invocation_id, "samples": p.samples}
+        for p in list(sampler.profiles.values())
+    ], "profiles": entries}
+
+
+@router.get("/{name}")
+def download_profile(name: str, x_admin_token: Optional[str] = Header(None)):
+    check_admin_token(x_admin_token)
+    path = os.path.join(profiles_dir(), os.path.basename(name))
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail=f"Profile not found: {name}")
+    with open(path) as f:
+        return PlainTextResponse(f.read(), headers={"Content-Disposition": f'attachment; filename="{os.path.basename(name)}"'})
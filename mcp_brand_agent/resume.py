@@ -0,0 +1,82 @@
+import os
+from typing import Dict, Optional
+
+from pydantic import ValidationError
+
+from mcp_brand_agent.brands import normalize_brand
+from mcp_brand_agent.schemas import SinglePlatformAnalysisReport
+
+RESUME_REUSE_RAW = os.getenv("RESUME_REUSE_RAW", "1") == "1"  # redo only extraction when raw results were saved
+
+# Branch plans for a resumed run.
+SKIP = "skip"  # final results are valid; leave the branch alone
+EXTRACT = "extract"  # raw search output was saved; only re-run extraction
+FULL = "full"  # run the whole branch again
+
+
+def branch_status_key(platform_key: str) -> str:
+    return f"{platform_key}_branch_status"
+
+
+def branch_status(brand: str, status: str, invocation_id: str, error: Optional[str] = None) -> dict:
+    """Session-state record of one platform branch's outcome in a run."""
+    return {"brand": normalize_brand(brand), "status": status, "invocation_id": invocation_id, "error": error}
+
+
+def cleared_results(platform_key: str, keep_raw: bool = False) -> dict:
+    """State delta dropping a branch's results from an earlier run before the branch starts again."""
+    delta = {f"final_{platform_key}_results": None}
+    if not keep_raw:
+        delta[f"{platform_key}_results"] = None
+    return delta
+
+
+def has_valid_results(state: dict, platform_key: str, brand: Optional[str] = None) -> bool:
+    """Whether the branch's final results are a valid report, for `brand` when it is given."""
+    results = state.get(f"final_{platform_key}_results")
+    if not results:
+        return False
+    try:
+        report = SinglePlatformAnalysisReport.model_validate(results)
+    except ValidationError:
+        return False
+    return brand is None or normalize_brand(report.brand_name) == normalize_brand(brand)
+
+
+def branch_complete(state: dict, brand: str, platform_key: str) -> bool:
+    """A branch is done for `brand` when it has valid final results for `brand` and did not fail afterwards.
+
+    A branch whose run was cut short by another branch's failure keeps its "running" status
+    but still counts once its final results are valid.
+    """
+    status = state.get(branch_status_key(platform_key)) or {}
+    return (status.get("brand") == normalize_brand(brand) and status.get("status") != "failed"
+            and has_valid_results(state, platform_key, brand))
+
+
+def is_resume(state: dict, brand: str, platform_keys) -> bool:
+    """Whether a run for `brand` in this session should resume the previous one.
+
+    It does when an earlier run in the session analyzed the same brand and at least one of
+    its branches is not complete, so re-sending the brand after a failure only redoes what
+    failed. A run whose branches all completed is repeated in full as before.
+    """
+    brand = normalize_brand(brand)
+    if not any((state.get(branch_status_key(key)) or {}).get("brand") == brand for key in platform_keys):
+        return False
+    return not all(branch_complete(state, brand, key) for key in platform_keys)
+
+
+def resume_plan(state: dict, brand: str, platform_keys, can_extract: Dict[str, bool]) -> Dict[str, str]:
+    """SKIP, EXTRACT or FULL for every platform key of a resumed run."""
+    plan = {}
+    for key in platform_keys:
+        status = state.get(branch_status_key(key)) or {}
+        if branch_complete(state, brand, key):
+            plan[key] = SKIP
+        elif (RESUME_REUSE_RAW and can_extract.get(key) and status.get("brand") == normalize_brand(brand)
+              and state.get(f"{key}_results")):
+            plan[key] = EXTRACT
+        else:
+            plan[key] = FULL
+    return plan
@@ -0,0 +1,255 @@
+import hashlib
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException
+
+from mcp_brand_agent.brands import normalize_brand
+from mcp_brand_agent.schemas import Mention
+from mcp_brand_agent.storage import connect
+
+HOUR = 3600
+DAY = 24 * HOUR
+SENTIMENTS = ("positive", "negative", "neutral")
+GRANULARITIES = {"hour": HOUR, "day": DAY}
+
+# Numeric dates are read US-style first: 03/04/2025 is March 4; 25/03/2025 still parses day-first.
+_DATE_FORMATS = (
+    "%Y-%m-%d", "%Y/%m/%d", "%m/%d/%Y", "%d/%m/%Y",
+    "%B %d, %Y", "%b %d, %Y", "%d %B %Y", "%d %b %Y", "%b %d %Y", "%B %Y", "%b %Y",
+)
+_RELATIVE = re.compile(r"(\d+)\s*(m|min|mins|minute|minutes|h|hr|hrs|hour|hours|d|day|days|w|wk|week|weeks|mo|month|months|y|yr|year|years)\b\s*ago")
+_RELATIVE_UNITS = {
+    "m": 60, "min": 60, "mins": 60, "minute": 60, "minutes": 60,
+    "h": HOUR, "hr": HOUR, "hrs": HOUR, "hour": HOUR, "hours": HOUR,
+    "d": DAY, "day": DAY, "days": DAY,
+    "w": 7 * DAY, "wk": 7 * DAY, "week": 7 * DAY, "weeks": 7 * DAY,
+    "mo": 30 * DAY, "month": 30 * DAY, "months": 30 * DAY,
+    "y": 365 * DAY, "yr": 365 * DAY, "year": 365 * DAY, "years": 365 * DAY,
+}
+
+
+def normalize_mention_date(value: str, observed_at: datetime) -> datetime:
+    """Best-effort UTC timestamp for a `Mention.date`.
+
+    Accepts ISO dates, common written dates and relative phrases such as "3 days ago".
+    "Recent" and anything unparseable fall back to `observed_at`; future dates are clamped to it.
+    """
+    observed_at = observed_at.astimezone(timezone.utc)
+    text = (value or "").strip()
+    lowered = text.lower()
+    parsed = None
+
+    if lowered in ("today", "now", "just now"):
+        parsed = observed_at
+    elif lowered == "yesterday":
+        parsed = observed_at - timedelta(days=1)
+    elif match := _RELATIVE.search(lowered):
+        parsed = observed_at - timedelta(seconds=int(match.group(1)) * _RELATIVE_UNITS[match.group(2)])
+    else:
+        try:
+            parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            for fmt in _DATE_FORMATS:
+                try:
+                    parsed = datetime.strptime(text, fmt)
+                    break
+                except ValueError:
+                    continue
+
+    if parsed is None:
+        return observed_at
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return min(parsed.astimezone(timezone.utc), observed_at)
+
+
+def mention_key(brand: str, platform: str, mention: Mention) -> str:
+    """Stable identity of a mention, used to avoid counting the same post twice."""
+    raw = f"{normalize_brand(brand)}|{platform}|{mention.url}|{mention.text}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _epoch(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def _fractions(counts: Dict[str, int]) -> Dict[str, float]:
+    total = sum(counts[s] for s in SENTIMENTS)
+    return {s: round(counts[s] / total, 4) if total else 0.0 for s in SENTIMENTS}
+
+
+class SentimentRollups:
+    """Hourly and daily sentiment counters per brand and platform, updated as mentions arrive.
+
+    Window queries add up at most a day's worth of hourly buckets at each edge plus one
+    daily bucket per whole day, so their cost does not depend on how many mentions were stored.
+    """
+
+    def __init__(self, db_name: str = "rollups.db"):
+        self.db_name = db_name
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = connect(self.db_name)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS rollups (
+                    brand TEXT NOT NULL,
+                    platform TEXT NOT NULL,
+                    granularity TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    positive INTEGER NOT NULL DEFAULT 0,
+                    negative INTEGER NOT NULL DEFAULT 0,
+                    neutral INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (brand, granularity, platform, bucket)
+                );
+                CREATE INDEX IF NOT EXISTS rollups_by_bucket ON rollups (brand, granularity, bucket);
+                CREATE TABLE IF NOT EXISTS rollup_seen (mention_key TEXT PRIMARY KEY);
+            """)
+        return self._conn
+
+    def add_mentions(self, brand: str, platform: str, mentions: List[Mention], observed_at: datetime) -> int:
+        """Fold new mentions into their hourly and daily buckets; returns how many were new."""
+        brand_key = normalize_brand(brand)
+        added = 0
+        with self._lock:
+            conn = self.conn
+            conn.execute("BEGIN")
+            try:
+                for mention in mentions:
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO rollup_seen (mention_key) VALUES (?)",
+                        (mention_key(brand, platform, mention),),
+                    )
+                    if not cursor.rowcount:
+                        continue
+                    added += 1
+                    ts = _epoch(normalize_mention_date(mention.date, observed_at))
+                    for granularity, size in GRANULARITIES.items():
+                        conn.execute(
+                            f"""INSERT INTO rollups (brand, platform, granularity, bucket, {mention.sentiment})
+                                VALUES (?, ?, ?, ?, 1)
+                                ON CONFLICT (brand, granularity, platform, bucket)
+                                DO UPDATE SET {mention.sentiment} = {mention.sentiment} + 1""",
+                            (brand_key, platform, granularity, ts - ts % size),
+                        )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def _sum(self, brand_key: str, platform: Optional[str], granularity: str, start: int, end: int) -> Dict[str, int]:
+        if start >= end:
+            return {s: 0 for s in SENTIMENTS}
+        query = """SELECT COALESCE(SUM(positive), 0), COALESCE(SUM(negative), 0), COALESCE(SUM(neutral), 0)
+                   FROM rollups WHERE brand = ? AND granularity = ? AND bucket >= ? AND bucket < ?"""
+        params = [brand_key, granularity, start, end]
+        if platform:
+            query += " AND platform = ?"
+            params.append(platform)
+        with self._lock:
+            row = self.conn.execute(query, params).fetchone()
+        return dict(zip(SENTIMENTS, row))
+
+    def window(self, brand: str, start: datetime, end: datetime, platform: Optional[str] = None) -> dict:
+        """Sentiment counts and fractions for mentions dated in [start, end), at hour resolution."""
+        brand_key = normalize_brand(brand)
+        start_ts, end_ts = _epoch(start), _epoch(end)
+        start_ts -= start_ts % HOUR
+        end_ts += -end_ts % HOUR
+        first_day = start_ts + (-start_ts % DAY)
+        last_day = end_ts - end_ts % DAY
+
+        if first_day >= last_day:
+            counts = self._sum(brand_key, platform, "hour", start_ts, end_ts)
+        else:
+            parts = (
+                self._sum(brand_key, platform, "hour", start_ts, first_day),
+                self._sum(brand_key, platform, "day", first_day, last_day),
+                self._sum(brand_key, platform, "hour", last_day, end_ts),
+            )
+            counts = {s: sum(part[s] for part in parts) for s in SENTIMENTS}
+
+        return {
+            "brand": brand,
+            "platform": platform,
+            "start": datetime.fromtimestamp(start_ts, timezone.utc).isoformat(),
+            "end": datetime.fromtimestamp(end_ts, timezone.utc).isoformat(),
+            "total": sum(counts.values()),
+            "counts": counts,
+            "fractions": _fractions(counts),
+        }
+
+    def last_days(self, brand: str, days: int, platform: Optional[str] = None, end: Optional[datetime] = None) -> dict:
+        end = end or datetime.now(timezone.utc)
+        return self.window(brand, end - timedelta(days=days), end, platform)
+
+    def week_over_week(self, brand: str, platform: Optional[str] = None, end: Optional[datetime] = None) -> dict:
+        """This week's sentiment against the previous week's, with volume and fraction deltas."""
+        end = end or datetime.now(timezone.utc)
+        current = self.window(brand, end - timedelta(days=7), end, platform)
+        previous = self.window(brand, end - timedelta(days=14), end - timedelta(days=7), platform)
+        return {
+            "brand": brand,
+            "platform": platform,
+            "current": current,
+            "previous": previous,
+            "volume_delta": current["total"] - previous["total"],
+            "fraction_deltas": {
+                s: round(current["fractions"][s] - previous["fractions"][s], 4) for s in SENTIMENTS
+            },
+        }
+
+    def series(self, brand: str, start: datetime, end: datetime, granularity: str = "day", platform: Optional[str] = None) -> List[dict]:
+        """Per-bucket counts for charting, oldest first."""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}, got {granularity!r}")
+        query = """SELECT bucket, SUM(positive), SUM(negative), SUM(neutral) FROM rollups
+                   WHERE brand = ? AND granularity = ? AND bucket >= ? AND bucket < ?"""
+        params = [normalize_brand(brand), granularity, _epoch(start), _epoch(end)]
+        if platform:
+            query += " AND platform = ?"
+            params.append(platform)
+        query += " GROUP BY bucket ORDER BY bucket"
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [
+            {
+                "bucket": datetime.fromtimestamp(row[0], timezone.utc).isoformat(),
+                "counts": dict(zip(SENTIMENTS, row[1:])),
+                "fractions": _fractions(dict(zip(SENTIMENTS, row[1:]))),
+            }
+            for row in rows
+        ]
+
+
+sentiment_rollups = SentimentRollups()
+
+router = APIRouter(prefix="/brands", tags=["sentiment"])
+
+
+@router.get("/{brand}/sentiment")
+def get_sentiment_window(brand: str, days: int = 7, platform: Optional[str] = None):
+    return sentiment_rollups.last_days(brand, days, platform)
+
+
+@router.get("/{brand}/sentiment/week-over-week")
+def get_week_over_week(brand: str, platform: Optional[str] = None):
+    return sentiment_rollups.week_over_week(brand, platform)
+
+
+@router.get("/{brand}/sentiment/series")
+def get_sentiment_series(brand: str, days: int = 30, granularity: str = "day", platform: Optional[str] = None):
+    end = datetime.now(timezone.utc)
+    try:
+        return sentiment_rollups.series(brand, end - timedelta(days=days), end, granularity, platform)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
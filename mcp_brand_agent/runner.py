@@ -0,0 +1,56 @@
+import os
+from typing import Awaitable, Callable, Optional
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.adk.sessions import BaseSessionService, DatabaseSessionService
+from google.genai import types
+
+from mcp_brand_agent.agent import root_agent
+from mcp_brand_agent.session_store import session_store
+
+APP_NAME = "mcp_brand_agent"
+SESSION_DB_URL = os.getenv("SESSION_DB_URL")
+# Stream model output so stream_parser can abort off-schema answers early. Off by default:
+# ADK's LiteLlm reads streamed completions through a blocking iterator, which stalls the
+# event loop (and every concurrent branch) for the length of each generation.
+RUN_STREAMING = os.getenv("RUN_STREAMING", "0") == "1"
+
+EventHandler = Callable[[Event], Awaitable[None]]
+
+_session_service: Optional[BaseSessionService] = None
+
+
+def get_session_service() -> BaseSessionService:
+    """Session service for runs started outside the ADK web app; persistent when SESSION_DB_URL is set,
+    otherwise the bounded in-memory store the web app uses too."""
+    global _session_service
+    if _session_service is None:
+        _session_service = DatabaseSessionService(db_url=SESSION_DB_URL) if SESSION_DB_URL else session_store
+    return _session_service
+
+
+async def run_brand_analysis(
+    brand: str,
+    user_id: str = "api",
+    session_id: Optional[str] = None,
+    on_event: Optional[EventHandler] = None,
+    state: Optional[dict] = None,
+) -> dict:
+    """Run root_agent for `brand` to completion and return the session's final state.
+
+    `on_event` is awaited for every event the run yields, so callers can report progress.
+    `state` seeds the session, e.g. with flags the agents read.
+    """
+    service = get_session_service()
+    session = await service.create_session(app_name=APP_NAME, user_id=user_id, state=state, session_id=session_id)
+    runner = Runner(app_name=APP_NAME, agent=root_agent, session_service=service)
+    message = types.Content(role="user", parts=[types.Part(text=brand)])
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE if RUN_STREAMING else StreamingMode.NONE)
+    async for event in runner.run_async(user_id=user_id, session_id=session.id, new_message=message,
+                                        run_config=run_config):
+        if on_event:
+            await on_event(event)
+    session = await service.get_session(app_name=APP_NAME, user_id=user_id, session_id=session.id)
+    return dict(session.state)
@@ -0,0 +1,47 @@
+from pydantic import AfterValidator, BaseModel
+from typing import Annotated, List, Dict, Literal
+
+from mcp_brand_agent.platforms import validate_platform_name
+
+PlatformName = Annotated[str, AfterValidator(validate_platform_name)]
+
+class SentimentBreakdown(BaseModel):
+    positive: float
+    negative: float
+    neutral: float
+
+class PlatformSentiment(SentimentBreakdown):
+    count: int
+
+class WordCloudTheme(BaseModel):
+    word: str
+    weight: float
+
+class Mention(BaseModel):
+    date: str
+    text: str
+    sentiment: Literal["positive", "negative", "neutral"]
+    ethical_context: str
+    url: str
+
+class PlatformMentions(BaseModel):
+    name: PlatformName
+    mentions: List[Mention]
+
+class SinglePlatformAnalysisReport(BaseModel):
+    brand_name: str
+    platform_name: PlatformName
+    total_mentions_on_platform: int
+    platform_sentiment_breakdown: SentimentBreakdown
+    ethical_highlights_on_platform: List[str]
+    word_cloud_themes_on_platform: List[WordCloudTheme]
+    mentions_on_platform: List[Mention]
+
+class BrandSentimentReport(BaseModel):
+    brand_name: str
+    total_mentions: int
+    overall_sentiment: SentimentBreakdown
+    platform_sentiment: Dict[PlatformName, PlatformSentiment]
+    ethical_highlights: List[str]
+    word_cloud_themes: List[WordCloudTheme]
+    platforms: List[PlatformMentions]
@@ -0,0 +1,247 @@
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence
+
+from fastapi import APIRouter, HTTPException
+
+from mcp_brand_agent.brands import normalize_brand
+from mcp_brand_agent.mention_table import MentionTable, MentionTableBuilder
+from mcp_brand_agent.rollups import mention_key, normalize_mention_date
+from mcp_brand_agent.schemas import Mention
+from mcp_brand_agent.storage import connect
+
+QUERY_STOPWORDS = {"a", "an", "and", "or", "the", "of", "to", "in", "on", "about", "what", "did", "say", "said"}
+MAX_PAGE_SIZE = 200
+
+
+def to_fts_query(query: str) -> str:
+    """Turn a free-text question into an FTS5 expression matching any of its meaningful terms.
+
+    BM25 then ranks mentions that contain more of the terms first.
+    """
+    terms = [t for t in re.findall(r"\w+", query.lower()) if t not in QUERY_STOPWORDS]
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+class MentionIndex:
+    """Local full-text index over every validated mention, backed by SQLite FTS5.
+
+    Text and ethical context are stemmed (porter) so "labor practices" also finds
+    "labor practice"; results are ranked with BM25, weighting ethical_context highest.
+    """
+
+    def __init__(self, db_name: str = "mentions.db"):
+        self.db_name = db_name
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = connect(self.db_name)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS mentions (
+                    id INTEGER PRIMARY KEY,
+                    mention_key TEXT NOT NULL UNIQUE,
+                    brand TEXT NOT NULL,
+                    brand_key TEXT NOT NULL,
+                    platform TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    ts INTEGER NOT NULL,
+                    sentiment TEXT NOT NULL,
+                    ethical_context TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    indexed_at INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS mentions_by_brand ON mentions (brand_key, platform, ts);
+                CREATE VIRTUAL TABLE IF NOT EXISTS mentions_fts USING fts5(
+                    text, ethical_context, url,
+                    content='mentions', content_rowid='id', tokenize='porter unicode61'
+                );
+            """)
+        return self._conn
+
+    def add_mentions(self, brand: str, platform: str, mentions: List[Mention], observed_at: datetime) -> int:
+        """Index mentions not seen before; returns how many were added."""
+        added = 0
+        with self._lock:
+            conn = self.conn
+            conn.execute("BEGIN")
+            try:
+                for mention in mentions:
+                    cursor = conn.execute(
+                        """INSERT OR IGNORE INTO mentions
+                           (mention_key, brand, brand_key, platform, date, ts, sentiment, ethical_context, text, url, indexed_at)
+                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                        (
+                            mention_key(brand, platform, mention), brand, normalize_brand(brand), platform,
+                            mention.date, int(normalize_mention_date(mention.date, observed_at).timestamp()),
+                            mention.sentiment, mention.ethical_context, mention.text, mention.url,
+                            int(observed_at.timestamp()),
+                        ),
+                    )
+                    if not cursor.rowcount:
+                        continue
+                    conn.execute(
+                        "INSERT INTO mentions_fts (rowid, text, ethical_context, url) VALUES (?, ?, ?, ?)",
+                        (cursor.lastrowid, mention.text, mention.ethical_context, mention.url),
+                    )
+                    added += 1
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def load_table(
+        self,
+        brand: Optional[str] = None,
+        platform: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        brands: Optional[Sequence[str]] = None,
+    ) -> MentionTable:
+        """Load indexed mentions into a columnar MentionTable without building a `Mention` per row.
+
+        `brands` selects several brands at once, e.g. a brand and its competitors.
+        """
+        where, params = [], []
+        if brand:
+            where.append("brand_key = ?")
+            params.append(normalize_brand(brand))
+        if brands:
+            where.append(f"brand_key IN ({', '.join('?' for _ in brands)})")
+            params.extend(normalize_brand(name) for name in brands)
+        if platform:
+            where.append("platform = ?")
+            params.append(platform)
+        if since:
+            where.append("ts >= ?")
+            params.append(int(since.timestamp()))
+        if until:
+            where.append("ts < ?")
+            params.append(int(until.timestamp()))
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        builder = MentionTableBuilder()
+        with self._lock:
+            cursor = self.conn.execute(
+                f"""SELECT brand, platform, date, ts, sentiment, ethical_context, text, url
+                    FROM mentions {clause} ORDER BY ts""",
+                params,
+            )
+            for row in cursor:
+                builder.add_row(*row)
+        return builder.build()
+
+    def rows_after(self, after_id: int, limit: int, brand: Optional[str] = None) -> List[sqlite3.Row]:
+        """Up to `limit` indexed mentions with id > `after_id`, in id (insertion) order."""
+        clause, params = ("AND brand_key = ?", [normalize_brand(brand)]) if brand else ("", [])
+        with self._lock:
+            return self.conn.execute(
+                f"""SELECT id, brand, brand_key, platform, date, ts, sentiment, ethical_context, text, url, indexed_at
+                    FROM mentions WHERE id > ? {clause} ORDER BY id LIMIT ?""",
+                [after_id, *params, limit],
+            ).fetchall()
+
+    def search(
+        self,
+        query: str = "",
+        brand: Optional[str] = None,
+        platform: Optional[str] = None,
+        sentiment: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> dict:
+        """Ranked, filtered, paged search. An empty query lists matching mentions newest first."""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        where, params = [], []
+        match = to_fts_query(query)
+        if match:
+            where.append("mentions_fts MATCH ?")
+            params.append(match)
+        if brand:
+            where.append("m.brand_key = ?")
+            params.append(normalize_brand(brand))
+        if platform:
+            where.append("m.platform = ?")
+            params.append(platform)
+        if sentiment:
+            where.append("m.sentiment = ?")
+            params.append(sentiment)
+        if since:
+            where.append("m.ts >= ?")
+            params.append(int(since.timestamp()))
+        if until:
+            where.append("m.ts < ?")
+            params.append(int(until.timestamp()))
+
+        if match:
+            source = "mentions_fts JOIN mentions m ON m.id = mentions_fts.rowid"
+            columns = "bm25(mentions_fts, 1.0, 2.0, 0.5) AS score, snippet(mentions_fts, 0, '[', ']', '…', 16) AS snippet"
+            order = "score"
+        else:
+            source = "mentions m"
+            columns = "0.0 AS score, substr(m.text, 1, 160) AS snippet"
+            order = "m.ts DESC"
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+
+        with self._lock:
+            total = self.conn.execute(f"SELECT COUNT(*) FROM {source} {clause}", params).fetchone()[0]
+            rows = self.conn.execute(
+                f"""SELECT m.brand, m.platform, m.date, m.ts, m.sentiment, m.ethical_context, m.text, m.url, {columns}
+                    FROM {source} {clause} ORDER BY {order} LIMIT ? OFFSET ?""",
+                params + [limit, offset],
+            ).fetchall()
+
+        return {
+            "query": query,
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "results": [
+                {
+                    "brand": row["brand"],
+                    "platform": row["platform"],
+                    "date": row["date"],
+                    "normalized_date": datetime.fromtimestamp(row["ts"], timezone.utc).isoformat(),
+                    "sentiment": row["sentiment"],
+                    "ethical_context": row["ethical_context"],
+                    "text": row["text"],
+                    "url": row["url"],
+                    "score": round(-row["score"], 4),
+                    "snippet": row["snippet"],
+                }
+                for row in rows
+            ],
+        }
+
+
+mention_index = MentionIndex()
+
+router = APIRouter(prefix="/mentions", tags=["mentions"])
+
+
+@router.get("/search")
+def search_mentions(
+    q: str = "",
+    brand: Optional[str] = None,
+    platform: Optional[str] = None,
+    sentiment: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 20,
+    offset: int = 0,
+):
+    if since and since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if until and until.tzinfo is None:
+        until = until.replace(tzinfo=timezone.utc)
+    try:
+        return mention_index.search(q, brand, platform, sentiment, since, until, limit, offset)
+    except sqlite3.OperationalError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid search: {e}")
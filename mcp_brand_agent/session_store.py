@@ -0,0 +1,259 @@
+import json
+import os
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from typing import Any, Optional, Tuple
+
+from fastapi import APIRouter
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+from mcp_brand_agent.storage import connect
+
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "1000"))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(256 * 1024 * 1024)))
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", "21600"))
+SESSION_SPILL = os.getenv("SESSION_SPILL", "1") == "1"  # keep evicted sessions on disk instead of dropping them
+SESSION_SPILL_TTL_SECONDS = int(os.getenv("SESSION_SPILL_TTL_SECONDS", str(7 * 86400)))
+
+SessionKey = Tuple[str, str, str]
+
+
+def session_size(session: Session) -> int:
+    """Approximate resident size of a session: the length of its JSON form."""
+    return len(session.model_dump_json())
+
+
+def event_size(event: Event) -> int:
+    """Bytes an event adds to a session: the event itself plus its state delta, which is also merged into state."""
+    size = len(event.model_dump_json())
+    if event.actions and event.actions.state_delta:
+        size += len(json.dumps(event.actions.state_delta, default=str))
+    return size
+
+
+class BoundedSessionService(InMemorySessionService):
+    """In-memory sessions with LRU and idle-TTL eviction under a session count and byte ceiling.
+
+    Each resident session is tracked in access order with its approximate size. After every
+    create, read or append, sessions idle for SESSION_TTL_SECONDS are evicted, then the
+    least recently used ones until the service is under SESSION_MAX_SESSIONS and
+    SESSION_MAX_BYTES. With SESSION_SPILL, evicted sessions are written to
+    session_spill.db and transparently loaded back on the next access, so eviction only
+    costs memory; otherwise they are dropped.
+    """
+
+    def __init__(self, max_sessions: int = SESSION_MAX_SESSIONS, max_bytes: int = SESSION_MAX_BYTES,
+                 ttl_seconds: int = SESSION_TTL_SECONDS, spill: bool = SESSION_SPILL,
+                 db_name: str = "session_spill.db"):
+        super().__init__()
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.spill = spill
+        self.db_name = db_name
+        self.counters: Counter = Counter()
+        self.resident_bytes = 0
+        self._lru: "OrderedDict[SessionKey, list]" = OrderedDict()  # key -> [size, last_access]
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = connect(self.db_name)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS spilled_sessions (
+                    app_name TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    session_id TEXT NOT NULL,
+                    last_update_time REAL NOT NULL,
+                    spilled_at REAL NOT NULL,
+                    payload BLOB NOT NULL,
+                    PRIMARY KEY (app_name, user_id, session_id)
+                );
+                CREATE INDEX IF NOT EXISTS spilled_sessions_spilled_at ON spilled_sessions (spilled_at);
+            """)
+        return self._conn
+
+    def _track(self, key: SessionKey, size: int) -> None:
+        entry = self._lru.pop(key, None)
+        if entry is not None:
+            self.resident_bytes -= entry[0]
+        self._lru[key] = [size, time.time()]
+        self.resident_bytes += size
+
+    def _touch(self, key: SessionKey) -> None:
+        entry = self._lru.get(key)
+        if entry is not None:
+            entry[1] = time.time()
+            self._lru.move_to_end(key)
+
+    def _resident(self, key: SessionKey) -> Optional[Session]:
+        app_name, user_id, session_id = key
+        return self.sessions.get(app_name, {}).get(user_id, {}).get(session_id)
+
+    def _evict(self, key: SessionKey, reason: str) -> None:
+        app_name, user_id, session_id = key
+        size, _ = self._lru.pop(key)
+        self.resident_bytes -= size
+        session = self.sessions[app_name][user_id].pop(session_id)
+        if not self.sessions[app_name][user_id]:
+            del self.sessions[app_name][user_id]
+        self.counters[f"evicted_{reason}"] += 1
+        if self.spill:
+            with self._lock:
+                self.conn.execute(
+                    """INSERT OR REPLACE INTO spilled_sessions
+                       (app_name, user_id, session_id, last_update_time, spilled_at, payload) VALUES (?, ?, ?, ?, ?, ?)""",
+                    (app_name, user_id, session_id, session.last_update_time, time.time(),
+                     zlib.compress(session.model_dump_json().encode("utf-8"))),
+                )
+            self.counters["spilled"] += 1
+            if self.counters["spilled"] % 500 == 0:
+                self.purge_spilled()
+
+    def _enforce_limits(self, keep: Optional[SessionKey] = None) -> None:
+        """Evict idle sessions, then least recently used ones, never the session being served."""
+        now = time.time()
+        while self._lru:
+            key, (_, last_access) = next(iter(self._lru.items()))
+            if key == keep or now - last_access < self.ttl_seconds:
+                break
+            self._evict(key, "ttl")
+        while len(self._lru) > 1 and (len(self._lru) > self.max_sessions or self.resident_bytes > self.max_bytes):
+            key = next(iter(self._lru))
+            if key == keep:
+                self._lru.move_to_end(key)
+                key = next(iter(self._lru))
+            self._evict(key, "bytes" if len(self._lru) <= self.max_sessions else "count")
+
+    def _restore(self, key: SessionKey) -> Optional[Session]:
+        """Bring a spilled session back into memory."""
+        if not self.spill:
+            return None
+        with self._lock:
+            row = self.conn.execute(
+                """DELETE FROM spilled_sessions WHERE app_name = ? AND user_id = ? AND session_id = ?
+                   RETURNING payload""",
+                key,
+            ).fetchone()
+        if row is None:
+            return None
+        payload = zlib.decompress(row["payload"])
+        session = Session.model_validate_json(payload)
+        app_name, user_id, session_id = key
+        self.sessions.setdefault(app_name, {}).setdefault(user_id, {})[session_id] = session
+        self._track(key, len(payload))
+        self.counters["restored"] += 1
+        return session
+
+    def _ensure_resident(self, key: SessionKey) -> Optional[Session]:
+        session = self._resident(key)
+        if session is None:
+            session = self._restore(key)
+        if session is not None:
+            self._touch(key)
+        return session
+
+    def _create_session_impl(self, *, app_name: str, user_id: str, state: Optional[dict[str, Any]] = None,
+                             session_id: Optional[str] = None) -> Session:
+        session = super()._create_session_impl(app_name=app_name, user_id=user_id, state=state, session_id=session_id)
+        key = (app_name, user_id, session.id)
+        self._track(key, session_size(self._resident(key)))
+        self._enforce_limits(keep=key)
+        return session
+
+    def _get_session_impl(self, *, app_name: str, user_id: str, session_id: str,
+                          config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        if self._ensure_resident(key) is None:
+            self.counters["misses"] += 1
+            return None
+        self.counters["hits"] += 1
+        session = super()._get_session_impl(app_name=app_name, user_id=user_id, session_id=session_id, config=config)
+        self._enforce_limits(keep=key)
+        return session
+
+    def _list_sessions_impl(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        response = super()._list_sessions_impl(app_name=app_name, user_id=user_id)
+        if self.spill:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT session_id, last_update_time FROM spilled_sessions WHERE app_name = ? AND user_id = ?",
+                    (app_name, user_id),
+                ).fetchall()
+            response.sessions.extend(
+                Session(app_name=app_name, user_id=user_id, id=row["session_id"], last_update_time=row["last_update_time"])
+                for row in rows
+            )
+        return response
+
+    def _delete_session_impl(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id)
+        entry = self._lru.pop(key, None)
+        if entry is not None:
+            self.resident_bytes -= entry[0]
+            self.sessions[app_name][user_id].pop(session_id, None)
+        if self.spill:
+            with self._lock:
+                self.conn.execute(
+                    "DELETE FROM spilled_sessions WHERE app_name = ? AND user_id = ? AND session_id = ?", key,
+                )
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        # A session evicted mid-run is loaded back first, so none of the run's events are lost.
+        key = (session.app_name, session.user_id, session.id)
+        resident = self._ensure_resident(key) is not None
+        event = await super().append_event(session=session, event=event)
+        if resident and not event.partial:
+            self._lru[key][0] += event_size(event)
+            self.resident_bytes += event_size(event)
+            self._enforce_limits(keep=key)
+        return event
+
+    def purge_spilled(self, max_age_seconds: int = SESSION_SPILL_TTL_SECONDS) -> int:
+        """Delete spilled sessions that have not been touched for `max_age_seconds`."""
+        if not self.spill:
+            return 0
+        with self._lock:
+            cursor = self.conn.execute(
+                "DELETE FROM spilled_sessions WHERE spilled_at < ?", (time.time() - max_age_seconds,),
+            )
+        return cursor.rowcount
+
+    def metrics(self) -> dict:
+        spilled = 0
+        if self.spill:
+            with self._lock:
+                spilled = self.conn.execute("SELECT COUNT(*) FROM spilled_sessions").fetchone()[0]
+        return {
+            "resident_sessions": len(self._lru),
+            "resident_bytes": self.resident_bytes,
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "spilled_sessions": spilled,
+            "counters": dict(self.counters),
+        }
+
+
+session_store = BoundedSessionService()
+
+
+def install() -> None:
+    """Make the ADK web app use `session_store` wherever it would create an unbounded InMemorySessionService."""
+    from google.adk.cli import fast_api
+
+    fast_api.InMemorySessionService = lambda: session_store
+
+
+router = APIRouter(prefix="/session-store", tags=["sessions"])
+
+
+@router.get("/metrics")
+def session_store_metrics():
+    return session_store.metrics()
@@ -0,0 +1,202 @@
+import asyncio
+from collections import Counter
+from typing import AsyncGenerator, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from mcp_brand_agent.brands import brand_from_content, normalize_brand
+from mcp_brand_agent.cassettes import cassette
+from mcp_brand_agent.listeners import publish_run
+from mcp_brand_agent.profiler import run_profile
+from mcp_brand_agent.resume import is_resume
+from mcp_brand_agent.warm_cache import BYPASS_CACHE_STATE_KEY, WARM_CACHE_ENABLED, warm_cache
+
+FlightKey = Tuple[str, Tuple[str, ...]]
+
+
+class CoalescedRunFailed(RuntimeError):
+    """The run a request was attached to ended with an error."""
+
+
+class Flight:
+    """One in-flight run whose events are replayed to every request attached to it."""
+
+    def __init__(self, leader_invocation_id: str):
+        self.leader_invocation_id = leader_invocation_id
+        self.events: List[Event] = []
+        self.error: Optional[BaseException] = None
+        self.done = False
+        self.followers = 0
+        self._changed = asyncio.Event()
+
+    def publish(self, event: Event) -> None:
+        self.events.append(event)
+        self._wake()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.error = error
+        self.done = True
+        self._wake()
+
+    def _wake(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self) -> AsyncGenerator[Event, None]:
+        """Every event of the run, from the first one, as it happens."""
+        index = 0
+        while True:
+            changed = self._changed
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+            if self.done:
+                if self.error is not None:
+                    raise CoalescedRunFailed(f"Coalesced run {self.leader_invocation_id} failed: {self.error!r}")
+                return
+            await changed.wait()
+
+
+class SingleFlight:
+    """Registry of in-flight runs keyed on brand and pipeline options."""
+
+    def __init__(self):
+        self._flights: Dict[FlightKey, Flight] = {}
+        self.counters: Counter = Counter()
+
+    def join(self, key: FlightKey, invocation_id: str) -> Tuple[Flight, bool]:
+        """The flight for `key` and whether the caller leads it (starts the run) or follows it."""
+        flight = self._flights.get(key)
+        if flight is not None:
+            flight.followers += 1
+            self.counters["followers"] += 1
+            return flight, False
+        flight = self._flights[key] = Flight(invocation_id)
+        self.counters["leaders"] += 1
+        return flight, True
+
+    def land(self, key: FlightKey, flight: Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def metrics(self) -> dict:
+        return {
+            "in_flight": [
+                {"brand": brand, "leader_invocation_id": f.leader_invocation_id, "followers": f.followers,
+                 "events": len(f.events)}
+                for (brand, _), f in self._flights.items()
+            ],
+            "counters": dict(self.counters),
+        }
+
+
+single_flight = SingleFlight()
+
+
+class CoalescingAgent(BaseAgent):
+    """Runs its single sub-agent once for all concurrent requests about the same brand.
+
+    The first request leads and runs the pipeline. Requests that arrive while it is running
+    follow it: they receive every event of the leader's run, re-stamped with their own
+    invocation id, so their sessions end up with the same state and see the same partial
+    results. If the leader fails, each follower falls back to a run of its own, published and
+    metered like a leader's. A report in the warm cache is served straight away instead (see
+    warm_cache.WarmCache). A request that resumes its session's failed run (see
+    resume.is_resume) always runs on its own. Runs are profiled on request (see
+    profiler.run_profile).
+    """
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        with run_profile(ctx):
+            async for event in self._coalesce(ctx):
+                yield event
+
+    async def _coalesce(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        pipeline = self.sub_agents[0]
+        requested = brand_from_content(ctx.user_content)
+        brand = normalize_brand(requested)
+
+        platform_keys = list(getattr(pipeline, "branch_keys", {}).values())
+        if platform_keys and is_resume(ctx.session.state, requested, platform_keys):
+            # Resuming is specific to this session's partial results, so it neither uses the
+            # cache nor attaches to another session's run.
+            print(f"  [Coalesce] {ctx.invocation_id} resumes the previous run for {brand!r}")
+            async for event in pipeline.run_async(ctx):
+                yield event
+            publish_run(requested, dict(ctx.session.state))
+            return
+
+        # A recorded or replayed run must make its own LLM and MCP calls, so cassettes skip the cache.
+        if WARM_CACHE_ENABLED and not cassette.active and not ctx.session.state.get(BYPASS_CACHE_STATE_KEY):
+            warm_cache.record_request(requested)
+            cached = warm_cache.lookup(brand)
+            if cached is not None:
+                if cached.stale:
+                    warm_cache.refresh_soon(requested)
+                print(f"  [WarmCache] serving {brand!r} from cache ({cached.age_seconds:.0f}s old)")
+                yield Event(
+                    invocation_id=ctx.invocation_id,
+                    author=self.name,
+                    branch=ctx.branch,
+                    content=types.Content(role="model", parts=[types.Part(
+                        text=f"Cached analysis of {cached.brand} from {cached.age_seconds:.0f}s ago",
+                    )]),
+                    actions=EventActions(state_delta={
+                        **cached.state,
+                        "served_from_cache": {"computed_at": cached.computed_at, "age_seconds": cached.age_seconds,
+                                              "stale": cached.stale},
+                    }),
+                )
+                return
+
+        key = (brand, tuple(agent.name for agent in pipeline.sub_agents))
+        flight, leader = single_flight.join(key, ctx.invocation_id)
+
+        if leader:
+            state = {}
+            try:
+                async for event in pipeline.run_async(ctx):
+                    flight.publish(event)
+                    state.update(event.actions.state_delta)
+                    yield event
+            except BaseException as e:
+                flight.finish(e)
+                raise
+            else:
+                flight.finish()
+                publish_run(requested, state)
+            finally:
+                single_flight.land(key, flight)
+            return
+
+        print(f"  [Coalesce] {ctx.invocation_id} attached to run {flight.leader_invocation_id} for {brand!r}")
+        try:
+            async for event in flight.follow():
+                yield event.model_copy(deep=True, update={"id": Event.new_id(), "invocation_id": ctx.invocation_id})
+        except CoalescedRunFailed as e:
+            print(f"  [Coalesce] {e}; running {ctx.invocation_id} on its own")
+            single_flight.counters["fallbacks"] += 1
+            state = {}
+            async for event in pipeline.run_async(ctx):
+                state.update(event.actions.state_delta)
+                yield event
+            publish_run(requested, state)
+            return
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={"coalesced_from": flight.leader_invocation_id}),
+        )
+
+
+router = APIRouter(prefix="/coalescing", tags=["coalescing"])
+
+
+@router.get("/metrics")
+def coalescing_metrics():
+    return single_flight.metrics()
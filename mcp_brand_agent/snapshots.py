@@ -0,0 +1,302 @@
+import json
+import os
+import threading
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException
+from pydantic import ValidationError
+
+from mcp_brand_agent.brands import normalize_brand
+from mcp_brand_agent.rollups import mention_key
+from mcp_brand_agent.schemas import SinglePlatformAnalysisReport
+from mcp_brand_agent.storage import connect
+
+SNAPSHOT_KEYFRAME_INTERVAL = max(1, int(os.getenv("SNAPSHOT_KEYFRAME_INTERVAL", "20")))  # 1 stores every version in full
+SENTIMENTS = ("positive", "negative", "neutral")
+
+
+def report_document(brand: str, state: dict) -> Dict[str, dict]:
+    """Canonical snapshot of a run: per platform, its sentiment, highlights, word cloud and keyed mentions."""
+    document = {}
+    for key, value in state.items():
+        if not (key.startswith("final_") and key.endswith("_results")):
+            continue
+        try:
+            report = SinglePlatformAnalysisReport.model_validate(value)
+        except ValidationError:
+            continue
+        document[report.platform_name] = {
+            "total_mentions": report.total_mentions_on_platform,
+            "sentiment": report.platform_sentiment_breakdown.model_dump(),
+            "highlights": report.ethical_highlights_on_platform,
+            "word_cloud": {theme.word: theme.weight for theme in report.word_cloud_themes_on_platform},
+            "mentions": {
+                mention_key(brand, report.platform_name, mention): mention.model_dump()
+                for mention in report.mentions_on_platform
+            },
+        }
+    return document
+
+
+def diff_documents(old: Dict[str, dict], new: Dict[str, dict]) -> dict:
+    """Compact patch turning `old` into `new`; only what changed is included."""
+    platforms = {}
+    for name, after in new.items():
+        before = old.get(name)
+        if before is None:
+            platforms[name] = {"added": True, **after}
+            continue
+        change = {}
+        if after["total_mentions"] != before["total_mentions"]:
+            change["total_mentions"] = after["total_mentions"]
+        sentiment = {s: [before["sentiment"][s], after["sentiment"][s]]
+                     for s in SENTIMENTS if after["sentiment"][s] != before["sentiment"][s]}
+        if sentiment:
+            change["sentiment"] = sentiment
+        if after["highlights"] != before["highlights"]:
+            change["highlights"] = after["highlights"]
+        word_cloud = {word: weight for word, weight in after["word_cloud"].items()
+                      if before["word_cloud"].get(word) != weight}
+        word_cloud.update({word: None for word in before["word_cloud"] if word not in after["word_cloud"]})
+        if word_cloud:
+            change["word_cloud"] = word_cloud
+        added = {key: mention for key, mention in after["mentions"].items() if key not in before["mentions"]}
+        removed = [key for key in before["mentions"] if key not in after["mentions"]]
+        if added:
+            change["mentions_added"] = added
+        if removed:
+            change["mentions_removed"] = removed
+        if change:
+            platforms[name] = change
+    patch = {}
+    if platforms:
+        patch["platforms"] = platforms
+    removed_platforms = [name for name in old if name not in new]
+    if removed_platforms:
+        patch["platforms_removed"] = removed_platforms
+    return patch
+
+
+def apply_patch(document: Dict[str, dict], patch: dict) -> Dict[str, dict]:
+    """Inverse of diff_documents: apply_patch(old, diff_documents(old, new)) == new."""
+    document = json.loads(json.dumps(document))
+    for name in patch.get("platforms_removed", []):
+        document.pop(name, None)
+    for name, change in patch.get("platforms", {}).items():
+        if change.get("added"):
+            document[name] = {key: value for key, value in change.items() if key != "added"}
+            continue
+        platform = document[name]
+        if "total_mentions" in change:
+            platform["total_mentions"] = change["total_mentions"]
+        for sentiment, (_, value) in change.get("sentiment", {}).items():
+            platform["sentiment"][sentiment] = value
+        if "highlights" in change:
+            platform["highlights"] = change["highlights"]
+        for word, weight in change.get("word_cloud", {}).items():
+            if weight is None:
+                platform["word_cloud"].pop(word, None)
+            else:
+                platform["word_cloud"][word] = weight
+        for key in change.get("mentions_removed", []):
+            platform["mentions"].pop(key, None)
+        platform["mentions"].update(change.get("mentions_added", {}))
+    return document
+
+
+def _pack(value) -> bytes:
+    return zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+
+
+def _unpack(blob: bytes):
+    return json.loads(zlib.decompress(blob))
+
+
+class SnapshotStore:
+    """Versioned report snapshots per brand, stored as delta chains (snapshots.db).
+
+    Every SNAPSHOT_KEYFRAME_INTERVAL-th version is stored in full; the rest hold only the
+    patch from the previous version, so history grows with what changed rather than
+    with the size of the report. Reading a version replays at most one chain.
+    """
+
+    def __init__(self, db_name: str = "snapshots.db"):
+        self.db_name = db_name
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = connect(self.db_name)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    id INTEGER PRIMARY KEY,
+                    brand_key TEXT NOT NULL,
+                    brand TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    keyframe INTEGER NOT NULL,
+                    payload BLOB NOT NULL,
+                    full_bytes INTEGER NOT NULL,
+                    UNIQUE (brand_key, version)
+                );
+            """)
+        return self._conn
+
+    def add_run(self, brand: str, state: dict, observed_at: datetime) -> Optional[int]:
+        """Run listener: store the run's report as the brand's next version, unless nothing changed."""
+        document = report_document(brand, state)
+        if not document:
+            return None
+        brand_key = normalize_brand(brand)
+        with self._lock:
+            conn = self.conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                latest = conn.execute(
+                    "SELECT id, version FROM snapshots WHERE brand_key = ? ORDER BY version DESC LIMIT 1", (brand_key,),
+                ).fetchone()
+                previous = self._document(latest["id"]) if latest else None
+                patch = diff_documents(previous, document) if previous is not None else None
+                if latest and not patch:
+                    conn.execute("COMMIT")
+                    return latest["id"]
+                version = latest["version"] + 1 if latest else 1
+                keyframe = previous is None or (version - 1) % SNAPSHOT_KEYFRAME_INTERVAL == 0
+                cursor = conn.execute(
+                    """INSERT INTO snapshots (brand_key, brand, version, created_at, keyframe, payload, full_bytes)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                    (brand_key, brand, version, observed_at.timestamp(), int(keyframe),
+                     _pack(document if keyframe else patch), len(_pack(document))),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return cursor.lastrowid
+
+    def _document(self, snapshot_id: int) -> Optional[Dict[str, dict]]:
+        """Rebuild a snapshot from its nearest keyframe; the caller holds the lock."""
+        target = self.conn.execute("SELECT brand_key, version FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()
+        if target is None:
+            return None
+        rows = self.conn.execute(
+            """SELECT keyframe, payload FROM snapshots
+               WHERE brand_key = ? AND version <= ? AND version >= (
+                   SELECT MAX(version) FROM snapshots WHERE brand_key = ? AND version <= ? AND keyframe = 1
+               ) ORDER BY version""",
+            (target["brand_key"], target["version"], target["brand_key"], target["version"]),
+        ).fetchall()
+        document = _unpack(rows[0]["payload"])
+        for row in rows[1:]:
+            document = apply_patch(document, _unpack(row["payload"]))
+        return document
+
+    def _row(self, brand: str, snapshot_id: Optional[int] = None):
+        if snapshot_id is None:
+            return self.conn.execute(
+                "SELECT * FROM snapshots WHERE brand_key = ? ORDER BY version DESC LIMIT 1", (normalize_brand(brand),),
+            ).fetchone()
+        return self.conn.execute(
+            "SELECT * FROM snapshots WHERE brand_key = ? AND id = ?", (normalize_brand(brand), snapshot_id),
+        ).fetchone()
+
+    def snapshot(self, brand: str, snapshot_id: Optional[int] = None) -> Optional[dict]:
+        """A full snapshot, the latest one by default."""
+        with self._lock:
+            row = self._row(brand, snapshot_id)
+            if row is None:
+                return None
+            document = self._document(row["id"])
+        return {"snapshot_id": row["id"], "version": row["version"], "created_at": _iso(row["created_at"]),
+                "platforms": document}
+
+    def delta(self, brand: str, since_id: int) -> Optional[dict]:
+        """Patch from snapshot `since_id` to the latest snapshot of `brand`."""
+        with self._lock:
+            since = self._row(brand, since_id)
+            latest = self._row(brand)
+            if since is None or latest is None:
+                return None
+            patch = {} if since["id"] == latest["id"] else diff_documents(
+                self._document(since["id"]), self._document(latest["id"]),
+            )
+        return {"from_snapshot_id": since["id"], "to_snapshot_id": latest["id"], "version": latest["version"],
+                "created_at": _iso(latest["created_at"]), "unchanged": not patch, "patch": patch}
+
+    def history(self, brand: str, limit: int = 50) -> List[dict]:
+        with self._lock:
+            rows = self.conn.execute(
+                """SELECT id, version, created_at, keyframe, length(payload) AS stored_bytes, full_bytes
+                   FROM snapshots WHERE brand_key = ? ORDER BY version DESC LIMIT ?""",
+                (normalize_brand(brand), limit),
+            ).fetchall()
+        return [{**dict(row), "keyframe": bool(row["keyframe"]), "created_at": _iso(row["created_at"])} for row in rows]
+
+    def documents_after(self, after_id: int, limit: int, brand: Optional[str] = None) -> List[Tuple[dict, Dict[str, dict]]]:
+        """Up to `limit` snapshots with id > `after_id` as (row, document) pairs, in id order.
+
+        Consecutive versions of a brand within the page are rebuilt by applying each patch
+        to the previous document, so a page replays each delta chain at most once.
+        """
+        clause, params = ("AND brand_key = ?", [normalize_brand(brand)]) if brand else ("", [])
+        pages = []
+        with self._lock:
+            rows = self.conn.execute(
+                f"""SELECT id, brand_key, brand, version, created_at, keyframe, payload FROM snapshots
+                    WHERE id > ? {clause} ORDER BY id LIMIT ?""",
+                [after_id, *params, limit],
+            ).fetchall()
+            latest: Dict[str, Tuple[int, Dict[str, dict]]] = {}
+            for row in rows:
+                previous = latest.get(row["brand_key"])
+                if row["keyframe"]:
+                    document = _unpack(row["payload"])
+                elif previous is not None and previous[0] == row["version"] - 1:
+                    document = apply_patch(previous[1], _unpack(row["payload"]))
+                else:
+                    document = self._document(row["id"])
+                latest[row["brand_key"]] = (row["version"], document)
+                pages.append(({key: row[key] for key in ("id", "brand_key", "brand", "version", "created_at")}, document))
+        return pages
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+snapshot_store = SnapshotStore()
+
+router = APIRouter(prefix="/brands", tags=["snapshots"])
+
+
+@router.get("/{brand}/snapshots")
+def list_snapshots(brand: str, limit: int = 50):
+    return snapshot_store.history(brand, limit)
+
+
+@router.get("/{brand}/snapshots/latest")
+def get_latest_snapshot(brand: str):
+    snapshot = snapshot_store.snapshot(brand)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"No snapshots for {brand}")
+    return snapshot
+
+
+@router.get("/{brand}/snapshots/{snapshot_id}")
+def get_snapshot(brand: str, snapshot_id: int):
+    snapshot = snapshot_store.snapshot(brand, snapshot_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"Snapshot {snapshot_id} not found for {brand}")
+    return snapshot
+
+
+@router.get("/{brand}/delta")
+def get_delta(brand: str, since: int):
+    delta = snapshot_store.delta(brand, since)
+    if delta is None:
+        raise HTTPException(status_code=404, detail=f"Snapshot {since} not found for {brand}")
+    return delta
@@ -0,0 +1,19 @@
+import os
+import sqlite3
+
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"))
+
+
+def data_path(name: str) -> str:
+    """Path of a file inside DATA_DIR, creating the directory if needed."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, name)
+
+
+def connect(name: str) -> sqlite3.Connection:
+    """Open a SQLite database in DATA_DIR, shared between threads and safe for concurrent readers."""
+    conn = sqlite3.connect(data_path(name), check_same_thread=False, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
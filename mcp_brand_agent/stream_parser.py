@@ -0,0 +1,297 @@
+import json
+from typing import AsyncGenerator, Dict, List, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.models import LlmRequest, LlmResponse
+from pydantic import ValidationError
+
+from mcp_brand_agent.schemas import Mention, SinglePlatformAnalysisReport
+
+MENTIONS_FIELD = "mentions_on_platform"
+REPORT_FIELDS = list(SinglePlatformAnalysisReport.model_fields)
+_SCALAR_CHARS = set("0123456789+-.eEtruefalsn")
+
+
+class StreamSchemaError(ValueError):
+    """Raised when a streamed platform report stops matching the report schema."""
+
+
+class MentionStreamParser:
+    """Incremental JSON parser for a streamed SinglePlatformAnalysisReport.
+
+    Text is fed in arbitrary chunks. Every object inside `mentions_on_platform`
+    is validated against `Mention` the moment its closing brace arrives, so a
+    malformed stream is detected long before the model finishes generating.
+    """
+
+    def __init__(self, platform_name: Optional[str] = None):
+        self.platform_name = platform_name
+        self.buffer = ""
+        self.mentions: List[Mention] = []
+        self.is_json: Optional[bool] = None
+        self.done = False
+        self._pos = 0
+        self._stack: List[dict] = []
+        self._keys_seen: set = set()
+        self._in_string = False
+        self._escape = False
+        self._token_start: Optional[int] = None
+        self._key: Optional[str] = None
+
+    def feed(self, chunk: str) -> List[Mention]:
+        """Consume a chunk of model output and return mentions completed by it."""
+        self.buffer += chunk
+        emitted: List[Mention] = []
+        if self.is_json is None and not self._detect_start():
+            return emitted
+        if not self.is_json:
+            return emitted
+
+        while self._pos < len(self.buffer) and not self.done:
+            char = self.buffer[self._pos]
+            if self._in_string:
+                self._read_string_char(char, emitted)
+            elif self._token_start is not None and char in _SCALAR_CHARS:
+                pass
+            else:
+                if self._token_start is not None:
+                    self._finish_scalar(self._pos, emitted)
+                self._read_structural(char, emitted)
+            self._pos += 1
+        return emitted
+
+    def close(self) -> None:
+        """Check the finished stream; raises StreamSchemaError if it is incomplete."""
+        if self.is_json is None:
+            self._detect_start(final=True)
+        if not self.is_json:
+            raise StreamSchemaError("response does not contain a JSON object")
+        if not self.done:
+            raise StreamSchemaError("JSON object ended before it was closed")
+        missing = [field for field in REPORT_FIELDS if field not in self._keys_seen]
+        if missing:
+            raise StreamSchemaError(f"missing required fields: {', '.join(missing)}")
+
+    def _detect_start(self, final: bool = False) -> bool:
+        text = self.buffer.lstrip()
+        if text.startswith("```"):
+            newline = text.find("\n")
+            if newline == -1:
+                return False
+            text = text[newline + 1:].lstrip()
+        if not text or (not final and "```".startswith(text)):
+            return False
+        self.is_json = text.startswith("{")
+        if self.is_json:
+            self._pos = len(self.buffer) - len(text)
+        return True
+
+    def _read_string_char(self, char: str, emitted: List[Mention]) -> None:
+        if self._escape:
+            self._escape = False
+        elif char == "\\":
+            self._escape = True
+        elif char == '"':
+            self._in_string = False
+            frame = self._stack[-1]
+            if frame["kind"] == "obj" and frame["state"] == "key":
+                self._key = json.loads(self.buffer[self._token_start:self._pos + 1])
+                frame["state"] = "colon"
+            else:
+                self._value_done(self._token_start, self._pos + 1, emitted, self._key)
+            self._token_start = None
+
+    def _read_structural(self, char: str, emitted: List[Mention]) -> None:
+        if char.isspace():
+            return
+        frame = self._stack[-1] if self._stack else None
+        state = frame["state"] if frame else "value"
+
+        if char == "," and state == "comma":
+            frame["state"] = "key" if frame["kind"] == "obj" else "value"
+        elif char == ":" and state == "colon":
+            frame["state"] = "value"
+        elif char == "}" and frame and frame["kind"] == "obj" and state in ("comma", "key_or_end"):
+            self._close_container(emitted)
+        elif char == "]" and frame and frame["kind"] == "arr" and state in ("comma", "value_or_end"):
+            self._close_container(emitted)
+        elif char == '"' and state in ("key", "key_or_end"):
+            frame["state"] = "key"
+            self._in_string = True
+            self._token_start = self._pos
+        elif state in ("value", "value_or_end"):
+            self._start_value(char)
+        else:
+            self._fail(f"unexpected {char!r} at offset {self._pos}")
+
+    def _start_value(self, char: str) -> None:
+        key = self._current_key()
+        if len(self._stack) == 1 and key == MENTIONS_FIELD and char != "[":
+            self._fail(f"{MENTIONS_FIELD} must be a list")
+        if self._is_mention_slot() and char != "{":
+            self._fail("each mention must be a JSON object")
+
+        if char in "{[":
+            self._stack.append({
+                "kind": "obj" if char == "{" else "arr",
+                "key": key,
+                "start": self._pos,
+                "state": "key_or_end" if char == "{" else "value_or_end",
+            })
+        elif char == '"':
+            self._in_string = True
+            self._token_start = self._pos
+        elif char in _SCALAR_CHARS:
+            self._token_start = self._pos
+        else:
+            self._fail(f"unexpected {char!r} at offset {self._pos}")
+
+    def _finish_scalar(self, end: int, emitted: List[Mention]) -> None:
+        start, self._token_start = self._token_start, None
+        try:
+            json.loads(self.buffer[start:end])
+        except json.JSONDecodeError:
+            self._fail(f"invalid literal {self.buffer[start:end]!r}")
+        self._value_done(start, end, emitted, self._key)
+
+    def _close_container(self, emitted: List[Mention]) -> None:
+        frame = self._stack.pop()
+        if not self._stack:
+            self.done = True
+            return
+        self._value_done(frame["start"], self._pos + 1, emitted, frame["key"])
+
+    def _value_done(self, start: int, end: int, emitted: List[Mention], key: Optional[str]) -> None:
+        frame = self._stack[-1]
+        if len(self._stack) == 1:
+            self._keys_seen.add(key)
+            if key == "platform_name" and self.platform_name:
+                value = json.loads(self.buffer[start:end])
+                if value != self.platform_name:
+                    self._fail(f'platform_name must be "{self.platform_name}", got {value!r}')
+        elif self._is_mention_slot():
+            try:
+                mention = Mention.model_validate_json(self.buffer[start:end])
+            except ValidationError as e:
+                errors = "; ".join(
+                    f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+                )
+                self._fail(f"mention {len(self.mentions) + 1} is off-schema ({errors})")
+            self.mentions.append(mention)
+            emitted.append(mention)
+        frame["state"] = "comma"
+
+    def _current_key(self) -> Optional[str]:
+        frame = self._stack[-1] if self._stack else None
+        return self._key if frame and frame["kind"] == "obj" else None
+
+    def _is_mention_slot(self) -> bool:
+        return (
+            len(self._stack) == 2
+            and self._stack[1]["kind"] == "arr"
+            and self._stack[1]["key"] == MENTIONS_FIELD
+        )
+
+    def _fail(self, message: str) -> None:
+        raise StreamSchemaError(message)
+
+
+def stream_validation_callbacks(platform_name: str, state_prefix: str):
+    """Build before/after model callbacks that stream-validate a platform agent's output.
+
+    Completed mentions are published to `<state_prefix>_streamed_mentions` as they
+    arrive. While `<state_prefix>_stream_strict` is true an off-schema stream raises
+    StreamSchemaError, which SchemaRetryAgent turns into a re-prompt.
+
+    ADK only delivers partial responses under StreamingMode.SSE, i.e. on
+    `/run_sse` with `"streaming": true` or in-process runs with RUN_STREAMING=1 (see
+    runner.py). Otherwise, as on `/run`, the finished response is validated in one piece
+    and an off-schema answer is caught only once it is complete.
+    """
+    parsers: Dict[str, MentionStreamParser] = {}
+    mentions_key = f"{state_prefix}_streamed_mentions"
+    error_key = f"{state_prefix}_stream_error"
+    strict_key = f"{state_prefix}_stream_strict"
+
+    def before_model(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        parsers[callback_context.invocation_id] = MentionStreamParser(platform_name)
+        error = callback_context.state.get(error_key)
+        if error:
+            llm_request.append_instructions([
+                f"Your previous answer was rejected because it did not match the schema: {error}. "
+                "Return ONLY the JSON object in the exact structure described above."
+            ])
+        return None
+
+    def after_model(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+        parser = parsers.get(callback_context.invocation_id)
+        content = llm_response.content
+        if parser is None or not content or not content.parts:
+            return None
+        text = "".join(part.text for part in content.parts if part.text)
+        has_function_call = any(part.function_call for part in content.parts)
+
+        try:
+            if llm_response.partial:
+                new_mentions = parser.feed(text)
+            else:
+                new_mentions = parser.feed(text) if not parser.buffer else []
+                if not has_function_call:
+                    parsers.pop(callback_context.invocation_id, None)
+                    parser.close()
+        except StreamSchemaError as e:
+            parsers.pop(callback_context.invocation_id, None)
+            if callback_context.state.get(strict_key, True):
+                raise
+            print(f"  [Stream] {callback_context.agent_name} off-schema, leaving cleanup to extraction: {e}")
+            return None
+
+        if new_mentions:
+            streamed = list(callback_context.state.get(mentions_key) or [])
+            streamed.extend(mention.model_dump() for mention in new_mentions)
+            callback_context.state[mentions_key] = streamed
+        return None
+
+    return before_model, after_model
+
+
+class SchemaRetryAgent(BaseAgent):
+    """Runs a platform search agent, re-prompting it when its streamed output goes off-schema.
+
+    The final attempt runs non-strict so the extract agent still gets raw output to clean up.
+    """
+
+    state_prefix: str
+    max_attempts: int = 2
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        agent = self.sub_agents[0]
+        error_key = f"{self.state_prefix}_stream_error"
+        error: Optional[str] = None  # only the rejection of this run's previous attempt is shown to the model
+        for attempt in range(1, self.max_attempts + 1):
+            yield self._state_event(ctx, {
+                f"{self.state_prefix}_streamed_mentions": [],
+                f"{self.state_prefix}_stream_strict": attempt < self.max_attempts,
+                error_key: error,
+            })
+            try:
+                async for event in agent.run_async(ctx):
+                    yield event
+            except StreamSchemaError as e:
+                print(f"  [Stream] {agent.name} went off-schema on attempt {attempt}: {e}")
+                error = str(e)
+                continue
+            if error is not None:
+                yield self._state_event(ctx, {error_key: None})
+            return
+
+    def _state_event(self, ctx: InvocationContext, state_delta: dict) -> Event:
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta=state_delta),
+        )
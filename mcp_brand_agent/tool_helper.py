@@ -1,8 +1,12 @@
 import os
 import dotenv
+from typing import Optional
 
 from langchain_mcp_adapters.client import MultiServerMCPClient
 
+from mcp_brand_agent.cache import SEARCH_CACHE_TTL, cache_key, shared_cache
+from mcp_brand_agent.cassettes import CassetteMiss, cassette, request_key
+
 dotenv.load_dotenv('.env')
 
 client = MultiServerMCPClient(
@@ -19,26 +23,47 @@ client = MultiServerMCPClient(
     }
 )
 
-def search_web_sync(query: str):
-    """Synchronous wrapper for web search functionality"""
-    async def _search():
-        try:
-            api_token = os.getenv("MCP_TOKEN")
-            if not api_token:
-                raise ValueError("MCP_TOKEN environment variable is required")
-            
-            tools = await client.get_tools()
-            
-            for tool in tools:
-                if hasattr(tool, 'name') and 'search' in tool.name.lower():
-                    result = await tool.ainvoke({"query": query})
-                    return result
-            
-            return {"error": "No search tool found"}
-            
-        except Exception as e:
-            return {"error": f"Search failed: {str(e)}"}
-
-search_web = search_web_sync
-search_web.__name__ = "search_web"
-search_web.__doc__ = "Search the web for information based on the provided query."
\ No newline at end of file
+async def _invoke_search(args: dict):
+    api_token = os.getenv("MCP_TOKEN")
+    if not api_token:
+        raise ValueError("MCP_TOKEN environment variable is required")
+
+    tools = await client.get_tools()
+
+    for tool in tools:
+        if hasattr(tool, 'name') and 'search' in tool.name.lower():
+            return await tool.ainvoke(args)
+
+    return {"error": "No search tool found"}
+
+async def search_web_async(query: str, cursor: Optional[str] = None):
+    """Search the web, optionally fetching a later results page through `cursor`.
+
+    Results are cached for SEARCH_CACHE_TTL seconds in the cache shared by all workers,
+    except while a cassette is recording or replaying the MCP calls. A replay miss is
+    raised rather than returned as an error result.
+    """
+    key = cache_key(query, cursor)
+    use_cache = SEARCH_CACHE_TTL and not cassette.active
+    if use_cache:
+        cached = shared_cache.get("search", key)
+        if cached is not None:
+            return cached
+    args = {"query": query}
+    if cursor is not None:
+        args["cursor"] = cursor
+    try:
+        result = await cassette.call("mcp", request_key("mcp", "search", args), "search",
+                                     lambda: _invoke_search(args))
+        if use_cache and not (isinstance(result, dict) and "error" in result):
+            shared_cache.set("search", key, result, SEARCH_CACHE_TTL)
+        return result
+
+    except CassetteMiss:
+        raise
+    except Exception as e:
+        return {"error": f"Search failed: {str(e)}"}
+
+async def search_web(query: str):
+    """Search the web for information based on the provided query."""
+    return await search_web_async(query)
@@ -0,0 +1,261 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from fastapi import APIRouter
+from pydantic import BaseModel
+
+from mcp_brand_agent.admission import admission_controller
+from mcp_brand_agent.brands import normalize_brand
+from mcp_brand_agent.storage import connect
+
+WARM_CACHE_ENABLED = os.getenv("WARM_CACHE_ENABLED", "1") == "1"
+WARM_CACHE_TOP_N = int(os.getenv("WARM_CACHE_TOP_N", "10"))
+WARM_CACHE_FRESH_SECONDS = int(os.getenv("WARM_CACHE_FRESH_SECONDS", "3600"))
+WARM_CACHE_MAX_AGE_SECONDS = int(os.getenv("WARM_CACHE_MAX_AGE_SECONDS", "86400"))
+WARM_CACHE_REFRESH_INTERVAL = int(os.getenv("WARM_CACHE_REFRESH_INTERVAL", "300"))
+WARM_CACHE_REFRESH_CONCURRENCY = int(os.getenv("WARM_CACHE_REFRESH_CONCURRENCY", "1"))
+WARM_CACHE_HALF_LIFE_SECONDS = int(os.getenv("WARM_CACHE_HALF_LIFE_SECONDS", "21600"))
+# Decayed score a brand needs to be refreshed in the background: about two requests within the last half-life.
+WARM_CACHE_MIN_SCORE = float(os.getenv("WARM_CACHE_MIN_SCORE", "2"))
+WARM_CACHE_REFRESH_LEASE_SECONDS = 900
+BYPASS_CACHE_STATE_KEY = "bypass_warm_cache"  # session state flag that forces a full run
+
+RefreshRun = Callable[..., Awaitable[dict]]
+
+
+class CachedReport(BaseModel):
+    brand: str
+    state: Dict[str, object]
+    computed_at: float
+    age_seconds: float
+    stale: bool
+
+
+def cacheable_state(state: dict) -> dict:
+    """The parts of a run's state worth replaying: every platform's raw and final results."""
+    return {key: value for key, value in state.items() if key.endswith("_results")}
+
+
+class WarmCache:
+    """Stale-while-revalidate cache of finished analyses, kept warm for the most requested brands.
+
+    A completed run is stored (warm_cache.db) when every platform branch succeeded and its
+    brand is popular enough to be refreshed (see below). A request whose report is younger than
+    WARM_CACHE_FRESH_SECONDS is answered from the cache; an older one, up to
+    WARM_CACHE_MAX_AGE_SECONDS, is still answered at once while a refresh runs in the
+    background. Request counts decay with a half-life, and a periodic refresher re-runs
+    the top WARM_CACHE_TOP_N brands scoring at least WARM_CACHE_MIN_SCORE before they go
+    stale, in low-priority admission slots; brands nobody asks for any more drop out.
+    """
+
+    def __init__(self, db_name: str = "warm_cache.db"):
+        self.db_name = db_name
+        self.counters: Counter = Counter()
+        self._served_age_total = 0.0
+        self._conn = None
+        self._lock = threading.Lock()
+        self._run: Optional[RefreshRun] = None
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._refresh_slots: Optional[asyncio.Semaphore] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = connect(self.db_name)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS reports (
+                    brand_key TEXT PRIMARY KEY,
+                    brand TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    computed_at REAL NOT NULL,
+                    refresh_started_at REAL
+                );
+                CREATE TABLE IF NOT EXISTS popularity (
+                    brand_key TEXT PRIMARY KEY,
+                    brand TEXT NOT NULL,
+                    score REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+            """)
+        return self._conn
+
+    @property
+    def refreshing_enabled(self) -> bool:
+        return self._run is not None
+
+    def record_request(self, brand: str) -> None:
+        """Count one request for `brand` in its exponentially decayed popularity score."""
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute("SELECT score, updated_at FROM popularity WHERE brand_key = ?",
+                                    (normalize_brand(brand),)).fetchone()
+            score = _decayed(row["score"], row["updated_at"], now) if row else 0.0
+            self.conn.execute(
+                "INSERT OR REPLACE INTO popularity (brand_key, brand, score, updated_at) VALUES (?, ?, ?, ?)",
+                (normalize_brand(brand), brand, score + 1.0, now),
+            )
+
+    def top_brands(self, limit: int = WARM_CACHE_TOP_N) -> List[dict]:
+        now = time.time()
+        with self._lock:
+            rows = self.conn.execute("SELECT brand_key, brand, score, updated_at FROM popularity").fetchall()
+        ranked = sorted(
+            ({"brand": row["brand"], "brand_key": row["brand_key"],
+              "score": round(_decayed(row["score"], row["updated_at"], now), 4)} for row in rows),
+            key=lambda entry: entry["score"], reverse=True,
+        )
+        return ranked[:limit]
+
+    def is_popular(self, brand: str) -> bool:
+        """Whether `brand` is among the top WARM_CACHE_TOP_N brands with a score of at least WARM_CACHE_MIN_SCORE."""
+        key = normalize_brand(brand)
+        return any(entry["brand_key"] == key and entry["score"] >= WARM_CACHE_MIN_SCORE for entry in self.top_brands())
+
+    def lookup(self, brand: str) -> Optional[CachedReport]:
+        """The cached report for `brand`, counted as a fresh hit, a stale hit or a miss."""
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM reports WHERE brand_key = ?", (normalize_brand(brand),)).fetchone()
+        age = time.time() - row["computed_at"] if row else None
+        # Without a refresher a stale report would never be replaced, so treat it as a miss.
+        max_age = WARM_CACHE_MAX_AGE_SECONDS if self.refreshing_enabled else WARM_CACHE_FRESH_SECONDS
+        if row is None or age > max_age:
+            self.counters["misses"] += 1
+            return None
+        stale = age > WARM_CACHE_FRESH_SECONDS
+        self.counters["stale_hits" if stale else "fresh_hits"] += 1
+        self._served_age_total += age
+        return CachedReport(brand=row["brand"], state=json.loads(row["state"]), computed_at=row["computed_at"],
+                            age_seconds=round(age, 1), stale=stale)
+
+    def store(self, brand: str, state: dict, observed_at: datetime) -> None:
+        """Run listener: keep the finished run's results as the brand's cached report.
+
+        Runs with a failed or over-budget branch are partial and are not cached, nor are
+        brands too unpopular to be kept fresh.
+        """
+        statuses = [value.get("status") for key, value in state.items()
+                    if key.endswith("_branch_status") and isinstance(value, dict)]
+        if any(status != "succeeded" for status in statuses):
+            self.counters["skipped_partial"] += 1
+            return
+        state = cacheable_state(state)
+        if not any(key.startswith("final_") for key in state):
+            return
+        if not self.is_popular(brand):
+            self.counters["skipped_unpopular"] += 1
+            return
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO reports (brand_key, brand, state, computed_at) VALUES (?, ?, ?, ?)",
+                (normalize_brand(brand), brand, json.dumps(state, default=str), observed_at.timestamp()),
+            )
+
+    def start(self, run: RefreshRun) -> None:
+        """Start refreshing in the background; `run(brand, state=...)` performs one full analysis."""
+        self._run = run
+        self._refresh_slots = asyncio.Semaphore(WARM_CACHE_REFRESH_CONCURRENCY)
+        self._loop_task = asyncio.create_task(self._refresh_popular())
+
+    async def stop(self) -> None:
+        tasks = [task for task in [self._loop_task, *self._refreshing.values()] if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._run = None
+        self._loop_task = None
+        self._refreshing.clear()
+
+    def refresh_soon(self, brand: str) -> None:
+        """Refresh `brand` in the background unless a refresh is already running here or in another worker."""
+        key = normalize_brand(brand)
+        if not self.refreshing_enabled or key in self._refreshing or not self._claim_refresh(key):
+            return
+        self._refreshing[key] = asyncio.create_task(self._refresh(brand, key))
+
+    def _claim_refresh(self, key: str) -> bool:
+        now = time.time()
+        with self._lock:
+            cursor = self.conn.execute(
+                """UPDATE reports SET refresh_started_at = ?
+                   WHERE brand_key = ? AND (refresh_started_at IS NULL OR refresh_started_at < ?)""",
+                (now, key, now - WARM_CACHE_REFRESH_LEASE_SECONDS),
+            )
+            if cursor.rowcount:
+                return True
+            # Popular brands without a report yet have no row to lease.
+            return self.conn.execute("SELECT 1 FROM reports WHERE brand_key = ?", (key,)).fetchone() is None
+
+    async def _refresh(self, brand: str, key: str) -> None:
+        try:
+            async with self._refresh_slots, admission_controller.slot("low"):
+                self.counters["refreshes_started"] += 1
+                # The run stores its own result when it finishes, which also clears the refresh lease.
+                await self._run(brand, state={BYPASS_CACHE_STATE_KEY: True})
+            self.counters["refreshes_succeeded"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.counters["refreshes_failed"] += 1
+            print(f"  [WarmCache] refresh of {brand!r} failed: {e}")
+        finally:
+            self._refreshing.pop(key, None)
+
+    async def _refresh_popular(self) -> None:
+        while True:
+            try:
+                if admission_controller.metrics()["queue_depth"] == 0:
+                    for entry in self.top_brands():
+                        if entry["score"] < WARM_CACHE_MIN_SCORE:
+                            break  # top_brands is sorted by score
+                        with self._lock:
+                            row = self.conn.execute("SELECT computed_at FROM reports WHERE brand_key = ?",
+                                                    (entry["brand_key"],)).fetchone()
+                        # Refresh a little before the report would go stale.
+                        if row is None or time.time() - row["computed_at"] > WARM_CACHE_FRESH_SECONDS * 0.8:
+                            self.refresh_soon(entry["brand"])
+            except Exception as e:
+                print(f"  [WarmCache] refresher pass failed: {e}")
+            await asyncio.sleep(WARM_CACHE_REFRESH_INTERVAL)
+
+    def metrics(self) -> dict:
+        hits = self.counters["fresh_hits"] + self.counters["stale_hits"]
+        lookups = hits + self.counters["misses"]
+        now = time.time()
+        with self._lock:
+            rows = self.conn.execute("SELECT brand_key, computed_at FROM reports").fetchall()
+        ages = {row["brand_key"]: now - row["computed_at"] for row in rows}
+        top = self.top_brands()
+        return {
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "stale_hit_rate": round(self.counters["stale_hits"] / lookups, 4) if lookups else 0.0,
+            "avg_served_age_seconds": round(self._served_age_total / hits, 1) if hits else 0.0,
+            "cached_reports": len(ages),
+            "refreshing": sorted(self._refreshing),
+            "top_brands": [
+                {**entry, "age_seconds": round(ages[entry["brand_key"]], 1) if entry["brand_key"] in ages else None,
+                 "stale": ages.get(entry["brand_key"], float("inf")) > WARM_CACHE_FRESH_SECONDS}
+                for entry in top
+            ],
+            "counters": dict(self.counters),
+        }
+
+
+def _decayed(score: float, updated_at: float, now: float) -> float:
+    return score * 0.5 ** ((now - updated_at) / WARM_CACHE_HALF_LIFE_SECONDS)
+
+
+warm_cache = WarmCache()
+
+router = APIRouter(prefix="/warm-cache", tags=["warm-cache"])
+
+
+@router.get("/metrics")
+def warm_cache_metrics():
+    return warm_cache.metrics()
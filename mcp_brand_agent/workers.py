@@ -0,0 +1,306 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import uuid
+from contextlib import asynccontextmanager
+from itertools import count
+from typing import List, Optional
+
+import httpx
+import websockets
+from fastapi import FastAPI, Request, WebSocket
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+WORKER_BASE_PORT = int(os.getenv("WORKER_BASE_PORT", "18080"))
+WORKER_DRAIN_SECONDS = float(os.getenv("WORKER_DRAIN_SECONDS", "30"))
+WORKER_STARTUP_SECONDS = float(os.getenv("WORKER_STARTUP_SECONDS", "120"))
+WORKER_APP = os.getenv("WORKER_APP", "main:app")
+PROXY_TIMEOUT_SECONDS = float(os.getenv("PROXY_TIMEOUT_SECONDS", "600"))
+
+SESSION_PATH = re.compile(r"^/apps/[^/]+/users/[^/]+/sessions/([^/]+)")
+CREATE_SESSION_PATH = re.compile(r"^/apps/[^/]+/users/[^/]+/sessions/?$")
+SESSION_ID_FIELDS = ("session_id", "sessionId")
+HOP_BY_HOP_HEADERS = {"connection", "keep-alive", "transfer-encoding", "upgrade", "host", "content-length"}
+# Session-less GET endpoints served from each worker's own memory; the proxy asks every worker.
+PER_WORKER_PATHS = {
+    "/alerts", "/alerts/baselines", "/admission/metrics", "/cassette/metrics", "/coalescing/metrics",
+    "/ingest/metrics", "/live/metrics", "/llm-pool/metrics", "/session-store/metrics", "/warm-cache/metrics",
+}
+
+
+class Worker:
+    """One `uvicorn` worker process listening on a private loopback port."""
+
+    def __init__(self, index: int, port: int, app: str):
+        self.index = index
+        self.port = port
+        self.app = app
+        self.process: Optional[subprocess.Popen] = None
+        self.restarts = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self) -> None:
+        # uvicorn reads WEB_CONCURRENCY itself; each worker must stay a single process.
+        env = dict(os.environ, WORKER_INDEX=str(self.index), WEB_CONCURRENCY="1")
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", self.app, "--host", "127.0.0.1", "--port", str(self.port),
+             "--timeout-graceful-shutdown", str(int(WORKER_DRAIN_SECONDS))],
+            env=env,
+        )
+        print(f"  [Workers] worker {self.index} started on port {self.port} (pid {self.process.pid})")
+
+
+class WorkerPool:
+    """Supervises N worker processes and maps each session to one of them.
+
+    Sessions are placed with rendezvous hashing, so a session's events stay on the
+    worker that holds it in memory. A crashed worker is restarted on the same port,
+    so placement never changes while the pool runs.
+    """
+
+    def __init__(self, workers: int = WEB_CONCURRENCY, base_port: int = WORKER_BASE_PORT, app: str = WORKER_APP):
+        self.workers = [Worker(i, base_port + i, app) for i in range(workers)]
+        self._round_robin = count()
+        self._monitor: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def pick(self, session_id: Optional[str]) -> Worker:
+        """Worker owning `session_id`, or the next worker in turn for session-less requests."""
+        if session_id is None:
+            return self.workers[next(self._round_robin) % len(self.workers)]
+        return max(
+            self.workers,
+            key=lambda w: hashlib.blake2b(f"{w.index}:{session_id}".encode("utf-8"), digest_size=8).digest(),
+        )
+
+    async def start(self) -> None:
+        for worker in self.workers:
+            worker.start()
+        await asyncio.gather(*(self._wait_ready(worker) for worker in self.workers))
+        self._monitor = asyncio.create_task(self._restart_dead_workers())
+
+    async def _wait_ready(self, worker: Worker) -> None:
+        deadline = asyncio.get_running_loop().time() + WORKER_STARTUP_SECONDS
+        async with httpx.AsyncClient() as client:
+            while asyncio.get_running_loop().time() < deadline:
+                if not worker.alive:
+                    raise RuntimeError(f"Worker {worker.index} exited during startup")
+                try:
+                    await client.get(f"{worker.url}/list-apps", timeout=2)
+                    return
+                except httpx.TransportError:
+                    await asyncio.sleep(0.25)
+        raise RuntimeError(f"Worker {worker.index} did not become ready in {WORKER_STARTUP_SECONDS}s")
+
+    async def _restart_dead_workers(self) -> None:
+        while not self._stopping:
+            await asyncio.sleep(1)
+            for worker in self.workers:
+                if not worker.alive and not self._stopping:
+                    print(f"  [Workers] worker {worker.index} exited with {worker.process.returncode}, restarting")
+                    worker.restarts += 1
+                    worker.start()
+
+    async def stop(self) -> None:
+        """Drain: ask every worker to finish in-flight requests, then kill any that overrun."""
+        self._stopping = True
+        if self._monitor:
+            self._monitor.cancel()
+        for worker in self.workers:
+            if worker.alive:
+                worker.process.send_signal(signal.SIGTERM)
+        deadline = asyncio.get_running_loop().time() + WORKER_DRAIN_SECONDS
+        for worker in self.workers:
+            while worker.alive and asyncio.get_running_loop().time() < deadline:
+                await asyncio.sleep(0.1)
+            if worker.alive:
+                print(f"  [Workers] worker {worker.index} did not drain in time, killing")
+                worker.process.kill()
+            if worker.process is not None:
+                worker.process.wait()
+
+    def status(self) -> List[dict]:
+        return [
+            {"index": w.index, "port": w.port, "pid": w.process.pid if w.process else None,
+             "alive": w.alive, "restarts": w.restarts}
+            for w in self.workers
+        ]
+
+
+def request_session_id(path: str, query: dict, body: bytes) -> Optional[str]:
+    """Session id a request belongs to, from its path, query string or `/run` JSON body.
+
+    ADK's request models accept camelCase aliases, so `sessionId` is read as well.
+    """
+    match = SESSION_PATH.match(path)
+    if match:
+        return match.group(1)
+    for name in SESSION_ID_FIELDS:
+        if name in query:
+            return query[name]
+    if body and path in ("/run", "/run_sse"):
+        try:
+            payload = json.loads(body)
+            return next((payload[name] for name in SESSION_ID_FIELDS if payload.get(name)), None)
+        except (ValueError, AttributeError, TypeError):
+            return None
+    return None
+
+
+def create_proxy_app(pool: WorkerPool) -> FastAPI:
+    """Front app that forwards every request to the worker owning its session.
+
+    Requests without a session go to the next worker in turn, except the PER_WORKER_PATHS
+    and session lists, which hold per-process state and are gathered from every worker.
+    """
+    client: Optional[httpx.AsyncClient] = None
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        nonlocal client
+        client = httpx.AsyncClient(timeout=PROXY_TIMEOUT_SECONDS, limits=httpx.Limits(max_keepalive_connections=64))
+        await pool.start()
+        try:
+            yield
+        finally:
+            await pool.stop()
+            await client.aclose()
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.get("/workers")
+    def list_workers():
+        return pool.status()
+
+    @app.websocket("/{path:path}")
+    async def proxy_websocket(websocket: WebSocket, path: str):
+        """Relay any WebSocket (/run_live, /live/brands/...) to the worker owning its session."""
+        worker = pool.pick(request_session_id(websocket.url.path, dict(websocket.query_params), b""))
+        query = f"?{websocket.url.query}" if websocket.url.query else ""
+        url = f"ws://127.0.0.1:{worker.port}{websocket.url.path}{query}"
+        try:
+            upstream = await websockets.connect(url)
+        except (OSError, websockets.exceptions.WebSocketException) as e:
+            print(f"  [Workers] WebSocket {websocket.url.path} to worker {worker.index} failed: {e}")
+            await websocket.close(code=1011)
+            return
+        await websocket.accept()
+        async with upstream:
+
+            async def client_to_worker():
+                while True:
+                    message = await websocket.receive()
+                    if message["type"] == "websocket.disconnect":
+                        await upstream.close()
+                        return
+                    await upstream.send(message["text"] if message.get("text") is not None else message["bytes"])
+
+            async def worker_to_client():
+                async for message in upstream:
+                    if isinstance(message, str):
+                        await websocket.send_text(message)
+                    else:
+                        await websocket.send_bytes(message)
+                await websocket.close()
+
+            done, pending = await asyncio.wait(
+                [asyncio.create_task(client_to_worker()), asyncio.create_task(worker_to_client())],
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in pending:
+                task.cancel()
+
+    @app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "HEAD"])
+    async def proxy(request: Request, path: str):
+        body = await request.body()
+        path = request.url.path
+        if request.method == "POST" and CREATE_SESSION_PATH.match(path):
+            # Choose the id here so the session is created on the worker that will serve it.
+            path = f"{path.rstrip('/')}/{uuid.uuid4()}"
+        if request.method == "GET" and CREATE_SESSION_PATH.match(path):
+            return await list_sessions_everywhere(request, path)
+        if request.method == "GET" and path in PER_WORKER_PATHS:
+            return await ask_every_worker(request, path)
+
+        worker = pool.pick(request_session_id(path, dict(request.query_params), body))
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+        upstream = client.build_request(
+            request.method, f"{worker.url}{path}", params=request.query_params, headers=headers, content=body,
+        )
+        try:
+            response = await client.send(upstream, stream=True)
+        except httpx.TransportError as e:
+            return JSONResponse({"detail": f"Worker {worker.index} unavailable: {e}"}, status_code=502)
+        return StreamingResponse(
+            response.aiter_raw(),
+            status_code=response.status_code,
+            headers={k: v for k, v in response.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS},
+            background=BackgroundTask(response.aclose),
+        )
+
+    async def list_sessions_everywhere(request: Request, path: str):
+        """Session lists are per worker with in-memory sessions, so merge them."""
+        responses = await asyncio.gather(
+            *(client.get(f"{w.url}{path}", params=request.query_params) for w in pool.workers)
+        )
+        sessions, seen = [], set()
+        for response in responses:
+            for session in response.json():
+                if session["id"] not in seen:
+                    seen.add(session["id"])
+                    sessions.append(session)
+        return JSONResponse(sessions)
+
+    async def ask_every_worker(request: Request, path: str):
+        """Lists (alerts, baselines) are merged; anything else is returned per worker under "workers"."""
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+        responses = await asyncio.gather(
+            *(client.get(f"{w.url}{path}", params=request.query_params, headers=headers) for w in pool.workers),
+            return_exceptions=True,
+        )
+        results = []
+        for worker, response in zip(pool.workers, responses):
+            if isinstance(response, Exception) or response.status_code != 200:
+                error = repr(response) if isinstance(response, Exception) else f"HTTP {response.status_code}"
+                results.append({"worker": worker.index, "error": error})
+            else:
+                results.append({"worker": worker.index, "body": response.json()})
+        unavailable = [r["worker"] for r in results if "error" in r]
+        bodies = [r["body"] for r in results if "body" in r]
+        if bodies and all(isinstance(body, list) for body in bodies):
+            merged = [item for body in bodies for item in body]
+            if path == "/alerts":
+                merged.sort(key=lambda alert: alert.get("observed_at", ""), reverse=True)
+                merged = merged[:int(request.query_params.get("limit", 50))]
+            headers = {"X-Workers-Unavailable": ",".join(map(str, unavailable))} if unavailable else None
+            return JSONResponse(merged, headers=headers)
+        return JSONResponse({"workers": [
+            {"worker": r["worker"], **(r["body"] if isinstance(r.get("body"), dict) else r)} for r in results
+        ]})
+
+    return app
+
+
+def serve(host: str = "0.0.0.0", port: int = 8080, workers: int = WEB_CONCURRENCY) -> None:
+    """Run `workers` app processes behind a session-affine proxy on host:port."""
+    import uvicorn
+
+    pool = WorkerPool(workers=workers)
+    print(f"Starting {workers} workers on ports {WORKER_BASE_PORT}-{WORKER_BASE_PORT + workers - 1}")
+    uvicorn.run(
+        create_proxy_app(pool), host=host, port=port, workers=1, timeout_graceful_shutdown=int(WORKER_DRAIN_SECONDS),
+    )
@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="mcp_brand_agent_tests_"))
@@ -0,0 +1,145 @@
+import asyncio
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from mcp_brand_agent.admission import AdmissionController, AdmissionMiddleware  # noqa: E402
+
+
+def make_client(controller, gate, order):
+    app = FastAPI()
+
+    @app.post("/run")
+    async def run(name: str):
+        order.append(name)
+        await gate.wait()
+        return {"name": name}
+
+    @app.get("/other")
+    def other():
+        return {"ok": True}
+
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def until(condition):
+    for _ in range(1000):
+        if condition():
+            return
+        await asyncio.sleep(0.001)
+    raise AssertionError("condition never became true")
+
+
+def post(client, name, priority="normal"):
+    return asyncio.create_task(client.post("/run", params={"name": name}, headers={"X-Priority": priority}))
+
+
+def test_queue_runs_in_priority_order():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, queue_size=4, queue_timeout=5)
+        gate, order = asyncio.Event(), []
+        async with make_client(controller, gate, order) as client:
+            first = post(client, "first")
+            await until(lambda: order == ["first"])
+            low = post(client, "low", "low")
+            normal = post(client, "normal")
+            high = post(client, "high", "high")
+            await until(lambda: len(controller._waiters) == 3)
+            gate.set()
+            responses = await asyncio.gather(first, low, normal, high)
+        return controller, order, responses
+
+    controller, order, responses = asyncio.run(scenario())
+
+    assert order == ["first", "high", "normal", "low"]
+    assert [r.status_code for r in responses] == [200] * 4
+    assert controller.in_flight == 0
+    assert controller.counters["admitted"] == 4
+
+
+def test_full_queue_is_rejected_with_429_and_retry_after():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, queue_size=1, queue_timeout=5)
+        gate, order = asyncio.Event(), []
+        async with make_client(controller, gate, order) as client:
+            first = post(client, "first")
+            await until(lambda: order == ["first"])
+            queued = post(client, "queued")
+            await until(lambda: len(controller._waiters) == 1)
+            rejected = await client.post("/run", params={"name": "rejected"})
+            gate.set()
+            await asyncio.gather(first, queued)
+        return order, rejected
+
+    order, rejected = asyncio.run(scenario())
+
+    assert rejected.status_code == 429
+    assert rejected.json()["detail"] == "Server busy: queue_full"
+    assert int(rejected.headers["retry-after"]) >= 1
+    assert rejected.json()["retry_after"] == int(rejected.headers["retry-after"])
+    assert order == ["first", "queued"]
+
+
+def test_higher_priority_displaces_the_lowest_waiter():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, queue_size=1, queue_timeout=5)
+        gate, order = asyncio.Event(), []
+        async with make_client(controller, gate, order) as client:
+            first = post(client, "first")
+            await until(lambda: order == ["first"])
+            low = post(client, "low", "low")
+            await until(lambda: len(controller._waiters) == 1)
+            high = post(client, "high", "high")
+            displaced = await low
+            gate.set()
+            responses = await asyncio.gather(first, high)
+        return controller, order, displaced, responses
+
+    controller, order, displaced, responses = asyncio.run(scenario())
+
+    assert displaced.status_code == 503
+    assert displaced.json()["detail"] == "Server busy: displaced"
+    assert "retry-after" in displaced.headers
+    assert [r.status_code for r in responses] == [200, 200]
+    assert order == ["first", "high"]
+    assert controller.counters["rejected_low"] == 1
+
+
+def test_queue_timeout_is_rejected_with_503():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, queue_size=4, queue_timeout=0.05)
+        gate, order = asyncio.Event(), []
+        async with make_client(controller, gate, order) as client:
+            first = post(client, "first")
+            await until(lambda: order == ["first"])
+            timed_out = await client.post("/run", params={"name": "late"})
+            gate.set()
+            await first
+        return controller, order, timed_out
+
+    controller, order, timed_out = asyncio.run(scenario())
+
+    assert timed_out.status_code == 503
+    assert timed_out.json()["detail"] == "Server busy: queue_timeout"
+    assert int(timed_out.headers["retry-after"]) >= 1
+    assert order == ["first"]
+    assert controller.in_flight == 0 and not controller._waiters
+
+
+def test_other_routes_bypass_admission():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, queue_size=1, queue_timeout=5)
+        gate, order = asyncio.Event(), []
+        async with make_client(controller, gate, order) as client:
+            first = post(client, "first")
+            await until(lambda: order == ["first"])
+            other = await client.get("/other")
+            gate.set()
+            await first
+        return other
+
+    assert asyncio.run(scenario()).status_code == 200
@@ -0,0 +1,38 @@
+import asyncio
+import io
+import json
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from mcp_brand_agent import batch  # noqa: E402
+from mcp_brand_agent.batch import BatchRequest, Checkpoint, run_batch  # noqa: E402
+
+STATUSES = {"Nike": "ok", "Tesla": "empty", "Apple": "error"}
+
+
+async def fake_run_one(request):
+    return {"id": request.id, "brand": request.brand, "status": STATUSES[request.brand], "elapsed_seconds": 0}
+
+
+def test_only_ok_results_are_checkpointed(monkeypatch, tmp_path):
+    monkeypatch.setattr(batch, "run_one", fake_run_one)
+    path = str(tmp_path / "results.ndjson.checkpoint")
+    requests = [BatchRequest(id=brand.lower(), brand=brand) for brand in STATUSES]
+
+    checkpoint = Checkpoint(path)
+    output = io.StringIO()
+    counts = asyncio.run(run_batch(iter(requests), output, checkpoint, concurrency=2))
+    checkpoint.close()
+
+    assert counts == {"ok": 1, "empty": 1, "error": 1, "skipped": 0}
+    assert len(output.getvalue().splitlines()) == 3
+
+    checkpoint = Checkpoint(path)
+    output = io.StringIO()
+    counts = asyncio.run(run_batch(iter(requests), output, checkpoint, concurrency=2))
+    checkpoint.close()
+
+    assert checkpoint.done == {"nike"}
+    assert counts["skipped"] == 1
+    assert sorted(json.loads(line)["id"] for line in output.getvalue().splitlines()) == ["apple", "tesla"]
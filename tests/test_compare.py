@@ -0,0 +1,40 @@
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from mcp_brand_agent.compare import compare_table, router  # noqa: E402
+from mcp_brand_agent.mention_table import MentionTableBuilder  # noqa: E402
+
+
+def test_compare_table_without_mentions():
+    result = compare_table(MentionTableBuilder().build(), ["Nike", "Adidas"], ["Twitter", "Reddit"])
+
+    assert [brand.mentions for brand in result["brands"]] == [0, 0]
+    assert [brand.unique_themes for brand in result["brands"]] == [[], []]
+    assert result["shared_themes"] == {}
+    assert result["platforms"][0].mentions == {"Nike": 0, "Adidas": 0}
+
+
+def test_compare_table_themes():
+    builder = MentionTableBuilder()
+    builder.add_row("Nike", "Twitter", "Recent", 0, "positive", "Labor", "a", "u1")
+    builder.add_row("Adidas", "Twitter", "Recent", 0, "negative", "labor", "b", "u2")
+    builder.add_row("Nike", "Reddit", "Recent", 0, "negative", "Privacy", "c", "u3")
+
+    result = compare_table(builder.build(), ["Nike", "Adidas"], ["Twitter", "Reddit"])
+
+    assert result["shared_themes"] == {"labor": ["Nike", "Adidas"]}
+    assert result["brands"][0].unique_themes == ["privacy"]
+    assert result["brands"][1].net_sentiment_delta == -1.0
+
+
+def test_blank_brands_are_rejected():
+    app = FastAPI()
+    app.include_router(router)
+    response = TestClient(app).post("/compare", json={"brands": ["  ", ""]})
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "At least one brand name must not be blank"
@@ -0,0 +1,33 @@
+import os
+import random
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from mcp_brand_agent.highlights import cluster_highlights  # noqa: E402
+
+HIGHLIGHTS = [
+    ("Twitter", "Fair wages for factory workers"),
+    ("Reddit", "fair wages for factory workers."),
+    ("Reddit", "Factory worker wages"),
+    ("Twitter", "Carbon emissions from shipping"),
+    ("Facebook", "Shipping carbon emissions"),
+    ("Facebook", "Data privacy of app users"),
+    ("Reddit", "Privacy of user data"),
+    ("Twitter", "Animal testing"),
+]
+
+
+def test_themes_do_not_depend_on_input_order():
+    expected = [theme.model_dump() for theme in cluster_highlights(HIGHLIGHTS)]
+    shuffled = list(HIGHLIGHTS)
+    for seed in range(10):
+        random.Random(seed).shuffle(shuffled)
+        assert [theme.model_dump() for theme in cluster_highlights(shuffled)] == expected
+
+
+def test_near_duplicates_share_a_theme():
+    themes = {theme.theme: theme for theme in cluster_highlights(HIGHLIGHTS)}
+    wages = next(theme for theme in themes.values() if "wages" in theme.theme.lower())
+    assert wages.count == 3
+    assert wages.platforms == ["Reddit", "Twitter"]
+    assert any(theme.theme == "Animal testing" and theme.count == 1 for theme in themes.values())
@@ -0,0 +1,57 @@
+import asyncio
+import json
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from mcp_brand_agent.live import Broadcaster, LiveRelay  # noqa: E402
+
+
+def test_local_subscriber_gets_published_updates():
+    async def scenario():
+        broadcaster = Broadcaster(buffer=2)
+        subscriber = broadcaster.subscribe("Nike")
+        for n in range(3):
+            broadcaster.publish("nike", {"n": n})
+        broadcaster.publish("Tesla", {"n": 99})
+        return [json.loads(message)["n"] for message in await subscriber.next_messages()], subscriber.dropped
+
+    assert asyncio.run(scenario()) == ([1, 2], 1)
+
+
+def test_updates_reach_subscribers_of_other_workers(tmp_path):
+    db_name = f"live_{tmp_path.name}.db"
+
+    async def scenario():
+        workers = []
+        for index in range(2):
+            broadcaster, relay = Broadcaster(), LiveRelay(origin=str(index), db_name=db_name, poll_seconds=0.01)
+            relay.start(broadcaster)
+            workers.append((broadcaster, relay))
+        (publisher, publisher_relay), (listener, listener_relay) = workers
+        subscriber = listener.subscribe("Nike")
+        for _ in range(100):
+            if "nike" in publisher_relay.remote_brands:
+                break
+            await asyncio.sleep(0.01)
+        assert publisher.wanted("nike") and not publisher.channels
+
+        publisher.publish("Nike", {"type": "run_completed"})
+        publisher.publish("Tesla", {"type": "run_completed"})
+        messages = await asyncio.wait_for(subscriber.next_messages(), 2)
+
+        listener.unsubscribe(subscriber)
+        for _ in range(100):
+            if "nike" not in publisher_relay.remote_brands:
+                break
+            await asyncio.sleep(0.01)
+        remote_after_unsubscribe = set(publisher_relay.remote_brands)
+        for _, relay in workers:
+            await relay.stop()
+        return messages, publisher_relay.counters, remote_after_unsubscribe
+
+    messages, counters, remote_after_unsubscribe = asyncio.run(scenario())
+
+    assert [json.loads(message) for message in messages] == [{"type": "run_completed"}]
+    assert counters["relayed_out"] == 1
+    assert remote_after_unsubscribe == set()
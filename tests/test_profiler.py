@@ -0,0 +1,69 @@
+import asyncio
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import pytest  # noqa: E402
+from google.adk.agents import BaseAgent  # noqa: E402
+from google.adk.events import Event  # noqa: E402
+from google.adk.runners import InMemoryRunner  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from mcp_brand_agent import profiler  # noqa: E402
+from mcp_brand_agent.singleflight import CoalescingAgent  # noqa: E402
+
+
+async def wait_for_search():
+    await asyncio.sleep(0.05)
+
+
+class SlowPipeline(BaseAgent):
+    fail: bool = False
+
+    async def _run_async_impl(self, ctx):
+        await asyncio.gather(wait_for_search(), wait_for_search())
+        if self.fail:
+            raise RuntimeError("search failed")
+        yield Event(invocation_id=ctx.invocation_id, author=self.name, branch=ctx.branch)
+
+
+def run(brand, fail):
+    root = CoalescingAgent(name="root", sub_agents=[SlowPipeline(name="pipeline", fail=fail)])
+    runner = InMemoryRunner(agent=root, app_name="test")
+
+    async def scenario():
+        session = await runner.session_service.create_session(app_name="test", user_id="u")
+        async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=types.Content(
+                role="user", parts=[types.Part(text=brand)])):
+            pass
+        return session.id
+
+    return scenario
+
+
+@pytest.fixture
+def profiled(monkeypatch):
+    monkeypatch.setattr(profiler, "PROFILE_RUNS", True)
+    monkeypatch.setattr(profiler.sampler, "interval", 0.001)
+    written = []
+    finish = profiler.finish_profile
+    monkeypatch.setattr(profiler, "finish_profile", lambda invocation_id: written.append(finish(invocation_id)))
+    return written
+
+
+def test_profile_records_await_stacks(profiled):
+    asyncio.run(run("Profiled Co", fail=False)())
+
+    assert not profiler.sampler.profiles
+    [name] = profiled
+    with open(os.path.join(profiler.profiles_dir(), name)) as f:
+        folded = f.read()
+    assert "await;" in folded and "wait_for_search" in folded
+
+
+def test_failed_run_still_stops_its_profile(profiled):
+    with pytest.raises(RuntimeError, match="search failed"):
+        asyncio.run(run("Failing Co", fail=True)())
+
+    assert not profiler.sampler.profiles
+    assert len(profiled) == 1 and profiled[0] is not None
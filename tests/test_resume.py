@@ -0,0 +1,102 @@
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from mcp_brand_agent.resume import (  # noqa: E402
+    EXTRACT, FULL, SKIP, branch_status, branch_status_key, cleared_results, is_resume, resume_plan,
+)
+
+KEYS = ["twitter", "reddit"]
+CAN_EXTRACT = {"twitter": True, "reddit": True}
+
+
+def report(brand, platform="Twitter"):
+    return {
+        "brand_name": brand,
+        "platform_name": platform,
+        "total_mentions_on_platform": 1,
+        "platform_sentiment_breakdown": {"positive": 1.0, "negative": 0.0, "neutral": 0.0},
+        "ethical_highlights_on_platform": [],
+        "word_cloud_themes_on_platform": [],
+        "mentions_on_platform": [],
+    }
+
+
+def status(brand, value, invocation_id="inv-1"):
+    return branch_status(brand, value, invocation_id)
+
+
+def test_new_brand_is_not_a_resume():
+    assert not is_resume({}, "Nike", KEYS)
+
+
+def test_completed_run_is_not_resumed():
+    state = {
+        branch_status_key("twitter"): status("Nike", "succeeded"),
+        branch_status_key("reddit"): status("Nike", "succeeded"),
+        "final_twitter_results": report("Nike"),
+        "final_reddit_results": report("Nike", "Reddit"),
+    }
+    assert not is_resume(state, "nike", KEYS)
+
+
+def test_failed_branch_is_rerun_and_complete_branch_skipped():
+    state = {
+        branch_status_key("twitter"): status("Nike", "succeeded"),
+        branch_status_key("reddit"): status("Nike", "failed"),
+        "final_twitter_results": report("Nike"),
+        "final_reddit_results": report("Nike", "Reddit"),
+    }
+    assert is_resume(state, "Nike", KEYS)
+    assert resume_plan(state, "Nike", KEYS, {}) == {"twitter": SKIP, "reddit": FULL}
+
+
+def test_failed_branch_with_raw_results_only_extracts():
+    state = {
+        branch_status_key("twitter"): status("Nike", "running"),
+        branch_status_key("reddit"): status("Nike", "failed"),
+        "twitter_results": "raw search output",
+        "reddit_results": "raw search output",
+    }
+    assert resume_plan(state, "Nike", KEYS, CAN_EXTRACT) == {"twitter": EXTRACT, "reddit": EXTRACT}
+    assert resume_plan(state, "Nike", KEYS, {"twitter": True}) == {"twitter": EXTRACT, "reddit": FULL}
+
+
+def test_invalid_final_results_are_not_skipped():
+    state = {
+        branch_status_key("twitter"): status("Nike", "running"),
+        branch_status_key("reddit"): status("Nike", "failed"),
+        "final_twitter_results": {"brand_name": "Nike"},
+    }
+    assert resume_plan(state, "Nike", KEYS, {}) == {"twitter": FULL, "reddit": FULL}
+
+
+def test_brand_switch_does_not_reuse_previous_brand_results():
+    # Nike completed, then a Tesla run started both branches and one of them failed.
+    state = {
+        "final_twitter_results": report("Nike"),
+        "final_reddit_results": report("Nike", "Reddit"),
+        "twitter_results": "raw Nike output",
+        "reddit_results": "raw Nike output",
+    }
+    for key in KEYS:
+        state.update(cleared_results(key))
+    state[branch_status_key("twitter")] = status("Tesla", "running", "inv-2")
+    state[branch_status_key("reddit")] = status("Tesla", "failed", "inv-2")
+
+    assert is_resume(state, "Tesla", KEYS)
+    assert resume_plan(state, "Tesla", KEYS, CAN_EXTRACT) == {"twitter": FULL, "reddit": FULL}
+
+
+def test_report_for_another_brand_is_not_skipped():
+    state = {
+        branch_status_key("twitter"): status("Tesla", "running", "inv-2"),
+        branch_status_key("reddit"): status("Tesla", "failed", "inv-2"),
+        "final_twitter_results": report("Nike"),
+    }
+    assert resume_plan(state, "Tesla", KEYS, {}) == {"twitter": FULL, "reddit": FULL}
+
+
+def test_extract_keeps_raw_results():
+    assert cleared_results("twitter", keep_raw=True) == {"final_twitter_results": None}
+    assert cleared_results("twitter") == {"final_twitter_results": None, "twitter_results": None}
@@ -0,0 +1,35 @@
+import os
+from datetime import datetime, timezone
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import pytest  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from mcp_brand_agent import rollups  # noqa: E402
+from mcp_brand_agent.rollups import SentimentRollups, normalize_mention_date  # noqa: E402
+
+OBSERVED_AT = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("03/04/2025", datetime(2025, 3, 4, tzinfo=timezone.utc)),
+    ("12/31/2024", datetime(2024, 12, 31, tzinfo=timezone.utc)),
+    ("25/03/2025", datetime(2025, 3, 25, tzinfo=timezone.utc)),
+    ("2025-03-04", datetime(2025, 3, 4, tzinfo=timezone.utc)),
+])
+def test_numeric_dates_are_read_month_first(value, expected):
+    assert normalize_mention_date(value, OBSERVED_AT) == expected
+
+
+def test_unknown_granularity_is_rejected():
+    store = SentimentRollups("test_rollups_granularity.db")
+    with pytest.raises(ValueError, match="granularity"):
+        store.series("Nike", OBSERVED_AT, OBSERVED_AT, "week")
+
+    app = FastAPI()
+    app.include_router(rollups.router)
+    client = TestClient(app)
+    assert client.get("/brands/Nike/sentiment/series", params={"granularity": "week"}).status_code == 422
+    assert client.get("/brands/Nike/sentiment/series", params={"granularity": "hour"}).status_code == 200
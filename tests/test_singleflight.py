@@ -0,0 +1,101 @@
+import asyncio
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import pytest  # noqa: E402
+from google.adk.agents import BaseAgent  # noqa: E402
+from google.adk.events import Event, EventActions  # noqa: E402
+from google.adk.runners import InMemoryRunner  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from mcp_brand_agent import singleflight  # noqa: E402
+from mcp_brand_agent.brands import brand_from_content  # noqa: E402
+from mcp_brand_agent.metering import record_run_cost, usage_meter  # noqa: E402
+from mcp_brand_agent.singleflight import CoalescingAgent, single_flight  # noqa: E402
+
+
+class FakePipeline(BaseAgent):
+    """Meters one LLM call, waits for the gate, then either fails or writes a result."""
+
+    gate: asyncio.Event = None
+    fail_first: bool = False
+    invocations: list = []
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    async def _run_async_impl(self, ctx):
+        self.invocations.append(ctx.invocation_id)
+        brand = brand_from_content(ctx.user_content)
+        usage_meter.record_llm(ctx.invocation_id, ctx.session.id, brand, "Twitter", "gpt-4o-mini", 100, 50)
+        yield Event(invocation_id=ctx.invocation_id, author=self.name, branch=ctx.branch,
+                    actions=EventActions(state_delta={"twitter_branch_status": {"status": "running"}}))
+        await self.gate.wait()
+        if self.fail_first and len(self.invocations) == 1 and self.invocations[0] == ctx.invocation_id:
+            raise RuntimeError("search failed")
+        yield Event(invocation_id=ctx.invocation_id, author=self.name, branch=ctx.branch,
+                    actions=EventActions(state_delta={"final_twitter_results": {"by": ctx.invocation_id}}))
+
+
+@pytest.fixture
+def published(monkeypatch):
+    runs = []
+    monkeypatch.setattr(singleflight, "publish_run", lambda brand, state: runs.append((brand, state)))
+    return runs
+
+
+def run_concurrently(brand, requests=2, fail_first=False):
+    async def scenario():
+        pipeline = FakePipeline(name="pipeline", gate=asyncio.Event(), fail_first=fail_first, invocations=[])
+        root = CoalescingAgent(name="root", sub_agents=[pipeline], after_agent_callback=record_run_cost)
+        runner = InMemoryRunner(agent=root, app_name="test")
+        sessions = [await runner.session_service.create_session(app_name="test", user_id="u")
+                    for _ in range(requests)]
+
+        async def run(session):
+            async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=types.Content(
+                    role="user", parts=[types.Part(text=brand)])):
+                pass
+
+        tasks = [asyncio.create_task(run(sessions[0]))]
+        while not pipeline.invocations:
+            await asyncio.sleep(0.001)
+        tasks += [asyncio.create_task(run(session)) for session in sessions[1:]]
+        flight = next(f for (key, _), f in single_flight._flights.items() if key == brand.lower())
+        while flight.followers < requests - 1:
+            await asyncio.sleep(0.001)
+        pipeline.gate.set()
+        errors = await asyncio.gather(*tasks, return_exceptions=True)
+        states = [(await runner.session_service.get_session(app_name="test", user_id="u", session_id=s.id)).state
+                  for s in sessions]
+        return pipeline.invocations, errors, states
+
+    return asyncio.run(scenario())
+
+
+def test_followers_share_the_leader_run(published):
+    invocations, errors, states = run_concurrently("Coalesce Co", requests=3)
+
+    assert len(invocations) == 1
+    assert errors == [None, None, None]
+    assert all(state["final_twitter_results"] == {"by": invocations[0]} for state in states)
+    assert "coalesced_from" not in states[0]
+    assert [state["coalesced_from"] for state in states[1:]] == invocations * 2
+    assert states[0]["run_cost"]["total"]["llm_calls"] == 1
+    assert [brand for brand, _ in published] == ["Coalesce Co"]
+    assert published[0][1]["final_twitter_results"] == {"by": invocations[0]}
+
+
+def test_failed_leader_makes_followers_run_on_their_own(published):
+    invocations, errors, states = run_concurrently("Fallback Co", requests=2, fail_first=True)
+
+    leader, follower = invocations
+    assert isinstance(errors[0], RuntimeError) and errors[1] is None
+    assert states[1]["final_twitter_results"] == {"by": follower}
+    assert "coalesced_from" not in states[1]
+    assert [brand for brand, _ in published] == ["Fallback Co"]
+    assert published[0][1]["final_twitter_results"] == {"by": follower}
+    assert states[1]["run_cost"]["total"]["llm_calls"] == 1
+    assert states[1]["run_cost"]["total"]["prompt_tokens"] == 100
+    assert single_flight.counters["fallbacks"] >= 1
+    assert not single_flight._flights
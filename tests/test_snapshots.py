@@ -0,0 +1,89 @@
+import os
+from datetime import datetime, timezone
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from mcp_brand_agent import snapshots  # noqa: E402
+from mcp_brand_agent.snapshots import SnapshotStore, apply_patch, diff_documents, report_document  # noqa: E402
+
+OBSERVED_AT = datetime(2025, 3, 4, tzinfo=timezone.utc)
+
+
+def mention(n, sentiment="positive"):
+    return {"date": "2025-03-04", "text": f"mention {n}", "sentiment": sentiment,
+            "ethical_context": "labor", "url": f"https://example.com/{n}"}
+
+
+def report(platform, mentions, words, highlights=("wages",)):
+    positive = sum(m["sentiment"] == "positive" for m in mentions)
+    return {
+        "brand_name": "Nike",
+        "platform_name": platform,
+        "total_mentions_on_platform": len(mentions),
+        "platform_sentiment_breakdown": {"positive": positive, "negative": len(mentions) - positive, "neutral": 0},
+        "ethical_highlights_on_platform": list(highlights),
+        "word_cloud_themes_on_platform": [{"word": word, "weight": weight} for word, weight in words.items()],
+        "mentions_on_platform": mentions,
+    }
+
+
+def run_states():
+    """Seven runs changing mentions, sentiment, word cloud, highlights and platforms."""
+    twitter = [mention(1), mention(2, "negative")]
+    yield {"final_twitter_results": report("Twitter", twitter, {"wages": 0.5})}
+    twitter = twitter + [mention(3)]
+    yield {"final_twitter_results": report("Twitter", twitter, {"wages": 0.6, "safety": 0.2})}
+    reddit = [mention(10, "negative")]
+    yield {"final_twitter_results": report("Twitter", twitter, {"wages": 0.6, "safety": 0.2}),
+           "final_reddit_results": report("Reddit", reddit, {"privacy": 0.9})}
+    twitter = twitter[1:]
+    yield {"final_twitter_results": report("Twitter", twitter, {"safety": 0.3}, ["safety"]),
+           "final_reddit_results": report("Reddit", reddit, {"privacy": 0.9})}
+    yield {"final_reddit_results": report("Reddit", reddit + [mention(11)], {"privacy": 0.8})}
+    yield {"final_twitter_results": report("Twitter", [mention(4)], {"wages": 0.1}),
+           "final_reddit_results": report("Reddit", reddit + [mention(11)], {"privacy": 0.8})}
+    yield {"final_twitter_results": report("Twitter", [mention(4), mention(5)], {"wages": 0.1})}
+
+
+def test_patch_round_trip():
+    documents = [report_document("Nike", state) for state in run_states()]
+    for old, new in zip(documents, documents[1:]):
+        assert apply_patch(old, diff_documents(old, new)) == new
+    assert diff_documents(documents[0], documents[0]) == {}
+
+
+def test_versions_round_trip_across_keyframes(monkeypatch):
+    monkeypatch.setattr(snapshots, "SNAPSHOT_KEYFRAME_INTERVAL", 3)
+    store = SnapshotStore("test_snapshots_round_trip.db")
+    states = list(run_states())
+    ids = [store.add_run("Nike", state, OBSERVED_AT) for state in states]
+    documents = [report_document("Nike", state) for state in states]
+
+    history = sorted(store.history("Nike"), key=lambda row: row["version"])
+    assert [row["keyframe"] for row in history] == [True, False, False, True, False, False, True]
+    for snapshot_id, document in zip(ids, documents):
+        assert store.snapshot("Nike", snapshot_id)["platforms"] == document
+
+    delta = store.delta("Nike", ids[1])
+    assert delta["to_snapshot_id"] == ids[-1]
+    assert apply_patch(documents[1], delta["patch"]) == documents[-1]
+
+    pages = store.documents_after(ids[1], limit=100)
+    assert [row["version"] for row, _ in pages] == [3, 4, 5, 6, 7]
+    assert [document for _, document in pages] == documents[2:]
+
+
+def test_unchanged_run_adds_no_version():
+    store = SnapshotStore("test_snapshots_unchanged.db")
+    state = next(run_states())
+    first = store.add_run("Nike", state, OBSERVED_AT)
+    assert store.add_run("nike", state, OBSERVED_AT) == first
+    assert len(store.history("Nike")) == 1
+
+
+def test_interval_of_one_stores_every_version_in_full(monkeypatch):
+    monkeypatch.setattr(snapshots, "SNAPSHOT_KEYFRAME_INTERVAL", 1)
+    store = SnapshotStore("test_snapshots_interval_one.db")
+    for state in run_states():
+        store.add_run("Nike", state, OBSERVED_AT)
+    assert all(row["keyframe"] for row in store.history("Nike"))
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import pytest  # noqa: E402
+from google.adk.agents import BaseAgent  # noqa: E402
+from google.adk.events import Event  # noqa: E402
+from google.adk.runners import InMemoryRunner  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from mcp_brand_agent.stream_parser import MentionStreamParser, SchemaRetryAgent, StreamSchemaError  # noqa: E402
+
+
+def mention(text="Good \"fair\" wages\\", sentiment="positive", **extra):
+    return {"date": "2025-03-04", "text": text, "sentiment": sentiment,
+            "ethical_context": "labor", "url": "https://example.com/1", **extra}
+
+
+def report_json(mentions):
+    return json.dumps({
+        "brand_name": "Nike",
+        "platform_name": "Twitter",
+        "total_mentions_on_platform": len(mentions),
+        "platform_sentiment_breakdown": {"positive": 1.0, "negative": 0.0, "neutral": 0.0},
+        "ethical_highlights_on_platform": ["wages"],
+        "word_cloud_themes_on_platform": [{"word": "wages", "weight": 0.5}],
+        "mentions_on_platform": mentions,
+    })
+
+
+def feed_in_chunks(parser, text, size):
+    emitted = []
+    for start in range(0, len(text), size):
+        emitted.extend(parser.feed(text[start:start + size]))
+    return emitted
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64])
+def test_chunked_report_emits_each_mention(size):
+    mentions = [mention(), mention(text="nested", meta={"tags": ["a", {"b": [1, 2.5e3, None, True]}]})]
+    parser = MentionStreamParser("Twitter")
+
+    emitted = feed_in_chunks(parser, report_json(mentions), size)
+    parser.close()
+
+    assert [m.text for m in emitted] == ['Good "fair" wages\\', "nested"]
+    assert parser.done
+
+
+def test_string_split_mid_escape():
+    text = report_json([mention(text='a \\" b')])
+    split = text.index("\\\\") + 1  # between the backslash and what it escapes
+    parser = MentionStreamParser()
+
+    emitted = parser.feed(text[:split]) + parser.feed(text[split:])
+    parser.close()
+
+    assert [m.text for m in emitted] == ['a \\" b']
+
+
+def test_mention_is_emitted_when_its_object_closes():
+    text = report_json([mention(), mention(text="second")])
+    first_end = text.index("}", text.index('"mentions_on_platform"')) + 1
+    parser = MentionStreamParser()
+
+    assert [m.text for m in parser.feed(text[:first_end])] == ['Good "fair" wages\\']
+    assert [m.text for m in parser.feed(text[first_end:])] == ["second"]
+
+
+def test_fenced_output_is_parsed():
+    parser = MentionStreamParser()
+    feed_in_chunks(parser, "```json\n" + report_json([mention()]) + "\n```", 4)
+    parser.close()
+    assert len(parser.mentions) == 1
+
+
+def test_invalid_mention_fails_before_the_stream_ends():
+    text = report_json([mention(sentiment="great"), mention()])
+    parser = MentionStreamParser()
+
+    with pytest.raises(StreamSchemaError, match="mention 1 is off-schema"):
+        feed_in_chunks(parser, text, 5)
+    assert not parser.done
+
+
+def test_wrong_platform_and_missing_fields():
+    with pytest.raises(StreamSchemaError, match="platform_name"):
+        MentionStreamParser("Reddit").feed(report_json([]))
+
+    parser = MentionStreamParser()
+    parser.feed('{"brand_name": "Nike", "mentions_on_platform": []}')
+    with pytest.raises(StreamSchemaError, match="missing required fields"):
+        parser.close()
+
+
+def test_unclosed_or_non_json_output():
+    parser = MentionStreamParser()
+    parser.feed(report_json([])[:-1])
+    with pytest.raises(StreamSchemaError, match="before it was closed"):
+        parser.close()
+
+    parser = MentionStreamParser()
+    parser.feed("Here are the results")
+    with pytest.raises(StreamSchemaError, match="does not contain a JSON object"):
+        parser.close()
+
+
+class FakeSearchAgent(BaseAgent):
+    """Goes off-schema until `failures` attempts have been made, recording the state it saw."""
+
+    failures: int = 1
+    seen: list = []
+
+    async def _run_async_impl(self, ctx):
+        state = ctx.session.state
+        self.seen.append((state.get("tw_stream_strict"), state.get("tw_stream_error")))
+        if len(self.seen) <= self.failures:
+            raise StreamSchemaError("mention 1 is off-schema")
+        yield Event(invocation_id=ctx.invocation_id, author=self.name, branch=ctx.branch,
+                    content=types.Content(role="model", parts=[types.Part(text="ok")]))
+
+
+def run_retry_agent(failures, max_attempts=2):
+    search = FakeSearchAgent(name="search", failures=failures, seen=[])
+    retry = SchemaRetryAgent(name="retry", state_prefix="tw", max_attempts=max_attempts, sub_agents=[search])
+    runner = InMemoryRunner(agent=retry, app_name="test")
+
+    async def run():
+        session = await runner.session_service.create_session(app_name="test", user_id="u")
+        texts = []
+        async for event in runner.run_async(
+            user_id="u", session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part(text="Nike")]),
+        ):
+            if event.content and event.content.parts:
+                texts.append(event.content.parts[0].text)
+        session = await runner.session_service.get_session(app_name="test", user_id="u", session_id=session.id)
+        return texts, session.state
+
+    texts, state = asyncio.run(run())
+    return search.seen, texts, state
+
+
+def test_retry_reprompts_with_the_error_then_clears_it():
+    seen, texts, state = run_retry_agent(failures=1)
+
+    assert seen == [(True, None), (False, "mention 1 is off-schema")]
+    assert texts == ["ok"]
+    assert state["tw_stream_error"] is None
+
+
+def test_retry_gives_up_after_max_attempts():
+    seen, texts, state = run_retry_agent(failures=3, max_attempts=2)
+
+    assert len(seen) == 2
+    assert texts == []
+    assert state["tw_stream_error"] == "mention 1 is off-schema"
+
+
+def test_first_attempt_success_leaves_no_error():
+    seen, texts, state = run_retry_agent(failures=0)
+
+    assert seen == [(True, None)]
+    assert texts == ["ok"]
+    assert state["tw_stream_error"] is None
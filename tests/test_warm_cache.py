@@ -0,0 +1,50 @@
+import os
+from datetime import datetime, timezone
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import pytest  # noqa: E402
+
+from mcp_brand_agent.warm_cache import WarmCache  # noqa: E402
+
+OBSERVED_AT = datetime.now(timezone.utc)
+
+
+def run_state(*statuses):
+    state = {}
+    for key, status in zip(["twitter", "reddit"], statuses):
+        state[f"{key}_branch_status"] = {"brand": "nike", "status": status, "invocation_id": "i", "error": None}
+        state[f"final_{key}_results"] = {"platform_name": key}
+    return state
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = WarmCache(f"warm_cache_{tmp_path.name}.db")
+    for _ in range(3):
+        cache.record_request("Nike")
+    return cache
+
+
+def test_successful_run_of_popular_brand_is_cached(cache):
+    cache.store("Nike", run_state("succeeded", "succeeded"), OBSERVED_AT)
+
+    cached = cache.lookup("nike")
+    assert cached is not None
+    assert set(cached.state) == {"final_twitter_results", "final_reddit_results"}
+
+
+@pytest.mark.parametrize("status", ["failed", "budget_exceeded", "running"])
+def test_partial_run_is_not_cached(cache, status):
+    cache.store("Nike", run_state("succeeded", status), OBSERVED_AT)
+
+    assert cache.lookup("Nike") is None
+    assert cache.counters["skipped_partial"] == 1
+
+
+def test_unpopular_brand_is_not_cached(cache):
+    cache.record_request("Tesla")
+    cache.store("Tesla", run_state("succeeded", "succeeded"), OBSERVED_AT)
+
+    assert cache.lookup("Tesla") is None
+    assert cache.counters["skipped_unpopular"] == 1